@@ -43,15 +43,32 @@ export default function Home() {
     setCurrentMessage('');
     setIsLoading(true);
 
+    // Append streamed text to the last assistant message, creating it on the first delta
+    let started = false;
+    const appendDelta = (text: string) => {
+      if (!started) {
+        started = true;
+        setIsLoading(false);
+        setMessages(prev => [...prev, { type: 'assistant' as const, content: text }]);
+        return;
+      }
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+      });
+    };
+
     try {
-      // Send message to backend
-      const response = await healthCoachAPI.sendMessage(currentMessage, userInfo);
-      
-      const assistantMessage = {
-        type: 'assistant' as const,
-        content: response.success ? response.response : 'Sorry, I encountered an error. Please try again.'
-      };
-      setMessages(prev => [...prev, assistantMessage]);
+      // Stream the reply from the backend
+      const response = await healthCoachAPI.streamMessage(currentMessage, userInfo, appendDelta);
+
+      if (!started) {
+        const assistantMessage = {
+          type: 'assistant' as const,
+          content: response.response || 'Sorry, I encountered an error. Please try again.'
+        };
+        setMessages(prev => [...prev, assistantMessage]);
+      }
     } catch (error) {
       console.error('Error sending message:', error);
       const assistantMessage = {
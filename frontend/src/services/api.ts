@@ -51,6 +51,13 @@ export interface ChatResponse {
   error?: string;
 }
 
+export interface StreamDone {
+  success: boolean;
+  error?: string | null;
+  route?: string | null;
+  cache?: string | null;
+}
+
 export interface MealPlanResponse {
   mealPlan?: string;
   success: boolean;
@@ -78,6 +85,8 @@ export interface GoalResponse {
 export interface WorkoutLogData {
   date: string;
   workout_type: string;
+  duration?: number;
+  calories_burned?: number;
   notes?: string;
 }
 
@@ -104,6 +113,70 @@ export const healthCoachAPI = {
     }
   },
 
+  // Stream a reply from the health coach, calling onDelta with each piece of text as it arrives
+  async streamMessage(
+    prompt: string,
+    userInfo: UserInfo | undefined,
+    onDelta: (text: string) => void
+  ): Promise<ChatResponse> {
+    let text = '';
+    try {
+      const response = await fetch(`${API_BASE_URL}/ask/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+        body: JSON.stringify({ prompt, userInfo })
+      });
+      if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let done: StreamDone = { success: false, error: 'Stream ended unexpectedly' };
+
+      // Server-sent events are separated by a blank line: "event: <name>\ndata: <json>\n\n"
+      while (true) {
+        const { value, done: finished } = await reader.read();
+        if (finished) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let eventName = 'message';
+          let data = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) eventName = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          if (!data) continue;
+          const payload = JSON.parse(data);
+          if (eventName === 'delta') {
+            text += payload.text;
+            onDelta(payload.text);
+          } else if (eventName === 'done') {
+            done = payload as StreamDone;
+          }
+        }
+      }
+
+      return {
+        response: text,
+        success: done.success,
+        error: done.error || undefined
+      };
+    } catch (error: unknown) {
+      return {
+        response: text || 'Sorry, I encountered an error. Please try again.',
+        success: false,
+        error: error instanceof Error ? error.message : String(error)
+      };
+    }
+  },
+
   // Get user profile
   async getUserProfile(): Promise<UserInfo> {
     try {
@@ -127,10 +200,11 @@ export const healthCoachAPI = {
   },
 
   // Get meal plan
-  async getMealPlan(dietaryRestrictions?: string[]): Promise<MealPlanResponse | null> {
+  async getMealPlan(dietaryRestrictions?: string[], optimize = false): Promise<MealPlanResponse | null> {
     try {
       const response = await apiClient.post<MealPlanResponse>('/meal-plan', {
-        dietaryRestrictions
+        dietaryRestrictions,
+        optimize
       });
       return response.data;
     } catch (error) {
@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Offline micro-benchmarks for the hot paths of the health coach
+"""
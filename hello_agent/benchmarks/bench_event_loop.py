@@ -0,0 +1,148 @@
+"""
+Event Loop Benchmark
+Latency of the LLM fallback path on /ask while the tool endpoints are hammered
+
+Each configuration starts a uvicorn server in a fresh process, working on
+copies of the JSON data files, and drives it over HTTP. The server's Gemini
+round-trip is simulated with a fixed asyncio sleep, so any latency above it
+is time the request spent waiting for the event loop.
+
+Run from hello_agent/: python -m benchmarks.bench_event_loop
+"""
+
+import asyncio
+import glob
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+LLM_LATENCY = 0.15
+HAMMER_TASKS = 16
+SAMPLES = 20
+
+CONFIGS = {
+    # Tools called inline on the loop, whole JSON file rewritten per change
+    "inline": {"TOOL_WORKERS": "0", "STORAGE_WRITE_BEHIND": "0", "STORAGE_BACKEND": "json"},
+    # Tool thread pool, writes handed to the background writer
+    "pooled": {"TOOL_WORKERS": "4", "STORAGE_WRITE_BEHIND": "1", "STORAGE_BACKEND": "json"},
+    # Defaults: tool thread pool, background writer appending to the journal
+    "journal": {"TOOL_WORKERS": "4", "STORAGE_WRITE_BEHIND": "1", "STORAGE_BACKEND": "journal"},
+}
+
+FALLBACK_PROMPT = "How can I sleep better and manage stress for my health?"
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(client, samples: int) -> list:
+    """Sequential fallback requests, returning latencies in milliseconds"""
+    latencies = []
+    for i in range(samples):
+        started = time.perf_counter()
+        response = await client.post("/ask", json={"prompt": f"{FALLBACK_PROMPT} #{i}"},
+                                     headers={"Cache-Control": "no-store"})
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def hammer(client, stop: asyncio.Event, counter: list):
+    """Alternate meal plan and measurement requests until stopped"""
+    while not stop.is_set():
+        await client.post("/meal-plan", json={"dietaryRestrictions": ["vegetarian"], "userInfo": {"age": 30}})
+        await client.post("/progress", json={"date": "2026-01-01", "weight": 70.0})
+        counter[0] += 2
+
+
+def serve(port: int):
+    """Server process: the real app with a simulated LLM"""
+    import uvicorn
+    import main
+
+    async def simulated_llm(agent, context, run_config=None):
+        await asyncio.sleep(LLM_LATENCY)
+        return types.SimpleNamespace(final_output="simulated answer")
+
+    main.Runner.run = simulated_llm
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def drive(base_url: str) -> dict:
+    """Client side: idle latency, then latency while the tool endpoints are hammered"""
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for _ in range(100):
+            try:
+                await client.get("/")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        idle = await measure(client, SAMPLES)
+
+        stop, counter = asyncio.Event(), [0]
+        hammers = [asyncio.create_task(hammer(client, stop, counter)) for _ in range(HAMMER_TASKS)]
+        started = time.perf_counter()
+        loaded = await measure(client, SAMPLES)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*hammers)
+
+    return {
+        "idle_p50_ms": statistics.median(idle),
+        "loaded_p50_ms": statistics.median(loaded),
+        "loaded_p95_ms": percentile(loaded, 0.95),
+        "tool_requests_per_s": counter[0] / elapsed,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_config(name: str, overrides: dict) -> dict:
+    """Benchmark one server configuration in a scratch directory"""
+    source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    port = free_port()
+    with tempfile.TemporaryDirectory() as scratch:
+        for path in glob.glob(os.path.join(source, "*.json")):
+            shutil.copy(path, scratch)
+        env = dict(os.environ, PYTHONPATH=source, GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "benchmark"), **overrides)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_event_loop", "--serve", str(port)],
+            cwd=scratch, env=env, stdout=subprocess.DEVNULL
+        )
+        try:
+            row = asyncio.run(drive(f"http://127.0.0.1:{port}"))
+        finally:
+            server.terminate()
+            server.wait()
+    row["config"] = name
+    return row
+
+
+def run() -> list:
+    return [run_config(name, overrides) for name, overrides in CONFIGS.items()]
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        serve(int(sys.argv[sys.argv.index("--serve") + 1]))
+        sys.exit(0)
+
+    rows = run()
+    print(f"📊 LLM FALLBACK LATENCY under {HAMMER_TASKS} tool clients (simulated LLM {LLM_LATENCY * 1000:.0f} ms)\n")
+    for row in rows:
+        print(f"• {row['config']:<7} idle p50 {row['idle_p50_ms']:7.1f} ms | loaded p50 {row['loaded_p50_ms']:7.1f} ms"
+              f" | loaded p95 {row['loaded_p95_ms']:7.1f} ms | tools {row['tool_requests_per_s']:6.1f} req/s")
@@ -0,0 +1,66 @@
+"""
+Exercise Index Benchmark
+Per-call equipment filtering: the list scan the routine generators used against the bucketed exercise index
+
+Synthetic libraries spread exercises over 3 categories, 3 levels and 40
+equipment tokens; each user owns a few of them. The index timing includes
+its memo, which is what repeated routine requests see, and a cold lookup
+that bypasses it.
+
+Run from hello_agent/: python -m benchmarks.bench_exercise_index
+"""
+
+import random
+import time
+import timeit
+
+from tools.exercise_catalog import create_exercise_index, equipment_tokens
+
+SIZES = [1_000, 10_000, 100_000]
+CATEGORIES = ["cardio", "strength", "flexibility"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+EQUIPMENT = ["none"] + [f"equipment {i}" for i in range(40)]
+USERS = [["none"], ["dumbbells", "equipment 3"], ["equipment 1", "equipment 7", "equipment 12", "equipment 30"]]
+
+
+def synthetic_library(count: int, seed: int = 3) -> dict:
+    rng = random.Random(seed)
+    library = {category: {level: [] for level in LEVELS} for category in CATEGORIES}
+    for i in range(count):
+        library[rng.choice(CATEGORIES)][rng.choice(LEVELS)].append(
+            {"name": f"Exercise {i}", "sets": 3, "reps": 10, "equipment": rng.choice(EQUIPMENT), "muscle": "core"}
+        )
+    return library
+
+
+def list_scan(library: dict, category: str, level: str, equipment: list) -> list:
+    """The original per-call filter"""
+    return [ex for ex in library[category][level] if ex["equipment"] in equipment or ex["equipment"] == "none"]
+
+
+def run(number: int = 200) -> list:
+    rows = []
+    for size in SIZES:
+        library = synthetic_library(size)
+        started = time.perf_counter()
+        index = create_exercise_index(library)
+        build_ms = (time.perf_counter() - started) * 1000
+        for equipment in USERS:
+            assert list(index.available("strength", "advanced", equipment)) == list_scan(library, "strength", "advanced", equipment)
+        scan = sum(timeit.timeit(lambda: list_scan(library, "strength", "advanced", equipment), number=number)
+                   for equipment in USERS) / (number * len(USERS))
+        indexed = sum(timeit.timeit(lambda: index.available("strength", "advanced", equipment), number=number)
+                      for equipment in USERS) / (number * len(USERS))
+        cold = sum(timeit.timeit(lambda: [index.exercise(i) for i in index._available_ids.__wrapped__(
+                                     index, "strength", "advanced", equipment_tokens(equipment))],
+                                 number=max(1, number // 10)) for equipment in USERS) / (max(1, number // 10) * len(USERS))
+        rows.append({"size": size, "build_ms": build_ms, "scan_us": scan * 1e6,
+                     "cold_us": cold * 1e6, "indexed_us": indexed * 1e6})
+    return rows
+
+
+if __name__ == "__main__":
+    print("📊 EXERCISE FILTER LATENCY (per call)\n")
+    for row in run():
+        print(f"• {row['size']:>7,} exercises | index build {row['build_ms']:7.1f} ms | list scan {row['scan_us']:9.1f} µs"
+              f" | index cold {row['cold_us']:9.1f} µs | index memoized {row['indexed_us']:6.2f} µs")
@@ -0,0 +1,79 @@
+"""
+Journal Store Benchmark
+Cost of one saved change with the journal written inline versus handed to the background writer
+
+Before timing, each mode is checked against the interleaving that used to
+duplicate records: the background writer is held back while more changes
+than `compact_every` are made, so compactions are still queued behind
+journal lines when the store is closed and reopened.
+
+Run from hello_agent/: python -m benchmarks.bench_journal_store
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from tools.storage import BackgroundWriter, JournalStore
+
+COLLECTIONS = ["plans"]
+CHANGES = 10_000
+COMPACT_EVERY = 500
+
+
+def check_reopen(scratch: str, name: str, writer: BackgroundWriter = None, compact_every: int = 3):
+    """Appends and updates made while the writer is blocked must reopen exactly once each"""
+    # Some counts end on a compaction, the others leave journal lines queued after the last one
+    for count in range(1, 4 * compact_every):
+        reopen_after(os.path.join(scratch, f"{name}_{count}.json"), name, writer, count, compact_every)
+
+
+def reopen_after(path: str, name: str, writer: BackgroundWriter, count: int, compact_every: int):
+    gate = threading.Event()
+    if writer is not None:
+        writer.submit(gate.wait)
+    store = JournalStore(path, COLLECTIONS, compact_every=compact_every, writer=writer)
+    for i in range(count):
+        store.append("plans", {"i": i})
+        if i % 4 == 3:
+            store.update("plans", i - 2, {"i": i - 2, "updated": True})
+    gate.set()
+    store.close()
+
+    expected = [store.get("plans", i) for i in range(count)]
+    reopened = JournalStore(path, COLLECTIONS, compact_every=compact_every)
+    assert reopened.all("plans") == expected, f"{name}, {count} appends: {[r['i'] for r in reopened.all('plans')]}"
+    assert reopened.seq == store.seq, f"{name}, {count} appends: seq {reopened.seq} != {store.seq}"
+    reopened.close()
+
+
+def time_changes(scratch: str, name: str, writer: BackgroundWriter = None) -> dict:
+    path = os.path.join(scratch, f"{name}_timed.json")
+    store = JournalStore(path, COLLECTIONS, compact_every=COMPACT_EVERY, writer=writer)
+    started = time.perf_counter()
+    for i in range(CHANGES):
+        store.append("plans", {"i": i, "exercises": ["squat", "bench", "row"]})
+    queued_s = time.perf_counter() - started
+    store.close()
+    total_s = time.perf_counter() - started
+    assert JournalStore(path, COLLECTIONS).count("plans") == CHANGES
+    return {"mode": name, "per_change_us": queued_s / CHANGES * 1e6, "drained_ms": total_s * 1000}
+
+
+def run() -> list:
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch:
+        check_reopen(scratch, "inline")
+        check_reopen(scratch, "write_behind", BackgroundWriter())
+        rows.append(time_changes(scratch, "inline"))
+        rows.append(time_changes(scratch, "write_behind", BackgroundWriter()))
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"📊 JOURNAL STORE ({CHANGES:,} appends, compaction every {COMPACT_EVERY})\n")
+    rows = run()
+    print("✅ Reopen after queued compactions matches the in-memory document\n")
+    for row in rows:
+        print(f"• {row['mode']:<12} | {row['per_change_us']:6.1f} µs per change on the caller | all written {row['drained_ms']:8.1f} ms")
@@ -0,0 +1,109 @@
+"""
+Meal Optimizer Benchmark
+Plans per second and distance from the calorie/macro targets: random picker against the macro optimizer
+
+Each profile (calorie target, goal, restrictions) builds a 7-day plan on the
+bundled catalog and on a synthetic 10k-recipe catalog. Errors are per day:
+absolute calorie miss in kcal and the mean relative miss across protein,
+carbs and fat.
+
+Run from hello_agent/: python -m benchmarks.bench_meal_optimizer
+"""
+
+import random
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.bench_recipe_catalog import synthetic_recipes
+from tools.meal_optimizer import create_meal_optimizer, macro_targets
+from tools.recipe_catalog import CatalogBuilder, create_recipe_index, get_recipe_catalog, goal_filter
+
+DAYS = 7
+PLANS = 40
+PROFILES = [
+    (1700, "weight loss", None),
+    (2000, "general fitness", ["vegetarian"]),
+    (2300, "muscle gain", None),
+    (2300, "muscle gain", ["vegan"]),
+]
+BUDGETS_MS = [5, 50]
+
+
+def synthetic_catalog(count: int):
+    builder = CatalogBuilder("bench")
+    for recipe in synthetic_recipes(count):
+        builder.add(recipe["id"], recipe["meal_type"], recipe)
+    return builder.build()
+
+
+def random_plan(planner_index, calories: int, goal: str, restrictions) -> list:
+    """The meal planner's random picker: one candidate per slot per day"""
+    goal = goal_filter(goal)
+    shares = [("breakfast", 0.25), ("lunch", 0.35), ("dinner", 0.30), ("snacks", 0.10)]
+    plan = []
+    for _ in range(DAYS):
+        day = []
+        for meal_type, share in shares:
+            rows = planner_index.candidates(meal_type, int(calories * share), goal, restrictions)
+            day.append(int(rows[random.randrange(len(rows))]))
+        plan.append(day)
+    return plan
+
+
+def day_errors(macros: np.ndarray, plan: list, targets: np.ndarray):
+    """Per-day (calorie miss in kcal, mean relative macro miss)"""
+    for day in plan:
+        totals = macros[day].sum(axis=0)
+        yield abs(totals[0] - targets[0]), float(np.mean(np.abs(totals[1:] - targets[1:]) / targets[1:]))
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark(catalog, label: str) -> list:
+    index = create_recipe_index(catalog)
+    macros = catalog.macros.astype(np.float64)
+    planners = [("random", None)] + [(f"optimize {budget}ms", create_meal_optimizer(catalog, index, budget))
+                                     for budget in BUDGETS_MS]
+    rows = []
+    for name, optimizer in planners:
+        random.seed(11)
+        calorie_misses, macro_misses, elapsed = [], [], 0.0
+        for calories, goal, restrictions in PROFILES:
+            targets = macro_targets(calories, goal_filter(goal))
+            for _ in range(PLANS // len(PROFILES)):
+                started = time.perf_counter()
+                if optimizer is None:
+                    plan = random_plan(index, calories, goal, restrictions)
+                else:
+                    result = optimizer.optimize(calories, goal_filter(goal), restrictions, DAYS)
+                    plan = [list(day.values()) for day in result["days"]]
+                elapsed += time.perf_counter() - started
+                for calorie_miss, macro_miss in day_errors(macros, plan, targets):
+                    calorie_misses.append(calorie_miss)
+                    macro_misses.append(macro_miss)
+        rows.append({
+            "catalog": label,
+            "planner": name,
+            "plans_per_s": PLANS // len(PROFILES) * len(PROFILES) / elapsed,
+            "kcal_p50": statistics.median(calorie_misses),
+            "kcal_p90": percentile(calorie_misses, 0.9),
+            "macro_mean_pct": 100 * statistics.mean(macro_misses),
+        })
+    return rows
+
+
+def run() -> list:
+    return benchmark(get_recipe_catalog(), "bundled") + benchmark(synthetic_catalog(10_000), "synthetic 10k")
+
+
+if __name__ == "__main__":
+    print(f"📊 MEAL PLAN TARGET ERROR ({DAYS}-day plans, {len(PROFILES)} profiles)\n")
+    for row in run():
+        print(f"• {row['catalog']:<13} {row['planner']:<14} {row['plans_per_s']:8.1f} plans/s"
+              f" | kcal miss p50 {row['kcal_p50']:6.0f} p90 {row['kcal_p90']:6.0f}"
+              f" | macro miss {row['macro_mean_pct']:5.1f}%")
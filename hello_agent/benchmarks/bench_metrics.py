@@ -0,0 +1,50 @@
+"""
+Metrics Overhead Benchmark
+Cost of one instrumented stage: an empty `with metrics.span(...)` block inside a request and outside one
+
+Run from hello_agent/: python -m benchmarks.bench_metrics
+"""
+
+import time
+
+from metrics import create_metrics
+
+SPANS = 200_000
+
+
+def per_span_us(metrics, in_request: bool, spans: int = SPANS) -> float:
+    token = None
+    if in_request:
+        timings, token = metrics.start_request()
+    started = time.perf_counter()
+    for _ in range(spans):
+        with metrics.span("stage"):
+            pass
+    elapsed = time.perf_counter() - started
+    if in_request:
+        metrics.finish(timings, "/bench")
+        metrics.end_request(token)
+    return elapsed / spans * 1e6
+
+
+def empty_loop_us(spans: int = SPANS) -> float:
+    started = time.perf_counter()
+    for _ in range(spans):
+        pass
+    return (time.perf_counter() - started) / spans * 1e6
+
+
+def run(repeats: int = 5) -> list:
+    metrics = create_metrics()
+    baseline = min(empty_loop_us() for _ in range(repeats))
+    rows = []
+    for label, in_request in (("inside a request (buffered)", True), ("outside a request (histogram)", False)):
+        cost = min(per_span_us(metrics, in_request) for _ in range(repeats)) - baseline
+        rows.append({"case": label, "per_span_us": cost})
+    return rows
+
+
+if __name__ == "__main__":
+    print("⏱️ METRICS OVERHEAD (per span)\n")
+    for row in run():
+        print(f"• {row['case']:<32} {row['per_span_us']:6.2f} µs")
@@ -0,0 +1,44 @@
+"""
+Program Generator Benchmark
+Time to generate a full periodized program and to page one week of it back out of its stored record
+
+Run from hello_agent/: python -m benchmarks.bench_program_generator
+"""
+
+import json
+import random
+import timeit
+
+from benchmarks.bench_exercise_index import synthetic_library
+from tools.exercise_catalog import create_exercise_index
+from tools.program_generator import create_program_generator
+from tools.workout_recommender import WorkoutRecommender
+
+SHAPES = [(4, 3), (8, 4), (16, 7)]
+EQUIPMENT = ["none", "equipment 1", "equipment 7", "equipment 12"]
+
+
+def run(number: int = 200) -> list:
+    builtin = WorkoutRecommender.load_exercises(None)
+    rows = []
+    for label, library in (("built-in", builtin), ("synthetic 10k", synthetic_library(10_000))):
+        generator = create_program_generator(create_exercise_index(library))
+        for weeks, sessions in SHAPES:
+            generate = lambda: generator.generate("advanced", "balanced", EQUIPMENT, weeks, sessions, random.Random(1))
+            record = json.loads(json.dumps(generate().to_record()))
+            page = lambda: generator.render_week(generator.from_record(record), weeks)
+            rows.append({
+                "library": label,
+                "shape": f"{weeks}w x {sessions}",
+                "generate_ms": timeit.timeit(generate, number=number) / number * 1000,
+                "page_ms": timeit.timeit(page, number=number) / number * 1000,
+                "record_bytes": len(json.dumps(record)),
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    print("📊 PERIODIZED PROGRAM GENERATION\n")
+    for row in run():
+        print(f"• {row['library']:<13} {row['shape']:<8} generate {row['generate_ms']:6.2f} ms"
+              f" | page one week {row['page_ms']:6.2f} ms | stored {row['record_bytes']:6,} bytes")
@@ -0,0 +1,93 @@
+"""
+Progress Tracker Benchmark
+Latency of a 30-day progress summary and all-time workout analytics as lifetime history grows:
+full rescans against the time index and rollups
+
+Each history is written straight to a progress JSON file (one measurement
+and one workout per day-ish, dates shuffled) and opened with the JSON
+store. The rescan baseline is the original filter that parsed every
+record's date on every call.
+
+Run from hello_agent/: python -m benchmarks.bench_progress_tracker
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta
+
+from tools.progress_tracker import COLLECTIONS, ProgressTracker
+from tools.storage import create_json_store
+
+SIZES = [1_000, 10_000, 100_000]
+WINDOW_DAYS = 30
+
+
+def write_history(path: str, count: int, seed: int = 5):
+    rng = random.Random(seed)
+    now = datetime.now()
+    document = {collection: [] for collection in COLLECTIONS}
+    for _ in range(count):
+        date = (now - timedelta(days=rng.randrange(0, 3 * 365))).strftime("%Y-%m-%d")
+        document["measurements"].append({"date": date, "weight": round(70 + rng.random() * 10, 1), "body_fat": None})
+        document["workouts"].append({"date": date, "workout_type": rng.choice(["run", "lift", "yoga"]),
+                                     "duration": rng.randrange(10, 90), "calories_burned": rng.randrange(50, 500)})
+    with open(path, "w") as f:
+        json.dump(document, f)
+
+
+def rescan_window(tracker: ProgressTracker, days: int) -> tuple:
+    """The original per-call filter over every record"""
+    start_date = datetime.now() - timedelta(days=days)
+    return tuple(
+        [r for r in tracker.store.all(collection) if datetime.fromisoformat(r["date"]) >= start_date]
+        for collection in COLLECTIONS
+    )
+
+
+def indexed_window(tracker: ProgressTracker, days: int) -> tuple:
+    start_date = datetime.now() - timedelta(days=days)
+    return tuple(tracker.records_between(collection, start_date) for collection in COLLECTIONS)
+
+
+def rescan_analytics(tracker: ProgressTracker) -> tuple:
+    """The original all-history totals"""
+    workouts = tracker.store.all("workouts")
+    workout_types = {}
+    for workout in workouts:
+        workout_types[workout["workout_type"]] = workout_types.get(workout["workout_type"], 0) + 1
+    return sum(w["duration"] for w in workouts), sum(w.get("calories_burned") or 0 for w in workouts), workout_types
+
+
+def run(number: int = 20) -> list:
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in SIZES:
+            path = os.path.join(scratch, f"progress_{size}.json")
+            write_history(path, size)
+            started = time.perf_counter()
+            tracker = ProgressTracker(store=create_json_store(path, COLLECTIONS))
+            index_ms = (time.perf_counter() - started) * 1000
+            assert [len(r) for r in rescan_window(tracker, WINDOW_DAYS)] == [len(r) for r in indexed_window(tracker, WINDOW_DAYS)]
+            rows.append({
+                "size": size,
+                "in_window": len(indexed_window(tracker, WINDOW_DAYS)[1]),
+                "index_build_ms": index_ms,
+                "rescan_ms": timeit.timeit(lambda: rescan_window(tracker, WINDOW_DAYS), number=number) / number * 1000,
+                "indexed_ms": timeit.timeit(lambda: indexed_window(tracker, WINDOW_DAYS), number=number) / number * 1000,
+                "analytics_rescan_ms": timeit.timeit(lambda: rescan_analytics(tracker), number=number) / number * 1000,
+                "analytics_ms": timeit.timeit(tracker.get_workout_analytics, number=number) / number * 1000,
+                "summary_ms": timeit.timeit(lambda: tracker.get_progress_summary(WINDOW_DAYS), number=number) / number * 1000,
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"📊 PROGRESS SUMMARY WINDOW ({WINDOW_DAYS} days)\n")
+    for row in run():
+        print(f"• {row['size']:>7,} records/collection ({row['in_window']:>5,} in window) | index + rollup build {row['index_build_ms']:7.1f} ms"
+              f" | rescan {row['rescan_ms']:8.2f} ms | indexed {row['indexed_ms']:6.2f} ms | full summary {row['summary_ms']:6.2f} ms"
+              f" | analytics rescan {row['analytics_rescan_ms']:7.2f} ms | rollup {row['analytics_ms']:5.2f} ms")
@@ -0,0 +1,118 @@
+"""
+Recipe Catalog Benchmark
+Load time and resident size of the columnar recipe catalog against nested dicts, at 1k/10k/100k recipes
+
+Synthetic catalogs are written as JSONL and CSV to a scratch directory. The
+baseline parses the same JSONL into the {meal_type: {recipe_id: recipe}}
+dicts the meal planner used to hold. Memory is the tracemalloc peak while
+building and the net allocation still held afterwards.
+
+Run from hello_agent/: python -m benchmarks.bench_recipe_catalog
+"""
+
+import csv
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from tools.recipe_catalog import load_recipe_catalog
+
+SIZES = [1_000, 10_000, 100_000]
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snacks"]
+DIETARY = [["vegetarian"], ["vegan", "vegetarian"], ["high_protein"], ["none"], ["vegetarian", "high_protein"]]
+INGREDIENTS = [f"ingredient {i}" for i in range(400)]
+
+
+def synthetic_recipes(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(count):
+        recipes.append({
+            "id": f"recipe_{i:06d}",
+            "meal_type": MEAL_TYPES[i % len(MEAL_TYPES)],
+            "name": f"Synthetic Recipe {i}",
+            "calories": rng.randrange(100, 800),
+            "protein": rng.randrange(2, 50),
+            "carbs": rng.randrange(5, 90),
+            "fat": rng.randrange(1, 40),
+            "ingredients": rng.sample(INGREDIENTS, rng.randrange(3, 9)),
+            "instructions": rng.choice(["Mix and serve", "Grill and season", "Bake for 20 minutes", "Blend until smooth"]),
+            "dietary": rng.choice(DIETARY),
+        })
+    return recipes
+
+
+def write_jsonl(path: str, recipes: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"catalog_version": "bench", "schema": 1}) + "\n")
+        for recipe in recipes:
+            f.write(json.dumps(recipe) + "\n")
+
+
+def write_csv(path: str, recipes: list):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("# catalog_version: bench\n")
+        writer = csv.DictWriter(f, fieldnames=list(recipes[0]))
+        writer.writeheader()
+        for recipe in recipes:
+            writer.writerow(dict(recipe, ingredients=";".join(recipe["ingredients"]),
+                                 dietary=";".join(recipe["dietary"])))
+
+
+def load_nested(path: str) -> dict:
+    """Baseline: the nested dict layout the planner kept before the catalog"""
+    recipes = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if "catalog_version" in record:
+                continue
+            recipes.setdefault(record.pop("meal_type"), {})[record.pop("id")] = record
+    return recipes
+
+
+def measure(load, path: str) -> dict:
+    """Wall time, peak and retained allocation of one load"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load(path)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"load_ms": elapsed * 1000, "retained_mb": retained / 2**20, "peak_mb": peak / 2**20}
+
+
+def run() -> list:
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in SIZES:
+            recipes = synthetic_recipes(size)
+            jsonl_path = os.path.join(scratch, f"recipes_{size}.jsonl")
+            csv_path = os.path.join(scratch, f"recipes_{size}.csv")
+            write_jsonl(jsonl_path, recipes)
+            write_csv(csv_path, recipes)
+
+            # tracemalloc slows parsing down, so time each load once more without it
+            for layout, load, path in (("nested dicts", load_nested, jsonl_path),
+                                       ("columnar jsonl", load_recipe_catalog, jsonl_path),
+                                       ("columnar csv", load_recipe_catalog, csv_path)):
+                row = measure(load, path)
+                started = time.perf_counter()
+                load(path)
+                row["load_ms"] = (time.perf_counter() - started) * 1000
+                row.update(size=size, layout=layout)
+                rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    print("📊 RECIPE CATALOG LOAD TIME AND MEMORY\n")
+    for row in run():
+        print(f"• {row['size']:>7,} {row['layout']:<15} load {row['load_ms']:8.1f} ms"
+              f" | retained {row['retained_mb']:7.1f} MB | peak {row['peak_mb']:7.1f} MB")
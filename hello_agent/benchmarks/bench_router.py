@@ -0,0 +1,73 @@
+"""
+Router Benchmark
+Per-prompt routing latency of the compiled intent router against the keyword cascade it replaced
+
+Run from hello_agent/: python -m benchmarks.bench_router
+"""
+
+import timeit
+
+from router import INTENT_LEXICONS, create_intent_router
+
+PROMPTS = [
+    "I want to gain 2kg in 1 month",
+    "Can you make me a 7 day vegetarian meal plan with 2200 calories?",
+    "My knee hurts after running, what should I do?",
+    "I'd like to speak to a real person please",
+    "How much protein should I eat after a workout?",
+    "Show me my progress for the last month",
+    "Give me a beginner strength training routine for home",
+    "What is a good way to improve sleep quality and reduce stress during the week?",
+    "hello",
+    "Tell me about recursion in programming.",
+]
+
+
+def legacy_cascade(prompt: str) -> str:
+    """The original chain of `any(word in prompt.lower() ...)` checks from /ask"""
+    if any(word in prompt.lower() for word in INTENT_LEXICONS["escalation"]):
+        return "escalation"
+    if any(word in prompt.lower() for word in INTENT_LEXICONS["injury"]):
+        return "injury"
+    if any(keyword in prompt.lower() for keyword in INTENT_LEXICONS["nutrition"]):
+        if any(keyword in prompt.lower() for keyword in INTENT_LEXICONS["meal_plan"]):
+            return "meal_plan"
+        return "nutrition"
+    goal_keywords = ['goal', 'gain', 'lose', 'weight', 'muscle', 'fitness', 'target', 'achieve']
+    if any(keyword in prompt.lower() for keyword in goal_keywords) or 'analyze' in prompt.lower() or 'set' in prompt.lower():
+        return "goal"
+    if any(word in prompt.lower() for word in INTENT_LEXICONS["progress"]):
+        return "progress"
+    if any(word in prompt.lower() for word in INTENT_LEXICONS["workout"]):
+        return "workout"
+    return None
+
+
+def per_prompt_latency(classify, prompt: str, number: int) -> float:
+    """Mean latency of one classification in microseconds"""
+    return timeit.timeit(lambda: classify(prompt), number=number) / number * 1e6
+
+
+def run(number: int = 2000) -> list:
+    router = create_intent_router()
+    rows = []
+    for prompt in PROMPTS:
+        assert router.classify(prompt).primary == legacy_cascade(prompt), prompt
+        rows.append({
+            "prompt": prompt,
+            "route": legacy_cascade(prompt) or "fallback",
+            "cascade_us": per_prompt_latency(legacy_cascade, prompt, number),
+            "router_us": per_prompt_latency(router.classify, prompt, number),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    rows = run()
+    print("📊 ROUTING LATENCY (µs per prompt)\n")
+    for row in rows:
+        print(f"• {row['route']:<10} cascade {row['cascade_us']:6.2f} | router {row['router_us']:6.2f}  {row['prompt'][:50]}")
+    cascade_total = sum(row["cascade_us"] for row in rows)
+    router_total = sum(row["router_us"] for row in rows)
+    print(f"\nMean: cascade {cascade_total / len(rows):.2f} | router {router_total / len(rows):.2f} "
+          f"({cascade_total / router_total:.2f}x)")
@@ -0,0 +1,99 @@
+"""
+Trend Analytics Benchmark
+Batch trend statistics for many users' weight series: per-user pure-Python loops against one vectorized call
+
+Each synthetic user has about six months of irregular weigh-ins drifting
+toward a goal with noise. The baseline computes the same rolling mean,
+EWMA, least-squares weekly rate, plateau flag and goal projection one
+user at a time.
+
+Run from hello_agent/: python -m benchmarks.bench_trend_analytics
+"""
+
+import math
+import time
+
+import numpy as np
+
+from tools.trend_analytics import GOAL_TOLERANCE, create_trend_analyzer
+
+USERS = [100, 1_000, 10_000]
+START_DAY = 20_000.0
+
+
+def synthetic_series(users: int, seed: int = 11) -> tuple:
+    rng = np.random.default_rng(seed)
+    series, goals = [], []
+    for _ in range(users):
+        count = int(rng.integers(20, 180))
+        days = START_DAY + np.sort(rng.choice(180, count, replace=False)).astype(np.float64)
+        start = rng.uniform(60, 110)
+        rate = rng.uniform(-0.12, 0.05)
+        series.append((days, start + rate * (days - START_DAY) + rng.normal(0, 0.4, count)))
+        goals.append(start - rng.uniform(2, 15))
+    return series, goals
+
+
+def python_trend(analyzer, days: list, values: list, goal: float) -> dict:
+    """The same statistics for one series with plain loops"""
+    recent = values[-analyzer.window:]
+    rolling = sum(recent) / len(recent)
+    smoothed = values[0]
+    for value in values:
+        smoothed = analyzer.alpha * value + (1 - analyzer.alpha) * smoothed
+
+    last_day = days[-1]
+    points = [(day - last_day, value) for day, value in zip(days, values) if day >= last_day - analyzer.fit_days]
+    rate = math.nan
+    if len(points) >= 2:
+        mean_x = sum(x for x, _ in points) / len(points)
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        if spread > 0:
+            rate = sum((x - mean_x) * y for x, y in points) / spread * 7
+    span = -points[0][0] if points else 0.0
+    plateau = len(points) >= 3 and span >= analyzer.min_plateau_days and abs(rate) < analyzer.plateau_rate
+
+    remaining = goal - smoothed
+    days_to_goal = math.nan
+    if abs(remaining) <= GOAL_TOLERANCE:
+        days_to_goal = 0.0
+    elif rate == rate and rate != 0 and not plateau:
+        needed = remaining / (rate / 7)
+        if 0 <= needed <= analyzer.max_projection_days:
+            days_to_goal = needed
+    return {"rolling_mean": rolling, "ewma": smoothed, "weekly_rate": rate, "plateau": plateau, "days_to_goal": days_to_goal}
+
+
+def run(repeats: int = 3) -> list:
+    analyzer = create_trend_analyzer()
+    rows = []
+    for users in USERS:
+        series, goals = synthetic_series(users)
+        plain = [(days.tolist(), values.tolist()) for days, values in series]
+
+        python_s = min(_timed(lambda: [python_trend(analyzer, d, v, g) for (d, v), g in zip(plain, goals)])
+                       for _ in range(repeats))
+        numpy_s = min(_timed(lambda: analyzer.analyze(series, goals)) for _ in range(repeats))
+
+        expected = [python_trend(analyzer, d, v, g) for (d, v), g in zip(plain, goals)]
+        result = analyzer.analyze(series, goals)
+        for name in expected[0]:
+            np.testing.assert_allclose(result[name].astype(np.float64), [row[name] for row in expected], rtol=1e-9, atol=1e-9)
+
+        rows.append({"users": users, "points": sum(len(v) for _, v in series), "python_ms": python_s * 1000,
+                     "numpy_ms": numpy_s * 1000, "projected": int(np.isfinite(result["days_to_goal"]).sum())})
+    return rows
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    print("📊 TREND ANALYTICS (batch of users)\n")
+    for row in run():
+        print(f"• {row['users']:>6,} users ({row['points']:>9,} weigh-ins) | pure Python {row['python_ms']:8.1f} ms"
+              f" | NumPy batch {row['numpy_ms']:7.1f} ms | {row['python_ms'] / row['numpy_ms']:5.1f}x"
+              f" | {row['projected']:,} with a goal date")
@@ -0,0 +1,357 @@
+"""
+Load Test
+Replays a realistic mix of prompts and tool calls against every API route and reports throughput,
+p50/p95/p99 latency and error rates per route
+
+With --spawn the mock LLM server and the API are started locally (API data in a
+temporary directory, LLM_BASE_URL pointed at the mock), so a full run needs no
+network. Otherwise --url targets an API that is already running.
+
+By default N workers send requests back to back (closed loop). With --rate,
+requests arrive at that average rate (Poisson) whether or not earlier ones
+finished, and latency counts from the scheduled arrival, so queueing in the
+API shows up in the percentiles.
+
+`/ask` and `/ask/stream` are reported separately for answers from tools and
+from the LLM (including cached LLM answers), as told by the response.
+
+Run from hello_agent/:
+    python -m benchmarks.load_test --spawn [--duration 30] [--concurrency 32] [--users 200]
+    python -m benchmarks.load_test --spawn --rate 50 --mock-latency lognormal:800,0.6 --mock-error-rate 0.05
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --requests 2000 --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from benchmarks.startup_profile import APP_DIR, free_port
+
+TOOL_PROMPTS = [
+    "I want to lose 5 kg in 3 months",
+    "I want to gain 2kg of muscle in 8 weeks",
+    "Give me a workout routine for building strength at home",
+    "My shoulder hurts when I lift overhead, what should I do?",
+    "Make me a vegetarian meal plan with 2200 calories",
+    "How much protein should I eat per day?",
+    "Show me my progress for this month",
+    "I'd like to speak to a human coach please",
+]
+LLM_PROMPTS = [
+    "How can I improve my sleep quality?",
+    "What are good ways to manage stress during a busy week?",
+    "Is it okay to stretch every day?",
+    "How do I stay motivated when I feel tired?",
+    "What are the benefits of walking after dinner?",
+    "How can I build a morning routine that sticks?",
+]
+PROFILE_DETAILS = ["I work night shifts", "I have two kids", "I sit at a desk all day", "I travel a lot",
+                   "I just moved to a new city", "I'm recovering from a cold"]
+FITNESS_LEVELS = ["beginner", "intermediate", "advanced"]
+HEALTH_GOALS = ["weight loss", "muscle gain", "general fitness"]
+RESTRICTIONS = [[], ["vegetarian"], ["vegan"], ["gluten-free"], ["keto"]]
+WORKOUT_TYPES = ["run", "strength", "yoga", "cycling", "swim"]
+
+# Share of LLM-bound prompts given a personal detail, which makes them miss the response cache
+UNIQUE_PROMPT_SHARE = 0.6
+# Share of requests sent without a userId (they share the default tools)
+ANONYMOUS_SHARE = 0.1
+
+
+class Call(NamedTuple):
+    kind: str
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]]
+    params: Optional[Dict[str, Any]]
+
+
+class Result(NamedTuple):
+    route: str
+    status: str
+    error: bool
+    latency: float
+
+
+def user_info(rng: random.Random) -> Dict[str, Any]:
+    return {"age": rng.randint(18, 70), "fitness_level": rng.choice(FITNESS_LEVELS),
+            "health_goals": rng.choice(HEALTH_GOALS)}
+
+
+def llm_prompt(rng: random.Random) -> str:
+    prompt = rng.choice(LLM_PROMPTS)
+    if rng.random() < UNIQUE_PROMPT_SHARE:
+        prompt += f" I'm {rng.randint(18, 70)} and {rng.choice(PROFILE_DETAILS)}."
+    return prompt
+
+
+def recent_date(rng: random.Random) -> str:
+    return (date.today() - timedelta(days=rng.randrange(0, 120))).isoformat()
+
+
+def ask_call(rng: random.Random, user: Optional[str], path: str) -> Call:
+    prompt = rng.choice(TOOL_PROMPTS) if rng.random() < 0.5 else llm_prompt(rng)
+    return Call("ask", "POST", path, {"userId": user, "prompt": prompt, "userInfo": user_info(rng)}, None)
+
+
+# (weight, builder) pairs; each builder returns one request for a user
+MIX = [
+    (30, lambda rng, user: ask_call(rng, user, "/ask")),
+    (10, lambda rng, user: ask_call(rng, user, "/ask/stream")),
+    (8, lambda rng, user: Call("json", "POST", "/meal-plan", {
+        "userId": user, "userInfo": user_info(rng), "dietaryRestrictions": rng.choice(RESTRICTIONS),
+        "optimize": rng.random() < 0.3, "seed": rng.randrange(20) if rng.random() < 0.5 else None}, None)),
+    (8, lambda rng, user: Call("json", "POST", "/workout", {
+        "userId": user, "userInfo": user_info(rng), "seed": rng.randrange(20) if rng.random() < 0.5 else None}, None)),
+    (3, lambda rng, user: Call("json", "POST", "/program", {
+        "userId": user, "userInfo": user_info(rng), "weeks": rng.choice([4, 8, 12]),
+        "sessionsPerWeek": rng.choice([2, 3, 4])}, None)),
+    (12, lambda rng, user: Call("json", "POST", "/progress", {
+        "userId": user, "date": recent_date(rng), "weight": round(rng.uniform(55, 110), 1),
+        "bodyFat": round(rng.uniform(10, 35), 1)}, None)),
+    (6, lambda rng, user: Call("json", "GET", "/progress/trends", None,
+                               {"userId": user, "targetWeight": rng.randint(60, 90)} if user else
+                               {"targetWeight": rng.randint(60, 90)})),
+    (5, lambda rng, user: Call("json", "POST", "/goal", {
+        "userId": user, "goalType": rng.choice(["weight_loss", "muscle_gain", "fitness"]),
+        "target": f"{rng.randint(2, 10)} kg", "timeframe": f"{rng.randint(1, 6)} months"}, None)),
+    (8, lambda rng, user: Call("json", "POST", "/log-workout", {
+        "userId": user, "date": recent_date(rng), "workout_type": rng.choice(WORKOUT_TYPES),
+        "duration": rng.randrange(15, 90), "calories_burned": rng.randrange(80, 700)}, None)),
+]
+
+
+def pick_call(rng: random.Random, users: int) -> Call:
+    user = None if rng.random() < ANONYMOUS_SHARE else f"load-user-{rng.randrange(users)}"
+    total = sum(weight for weight, _ in MIX)
+    point = rng.uniform(0, total)
+    for weight, build in MIX:
+        point -= weight
+        if point <= 0:
+            return build(rng, user)
+    return MIX[-1][1](rng, user)
+
+
+def last_sse_data(text: str) -> Dict[str, Any]:
+    """Payload of the final `done` event of a /ask/stream response"""
+    for line in reversed(text.splitlines()):
+        if line.startswith("data: "):
+            return json.loads(line[len("data: "):])
+    return {}
+
+
+async def send(client: httpx.AsyncClient, call: Call, started: float) -> Result:
+    route = f"{call.method} {call.path}"
+    try:
+        response = await client.request(call.method, call.path, json=call.body, params=call.params)
+        text = response.text
+    except httpx.HTTPError as e:
+        return Result(route, type(e).__name__, True, time.perf_counter() - started)
+    latency = time.perf_counter() - started
+    status = str(response.status_code)
+    if response.status_code >= 400:
+        return Result(route, status, True, latency)
+    if call.path == "/ask/stream":
+        done = last_sse_data(text)
+        source = "llm" if done.get("route") == "agent" else "tool"
+        error = bool(done.get("error"))
+        return Result(f"{route} [{source}]", f"{status} (error event)" if error else status, error, latency)
+    payload = response.json()
+    if call.path == "/ask":
+        route += " [llm]" if "x-cache" in response.headers else " [tool]"
+    error = bool(payload.get("error"))
+    return Result(route, f"{status} (error in body)" if error else status, error, latency)
+
+
+async def closed_loop(client: httpx.AsyncClient, rng: random.Random, args) -> List[Result]:
+    results: List[Result] = []
+    deadline = time.perf_counter() + args.duration
+    remaining = [args.requests]
+
+    async def worker():
+        while time.perf_counter() < deadline and (args.requests is None or remaining[0] > 0):
+            if args.requests is not None:
+                remaining[0] -= 1
+            results.append(await send(client, pick_call(rng, args.users), time.perf_counter()))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return results
+
+
+async def open_loop(client: httpx.AsyncClient, rng: random.Random, args) -> List[Result]:
+    results: List[Result] = []
+    # Caps outstanding requests; a request waiting here is already late, which its latency includes
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = []
+    started = time.perf_counter()
+    arrival = started
+    sent = 0
+
+    async def one(call: Call, scheduled: float):
+        async with slots:
+            results.append(await send(client, call, scheduled))
+
+    while arrival - started < args.duration and (args.requests is None or sent < args.requests):
+        arrival += rng.expovariate(args.rate)
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(pick_call(rng, args.users), arrival)))
+        sent += 1
+    await asyncio.gather(*tasks)
+    return results
+
+
+def percentile(ordered: List[float], share: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, int(round(share * len(ordered) + 0.5)) - 1))]
+
+
+def summarize(results: List[Result], elapsed: float) -> Dict[str, Any]:
+    by_route: Dict[str, List[Result]] = defaultdict(list)
+    for result in results:
+        by_route[result.route].append(result)
+
+    def stats(rows: List[Result]) -> Dict[str, Any]:
+        ordered = sorted(row.latency for row in rows)
+        errors = [row for row in rows if row.error]
+        return {
+            "requests": len(rows),
+            "throughput_rps": len(rows) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "error_rate": len(errors) / len(rows) if rows else 0.0,
+            "errors": dict(Counter(row.status for row in errors)),
+        }
+
+    return {
+        "elapsed_s": elapsed,
+        "overall": stats(results),
+        "routes": {route: stats(rows) for route, rows in sorted(by_route.items())},
+    }
+
+
+def print_summary(summary: Dict[str, Any]):
+    overall = summary["overall"]
+    print(f"\n🚦 LOAD TEST: {overall['requests']:,} requests in {summary['elapsed_s']:.1f} s | "
+          f"{overall['throughput_rps']:.1f} req/s | errors {overall['error_rate']:.1%}\n")
+    print(f"{'route':<34} {'count':>7} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, row in list(summary["routes"].items()) + [("all", overall)]:
+        print(f"{route:<34} {row['requests']:>7,} {row['throughput_rps']:>7.1f} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate']:>7.1%}")
+    if overall["errors"]:
+        print("\n⚠️ Errors by status: " + ", ".join(f"{status} × {count}" for status, count in overall["errors"].items()))
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited during startup")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f} s")
+
+
+@contextmanager
+def spawned_stack(args) -> Iterator[Tuple[str, str]]:
+    """Start the mock LLM and the API against it; yields (API URL, mock URL)"""
+    mock_port, api_port = free_port(), free_port()
+    mock_url, api_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{api_port}"
+    processes = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        try:
+            mock = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.mock_llm", "--port", str(mock_port), "--latency", args.mock_latency,
+                 "--tokens-per-second", str(args.mock_tokens_per_second), "--error-rate", str(args.mock_error_rate),
+                 "--error-status", args.mock_error_status, "--seed", str(args.seed)],
+                cwd=APP_DIR, stdout=subprocess.DEVNULL)
+            processes.append(mock)
+            env = dict(os.environ, LLM_BASE_URL=f"{mock_url}/v1/", LLM_MODEL="mock", PRELOAD="1",
+                       USER_DATA_DIR=os.path.join(data_dir, "user_data"))
+            env.setdefault("GEMINI_API_KEY", "load-test")
+            # The API's shared JSON files go to the temporary directory, not the repo
+            api = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", APP_DIR, "--host", "127.0.0.1",
+                 "--port", str(api_port), "--log-level", "warning"],
+                cwd=data_dir, env=env, stdout=subprocess.DEVNULL)
+            processes.append(api)
+            wait_until_up(f"{mock_url}/stats", mock)
+            wait_until_up(f"{api_url}/", api)
+            yield api_url, mock_url
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+
+async def run(url: str, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        results = await (open_loop if args.rate else closed_loop)(client, rng, args)
+        return summarize(results, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test for the health coach API")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="API base URL of a running server")
+    target.add_argument("--spawn", action="store_true", help="start the mock LLM and the API locally")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send requests (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="workers, or max outstanding requests with --rate")
+    parser.add_argument("--rate", type=float, default=None, help="open loop: average arrivals per second")
+    parser.add_argument("--users", type=int, default=100, help="distinct userIds in the mix (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", default=None, help="also write the summary to this file")
+    parser.add_argument("--mock-latency", default="lognormal:400,0.5", help="mock time to first token (with --spawn)")
+    parser.add_argument("--mock-tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-error-status", default="500")
+    args = parser.parse_args()
+
+    mode = f"open loop at {args.rate:g} req/s" if args.rate else f"{args.concurrency} workers"
+    if args.spawn:
+        with spawned_stack(args) as (url, mock_url):
+            print(f"🤖 Mock LLM {mock_url} ({args.mock_latency}, error rate {args.mock_error_rate:.1%}) → API {url}")
+            print(f"⏱️ Sending for {args.duration:g} s, {mode}...")
+            summary = asyncio.run(run(url, args))
+            summary["mock_llm"] = httpx.get(f"{mock_url}/stats").json()
+    else:
+        print(f"⏱️ Sending to {args.url} for {args.duration:g} s, {mode}...")
+        summary = asyncio.run(run(args.url, args))
+    summary["settings"] = {key: value for key, value in vars(args).items()}
+
+    print_summary(summary)
+    if "mock_llm" in summary:
+        mock = summary["mock_llm"]
+        print(f"\n🤖 Mock LLM served {mock['requests']:,} completions ({mock['streamed']:,} streamed, "
+              f"{mock['errors']:,} injected errors)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Mock LLM Server
+OpenAI-compatible chat completions stand-in with configurable latency, token rate and injected errors
+
+Point the API at it with LLM_BASE_URL=http://127.0.0.1:8001/v1/ to load-test
+`/ask` without network access or Gemini quota. Each completion waits for a
+time-to-first-token drawn from `--latency`, then produces `--reply-tokens`
+words at `--tokens-per-second` (streamed as chunks when the client asks for
+a stream). A share `--error-rate` of requests fails with one of
+`--error-status`.
+
+Latency specs (milliseconds):
+- fixed:300
+- uniform:100,500
+- normal:300,80
+- lognormal:300,0.5   (median, sigma)
+- exponential:300     (mean)
+
+Run from hello_agent/: python -m benchmarks.mock_llm [--port 8001] [--latency lognormal:400,0.6] [--error-rate 0.02]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+VOCABULARY = (
+    "stay hydrated and aim for seven to nine hours of sleep each night • build meals around lean protein "
+    "vegetables whole grains and healthy fats • start with three strength sessions a week and add ten minutes "
+    "of walking after meals • track how you feel not just the scale 💡 small consistent habits beat short bursts "
+    "of motivation 🎯 check in with a healthcare professional before changing medication or training through pain"
+).split()
+
+ERROR_BODIES = {
+    429: ("Rate limit reached for mock model", "rate_limit_exceeded"),
+    500: ("The mock server had an error while processing your request", "server_error"),
+    503: ("The mock model is overloaded", "server_error"),
+}
+
+
+class LatencyDistribution:
+    """Samples delays in seconds from a spec such as "lognormal:300,0.5" (milliseconds)"""
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, spec: str):
+        kind, _, values = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in values.split(",") if value.strip()]
+        if self.KINDS.get(self.kind) != len(self.params):
+            raise ValueError(f"Unknown latency spec {spec!r}; expected one of {', '.join(self.KINDS)}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            ms = median * rng.lognormvariate(0.0, sigma)
+        else:
+            ms = rng.expovariate(1.0 / self.params[0])
+        return max(ms, 0.0) / 1000
+
+
+class MockLLM:
+    """The simulated model: delays, reply lengths, injected failures and counters"""
+
+    def __init__(self, latency: str = "lognormal:400,0.5", tokens_per_second: float = 60.0,
+                 reply_tokens: str = "60,180", error_rate: float = 0.0, error_statuses: Optional[List[int]] = None,
+                 seed: Optional[int] = None):
+        self.latency = LatencyDistribution(latency)
+        self.tokens_per_second = tokens_per_second
+        low, _, high = reply_tokens.partition(",")
+        self.reply_tokens = (int(low), int(high or low))
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses or [500]
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.streamed = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.tokens = 0
+
+    def reply(self) -> List[str]:
+        count = self.rng.randint(*self.reply_tokens)
+        return [self.rng.choice(VOCABULARY) for _ in range(count)]
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "tokens": self.tokens,
+            "latency": self.latency.spec,
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+        }
+
+
+def prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(str(message.get("content") or "").split()) for message in messages)
+
+
+def completion_id(llm: MockLLM) -> str:
+    return f"chatcmpl-mock-{llm.requests}"
+
+
+def chunk(request_id: str, model: str, delta: Dict[str, Any], finish_reason: Optional[str] = None,
+          usage: Optional[Dict[str, int]] = None) -> str:
+    body = {
+        "id": request_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if usage is None else [],
+    }
+    if usage is not None:
+        body["usage"] = usage
+    return f"data: {json.dumps(body)}\n\n"
+
+
+def create_mock_app(llm: MockLLM) -> FastAPI:
+    app = FastAPI(title="Mock LLM", version="1.0.0")
+
+    async def stream_reply(request_id: str, model: str, words: List[str], usage: Dict[str, int],
+                           include_usage: bool) -> AsyncIterator[str]:
+        llm.in_flight += 1
+        try:
+            await asyncio.sleep(llm.latency.sample(llm.rng))
+            yield chunk(request_id, model, {"role": "assistant", "content": ""})
+            for position, word in enumerate(words):
+                await asyncio.sleep(llm.token_delay())
+                yield chunk(request_id, model, {"content": word if position == 0 else f" {word}"})
+            yield chunk(request_id, model, {}, finish_reason="stop")
+            if include_usage:
+                yield chunk(request_id, model, {}, usage=usage)
+            yield "data: [DONE]\n\n"
+        finally:
+            llm.in_flight -= 1
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        llm.requests += 1
+        request_id = completion_id(llm)
+        model = body.get("model", "mock")
+        if llm.rng.random() < llm.error_rate:
+            llm.errors += 1
+            status = llm.rng.choice(llm.error_statuses)
+            message, kind = ERROR_BODIES.get(status, ("Injected mock failure", "server_error"))
+            return JSONResponse(status_code=status, headers={"retry-after-ms": "100"},
+                                content={"error": {"message": message, "type": kind, "code": status}})
+
+        words = llm.reply()
+        llm.tokens += len(words)
+        usage = {"prompt_tokens": prompt_tokens(body.get("messages", [])), "completion_tokens": len(words)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if body.get("stream"):
+            llm.streamed += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(stream_reply(request_id, model, words, usage, include_usage),
+                                     media_type="text/event-stream")
+        llm.in_flight += 1
+        try:
+            await asyncio.sleep(llm.latency.sample(llm.rng) + llm.token_delay() * len(words))
+        finally:
+            llm.in_flight -= 1
+        return {
+            "id": request_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                         "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    # Clients differ on whether the base URL ends in /v1
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return llm.stats()
+
+    return app
+
+
+def create_mock_llm(**settings) -> MockLLM:
+    """Factory function to create the simulated model"""
+    return MockLLM(**settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="lognormal:400,0.5", help="time to first token (default: %(default)s)")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="0 sends the whole reply at once")
+    parser.add_argument("--reply-tokens", default="60,180", help="min,max words per reply (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--error-status", default="500", help="comma-separated statuses for failures, e.g. 429,500,503")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+    llm = create_mock_llm(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                          reply_tokens=args.reply_tokens, error_rate=args.error_rate,
+                          error_statuses=[int(status) for status in args.error_status.split(",")], seed=args.seed)
+    print(f"🤖 Mock LLM on http://{args.host}:{args.port}/v1/ | latency {args.latency} | "
+          f"{args.tokens_per_second:g} tokens/s | error rate {args.error_rate:.1%}")
+    uvicorn.run(create_mock_app(llm), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Startup Profile
+Import time per module for `import main`, build time of each lazy resource, and time until a fresh API process answers
+
+Each measurement runs in a new interpreter, so nothing is already imported.
+Time-to-first-ready starts a uvicorn process and polls `/` until it answers;
+the first `/users/stats` call after that is timed too, since it builds the
+tools when they were not preloaded. Both are measured lazily and with
+PRELOAD=1.
+
+Run from hello_agent/: python -m benchmarks.startup_profile [--top 15] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_env(**overrides: str) -> Dict[str, str]:
+    env = dict(os.environ, **overrides)
+    # main refuses to import without a key; startup never calls the LLM
+    env.setdefault("GEMINI_API_KEY", "startup-profile")
+    return env
+
+
+def import_times(module: str = "main") -> List[Tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) for every module `import module` loads"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=APP_DIR, env=profile_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_field, cumulative_field, name = line.split("|", 2)
+        name = name[1:]
+        rows.append((name.strip(), int(self_field.split(":")[1]), int(cumulative_field),
+                     (len(name) - len(name.lstrip())) // 2))
+    return rows
+
+
+def package_totals(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Self time summed by top-level package, in µs"""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def lazy_build_times() -> Dict[str, float]:
+    """Build time in ms of each lazy resource in main, warmed in a fresh process"""
+    script = "import json, main, lazy; print(json.dumps(lazy.warm_all()))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, env=profile_env(),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"warming main failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return response.status
+    except OSError:
+        return None
+
+
+def time_to_ready(preload: bool, timeout: float = 60.0) -> Tuple[float, float]:
+    """Milliseconds from starting uvicorn until `/` answers, and for the first `/users/stats` after that"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=profile_env(PRELOAD="1" if preload else "0"),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while _get(f"http://127.0.0.1:{port}/") != 200:
+            if server.poll() is not None or time.perf_counter() - started > timeout:
+                raise RuntimeError("API process did not become ready")
+            time.sleep(0.01)
+        ready_ms = (time.perf_counter() - started) * 1000
+        first = time.perf_counter()
+        _get(f"http://127.0.0.1:{port}/users/stats")
+        return ready_ms, (time.perf_counter() - first) * 1000
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API cold start")
+    parser.add_argument("--top", type=int, default=15, help="modules and packages to list")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per mode (median is reported)")
+    args = parser.parse_args()
+
+    rows = import_times()
+    total_us = next(cumulative for name, _, cumulative, depth in rows if name == "main" and depth == 0)
+    print(f"📦 IMPORT TIME: import main = {total_us / 1000:.0f} ms\n")
+    print("Imported directly by main (cumulative):")
+    direct = sorted((row for row in rows if row[3] == 1), key=lambda row: -row[2])
+    for name, _, cumulative_us, _ in direct[:args.top]:
+        print(f"• {name:<40} {cumulative_us / 1000:8.1f} ms")
+    print("\nBy package (self time, everything main pulls in):")
+    for name, self_us in sorted(package_totals(rows).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"• {name:<40} {self_us / 1000:8.1f} ms")
+
+    print("\n🛠️ LAZY RESOURCES (build time on first use)")
+    for name, build_ms in lazy_build_times().items():
+        print(f"• {name:<40} {build_ms:8.1f} ms")
+
+    print("\n⏱️ TIME TO FIRST READY (uvicorn start → GET / answers)")
+    for preload in (False, True):
+        runs = [time_to_ready(preload) for _ in range(args.runs)]
+        ready = statistics.median(ready_ms for ready_ms, _ in runs)
+        first_tool = statistics.median(first_ms for _, first_ms in runs)
+        label = "PRELOAD=1" if preload else "lazy"
+        print(f"• {label:<10} ready {ready:7.0f} ms | first /users/stats {first_tool:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark Suite
+Per-call latency of the request hot paths at synthetic sizes from 100 to 1M, saved as JSON and compared against a baseline
+
+Sizes mean:
+- text functions (guardrails, goal and diet extraction): prompt length in characters
+- meal planner and workout recommender: plans or routines already saved in the store
+- progress summary: progress records in the history
+
+Each case reports the best and median per-call time over several repeats.
+`compare` flags cases whose median (or best) slowed down by more than the threshold and
+exits with status 1 when there are any, so it can gate a CI job.
+
+Run from hello_agent/:
+    python -m benchmarks.suite run --out results.json [--max-size 10000] [--only planner]
+    python -m benchmarks.suite run --baseline baseline.json     # run, then compare
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.2] [--metric best_us]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# main refuses to import without a key; nothing here calls the LLM
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from benchmarks.bench_progress_tracker import write_history
+from guardrails import create_health_guardrails
+from main import extract_dietary_restrictions, extract_goal_from_prompt
+from tools import create_meal_planner, create_progress_tracker, create_workout_recommender
+from tools.progress_tracker import COLLECTIONS
+from tools.storage import create_journal_store
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+REPEATS = 5
+DEFAULT_THRESHOLD = 0.2
+
+PROMPT_SENTENCES = [
+    "I want to lose 5 kg in 3 months before my wedding.",
+    "Can you make me a vegetarian, gluten-free meal plan with 2000 calories?",
+    "My knee hurts a little after running, is it safe to keep training?",
+    "What is a good beginner strength routine I can do at home three days a week?",
+    "I sleep badly and feel stressed at work, any tips for recovery days?",
+    "How much high-protein food should I eat to build muscle?",
+]
+USER_INFO = {"age": 32, "fitness_level": "intermediate", "health_goals": "weight loss"}
+
+
+class Case(NamedTuple):
+    name: str
+    unit: str
+    # Builds the function to time for one size, given a scratch directory
+    setup: Callable[[int, str], Callable[[], object]]
+
+
+def synthetic_prompt(chars: int) -> str:
+    """Realistic sentences repeated up to `chars` characters"""
+    text = " ".join(PROMPT_SENTENCES)
+    return (text * (chars // len(text) + 1))[:chars]
+
+
+def saved_records_store(scratch: str, name: str, collection: str, collections: List[str], record: Dict, count: int):
+    """Journal store whose snapshot already holds `count` copies of `record`"""
+    path = os.path.join(scratch, f"{name}_{count}.json")
+    document = {key: [] for key in collections}
+    document[collection] = [record] * count
+    with open(path, "w") as f:
+        json.dump(document, f)
+    # No background writer: each call pays for its own journal write
+    return create_journal_store(path, collections)
+
+
+def text_case(name: str, fn: Callable[[str], object]) -> Case:
+    return Case(name, "chars", lambda size, scratch: (lambda prompt=synthetic_prompt(size): fn(prompt)))
+
+
+def meal_planner_setup(size: int, scratch: str) -> Callable[[], object]:
+    saved = {"user_info": USER_INFO, "daily_calories": 1700, "days": 7, "dietary_restrictions": [],
+             "created_date": datetime.now().isoformat(), "mode": "random", "seed": None, "meals": {}}
+    planner = create_meal_planner(store=saved_records_store(scratch, "meal_plans", "plans", ["plans"], saved, size))
+    return lambda: planner.generate_meal_plan(USER_INFO, dietary_restrictions=["vegetarian"])
+
+
+def workout_setup(size: int, scratch: str) -> Callable[[], object]:
+    saved = {"user_info": USER_INFO, "workout_type": "balanced", "focus": "balanced", "seed": None,
+             "created_date": datetime.now().isoformat(), "exercises": {}}
+    recommender = create_workout_recommender(
+        store=saved_records_store(scratch, "workout_routines", "routines", ["routines", "programs"], saved, size))
+    return lambda: recommender.generate_workout_routine(USER_INFO)
+
+
+def progress_summary_setup(size: int, scratch: str) -> Callable[[], object]:
+    path = os.path.join(scratch, f"progress_{size}.json")
+    # One measurement and one workout per history entry
+    write_history(path, max(size // 2, 1))
+    tracker = create_progress_tracker(store=create_journal_store(path, COLLECTIONS))
+    return tracker.get_progress_summary
+
+
+CASES = [
+    text_case("guardrails.validate_user_input", create_health_guardrails().validate_user_input),
+    text_case("extract_goal_from_prompt", extract_goal_from_prompt),
+    text_case("extract_dietary_restrictions", extract_dietary_restrictions),
+    Case("meal_planner.generate_meal_plan", "saved plans", meal_planner_setup),
+    Case("workout_recommender.generate_workout_routine", "saved routines", workout_setup),
+    Case("progress_tracker.get_progress_summary", "records", progress_summary_setup),
+]
+
+
+def time_call(fn: Callable[[], object], repeats: int = REPEATS) -> Dict[str, float]:
+    """Best and median per-call time in µs; each repeat runs enough calls to take about 0.2 s"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = [seconds / number * 1e6 for seconds in timer.repeat(repeat=repeats, number=number)]
+    return {"best_us": min(per_call), "median_us": statistics.median(per_call), "calls": number * repeats}
+
+
+def run(sizes: List[int], only: Optional[str] = None, log: Callable[[str], None] = print) -> Dict:
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for case in CASES:
+            if only and only not in case.name:
+                continue
+            for size in sizes:
+                fn = case.setup(size, scratch)
+                timing = time_call(fn)
+                results.append({"name": case.name, "size": size, "unit": case.unit, **timing})
+                log(f"• {case.name:<46} {size:>9,} {case.unit:<14} median {timing['median_us']:11.1f} µs"
+                    f" | best {timing['best_us']:11.1f} µs")
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": REPEATS,
+        "results": results,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD,
+            metric: str = "median_us") -> List[Dict]:
+    """One row per case in both runs, with the current/baseline ratio and a status"""
+    before = {(row["name"], row["size"]): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        previous = before.get((row["name"], row["size"]))
+        if previous is None:
+            continue
+        ratio = row[metric] / previous[metric] if previous[metric] else float("inf")
+        status = "regressed" if ratio > 1 + threshold else "improved" if ratio < 1 - threshold else "ok"
+        rows.append({"name": row["name"], "size": row["size"], "baseline": previous[metric],
+                     "current": row[metric], "ratio": ratio, "status": status})
+    return rows
+
+
+def print_comparison(rows: List[Dict], threshold: float) -> int:
+    """Print the comparison and return the number of regressions"""
+    marks = {"regressed": "🔴", "improved": "🟢", "ok": "  "}
+    print(f"\n📊 COMPARISON (threshold ±{threshold:.0%})\n")
+    for row in rows:
+        print(f"{marks[row['status']]} {row['name']:<46} {row['size']:>9,} | {row['baseline']:11.1f} → "
+              f"{row['current']:11.1f} µs | {row['ratio']:5.2f}x")
+    regressions = sum(row["status"] == "regressed" for row in rows)
+    print(f"\n{'⚠️' if regressions else '✅'} {regressions} regression(s) across {len(rows)} case(s)")
+    return regressions
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Health coach benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--out", default="benchmark_results.json", help="results file")
+    run_parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=SIZES,
+                            help="comma-separated sizes (default: %(default)s)")
+    run_parser.add_argument("--max-size", type=int, default=None, help="skip sizes above this")
+    run_parser.add_argument("--only", default=None, help="run cases whose name contains this")
+    run_parser.add_argument("--baseline", default=None, help="compare the new results against this file")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="relative slowdown counted as a regression (default: %(default)s)")
+    run_parser.add_argument("--metric", choices=["median_us", "best_us"], default="median_us",
+                            help="per-call time compared (default: %(default)s)")
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relative slowdown counted as a regression (default: %(default)s)")
+    compare_parser.add_argument("--metric", choices=["median_us", "best_us"], default="median_us",
+                                help="per-call time compared (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        rows = compare(load(args.baseline), load(args.current), args.threshold, args.metric)
+        return 1 if print_comparison(rows, args.threshold) else 0
+
+    sizes = [size for size in args.sizes if args.max_size is None or size <= args.max_size]
+    print("⏱️ BENCHMARK SUITE (per call)\n")
+    results = run(sizes, args.only)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {args.out}")
+    if args.baseline:
+        rows = compare(load(args.baseline), results, args.threshold, args.metric)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
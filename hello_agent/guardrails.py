@@ -4,15 +4,160 @@ Filters user input to ensure only health and fitness related questions are proce
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+# Hyphenated words and contractions are also matched part by part
+PART_SEPARATOR = re.compile(r"['-]")
+
+VOWELS = 'aeiou'
+# Suffixes a keyword may carry and still match
+INFLECTIONS = ('s', 'es', 'd', 'ed', 'ing', 'en', 'er', 'ers')
+# Past forms of keyword verbs that no suffix produces
+IRREGULAR_FORMS = {
+    'run': ('ran',),
+    'swim': ('swam', 'swum'),
+    'eat': ('ate',),
+    'drink': ('drank', 'drunk'),
+    'burn': ('burnt',),
+    'lose': ('lost',),
+    'sleep': ('slept',),
+}
+
+
+class KeywordIndex:
+    """
+    Compiled keyword lists: a hash map for single words and a token trie for phrases.
+
+    One scan of the input yields a score for every category, where a score is the
+    number of list entries found in the input (the same count the original
+    `sum(1 for keyword in keywords if keyword in text)` produced).
+
+    Matching is done on word boundaries, which fixes the substring false hits of
+    the original checks ("ai" in "pain", "eat" in "great", "fit" in "benefit",
+    "how" in "show", "age" in "page", "rest" in "interest", ...). To keep the
+    intended matches a keyword also matches its inflected forms ("workouts",
+    "walked", "trained", "stretching", "dieting", "eaten", "jogging", "hiked"),
+    "-ation" nouns match their verb ("hydrated"), a few irregular verbs match
+    their past forms ("swam", "ran", "ate"), and each part of a hyphenated
+    word or contraction is matched on its own ("gluten-free" matches "gluten",
+    "what's" matches "what").
+
+    Remaining differences from the original substring checks, besides the
+    mid-word hits above: compounds ("bodyweight") and other derivations
+    ("healthier") no longer match, and the irregular and "-e"/"-ation" forms
+    match where the substrings did not.
+    """
+
+    PHRASE_END = ""
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = list(categories)
+        # keyword -> {category: number of times it appears in that category's list}
+        self.weights: Dict[str, Dict[str, int]] = {}
+        # token (including inflected forms) -> keywords it completes
+        self.words: Dict[str, Tuple[str, ...]] = {}
+        self.phrases: Dict = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                weights = self.weights.setdefault(keyword, {})
+                weights[category] = weights.get(category, 0) + 1
+                self.add_keyword(keyword)
+
+    @staticmethod
+    def forms(token: str) -> Tuple[str, ...]:
+        """The token plus the plural and verb forms that should also match it"""
+        forms = [token] + [token + suffix for suffix in INFLECTIONS]
+        if token.endswith('ation') and len(token) > 7:
+            # hydration -> hydrate, hydrated; vaccination -> vaccinating
+            verb = token[:-5] + 'ate'
+            forms += [verb] + [verb[:-1] + suffix for suffix in INFLECTIONS if suffix[0] in 'aeiou']
+        elif token.endswith('e'):
+            # hike -> hiking, exercise -> exercised
+            forms += [token[:-1] + suffix for suffix in INFLECTIONS if suffix[0] in 'aeiou']
+        elif len(token) > 2 and token[-1] not in VOWELS + 'wxy' and token[-2] in VOWELS:
+            # jog -> jogging, swim -> swimmer, squat -> squatted
+            forms += [token + token[-1] + suffix for suffix in INFLECTIONS if suffix[0] in 'aeiou']
+        elif len(token) > 2 and token.endswith('y') and token[-2] not in VOWELS:
+            # study -> studies, studied
+            forms += [token[:-1] + 'ies', token[:-1] + 'ied']
+        return tuple(dict.fromkeys(forms + list(IRREGULAR_FORMS.get(token, ()))))
+
+    def add_keyword(self, keyword: str):
+        *head, last = TOKEN_PATTERN.findall(keyword.lower())
+        if not head:
+            for form in self.forms(last):
+                if keyword not in self.words.get(form, ()):
+                    self.words[form] = self.words.get(form, ()) + (keyword,)
+            return
+        node = self.phrases
+        for token in head:
+            node = node.setdefault(token, {})
+        for form in self.forms(last):
+            node.setdefault(form, {})[self.PHRASE_END] = keyword
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        tokens = []
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            tokens.append(token)
+            if '-' in token or "'" in token:
+                tokens.extend(PART_SEPARATOR.split(token))
+        return tokens
+
+    def find(self, text: str) -> set:
+        """Return the set of keywords present in the text"""
+        tokens = self.tokenize(text)
+        found = set()
+        words, phrases, end = self.words, self.phrases, self.PHRASE_END
+        for position, token in enumerate(tokens):
+            keywords = words.get(token)
+            if keywords is not None:
+                found.update(keywords)
+            node = phrases.get(token)
+            while node is not None and position + 1 < len(tokens):
+                position += 1
+                node = node.get(tokens[position])
+                if node is not None and end in node:
+                    found.add(node[end])
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Score every category in a single scan"""
+        scores = dict.fromkeys(self.categories, 0)
+        for keyword in self.find(text):
+            for category, weight in self.weights[keyword].items():
+                scores[category] += weight
+        return scores
+
 
 class HealthGuardrails:
+    _keyword_index: Optional[KeywordIndex] = None
+
     def __init__(self):
         self.health_keywords = self.load_health_keywords()
         self.fitness_keywords = self.load_fitness_keywords()
         self.nutrition_keywords = self.load_nutrition_keywords()
         self.off_topic_keywords = self.load_off_topic_keywords()
+        self.keyword_index = self.load_keyword_index()
         
+    def load_keyword_index(self) -> KeywordIndex:
+        """Compile every keyword list once per process"""
+        if HealthGuardrails._keyword_index is None:
+            HealthGuardrails._keyword_index = KeywordIndex({
+                "health": self.health_keywords,
+                "fitness": self.fitness_keywords,
+                "nutrition": self.nutrition_keywords,
+                "off_topic": self.off_topic_keywords,
+                "health_indicators": self.load_health_indicators(),
+                "inquiry": ['help', 'advice', 'recommend', 'suggest', 'what', 'how', 'why', 'when', 'where'],
+                "redirect_tech": ['ai', 'artificial intelligence', 'programming', 'coding'],
+                "redirect_finance": ['business', 'money', 'finance', 'investment'],
+                "redirect_politics": ['politics', 'government', 'news', 'current events'],
+                "redirect_entertainment": ['movie', 'tv', 'music', 'entertainment', 'game'],
+            })
+        return HealthGuardrails._keyword_index
+    
     def load_health_keywords(self) -> List[str]:
         """Load health-related keywords"""
         return [
@@ -182,43 +327,44 @@ class HealthGuardrails:
             'home', 'house', 'car', 'vehicle', 'transportation'
         ]
     
-    def is_health_fitness_related(self, user_input: str) -> Tuple[bool, str]:
+    def load_health_indicators(self) -> List[str]:
+        """Load common health-related words that might be misspelled or inflected"""
+        return [
+            'calorie', 'calories', 'burn', 'burning', 'weight', 'exercise', 'workout',
+            'diet', 'food', 'eat', 'eating', 'health', 'fit', 'fitness', 'body',
+            'muscle', 'fat', 'lose', 'gain', 'train', 'training', 'gym', 'run',
+            'walk', 'jog', 'swim', 'bike', 'cycle', 'yoga', 'stretch', 'strength',
+            'cardio', 'protein', 'vitamin', 'mineral', 'supplement', 'meal', 'snack',
+            'breakfast', 'lunch', 'dinner', 'water', 'drink', 'hydration'
+        ]
+    
+    def score_input(self, user_input: str) -> Dict[str, int]:
+        """Score the input against every keyword category in one scan"""
+        return self.keyword_index.scores(user_input)
+    
+    def is_health_fitness_related(self, user_input: str, scores: Optional[Dict[str, int]] = None) -> Tuple[bool, str]:
         """
         Check if user input is health and fitness related
         Returns: (is_related, reason)
         """
-        input_lower = user_input.lower()
+        scores = scores or self.score_input(user_input)
         
         # Check for health, fitness, or nutrition keywords
-        health_score = sum(1 for keyword in self.health_keywords if keyword in input_lower)
-        fitness_score = sum(1 for keyword in self.fitness_keywords if keyword in input_lower)
-        nutrition_score = sum(1 for keyword in self.nutrition_keywords if keyword in input_lower)
-        
-        total_health_score = health_score + fitness_score + nutrition_score
+        total_health_score = scores['health'] + scores['fitness'] + scores['nutrition']
         
         # Check for off-topic keywords
-        off_topic_score = sum(1 for keyword in self.off_topic_keywords if keyword in input_lower)
+        off_topic_score = scores['off_topic']
         
         # Much more lenient approach - if there's ANY health/fitness content, allow it
         if total_health_score > 0:
             return True, "Health/fitness related question"
         
         # Check for common health-related words that might be misspelled
-        health_indicators = [
-            'calorie', 'calories', 'burn', 'burning', 'weight', 'exercise', 'workout',
-            'diet', 'food', 'eat', 'eating', 'health', 'fit', 'fitness', 'body',
-            'muscle', 'fat', 'lose', 'gain', 'train', 'training', 'gym', 'run',
-            'walk', 'jog', 'swim', 'bike', 'cycle', 'yoga', 'stretch', 'strength',
-            'cardio', 'protein', 'vitamin', 'mineral', 'supplement', 'meal', 'snack',
-            'breakfast', 'lunch', 'dinner', 'water', 'drink', 'hydration'
-        ]
-        
-        if any(word in input_lower for word in health_indicators):
+        if scores['health_indicators']:
             return True, "Health/fitness related (including common variations)"
         
         # Check for general inquiry patterns that might be health-related
-        inquiry_words = ['help', 'advice', 'recommend', 'suggest', 'what', 'how', 'why', 'when', 'where']
-        if any(word in input_lower for word in inquiry_words):
+        if scores['inquiry']:
             # If it's a question and doesn't contain obvious off-topic keywords, allow it
             if off_topic_score == 0:
                 return True, "General inquiry - likely health-related"
@@ -230,13 +376,13 @@ class HealthGuardrails:
         # Default to allowing the question
         return True, "General question - allowing for health coaching"
     
-    def get_redirection_message(self, user_input: str) -> str:
+    def get_redirection_message(self, user_input: str, scores: Optional[Dict[str, int]] = None) -> str:
         """Generate a polite redirection message for off-topic questions"""
         
         # Check what type of off-topic question it is
-        input_lower = user_input.lower()
+        scores = scores or self.score_input(user_input)
         
-        if any(word in input_lower for word in ['ai', 'artificial intelligence', 'programming', 'coding']):
+        if scores['redirect_tech']:
             return """
 🤖 I'm a specialized Health & Wellness Coach, so I can't help with AI or programming questions.
 
@@ -251,7 +397,7 @@ class HealthGuardrails:
 🎯 Please ask me about health, fitness, nutrition, or wellness topics!
 """
         
-        elif any(word in input_lower for word in ['business', 'money', 'finance', 'investment']):
+        elif scores['redirect_finance']:
             return """
 💰 I'm a Health & Wellness Coach, not a financial advisor.
 
@@ -266,7 +412,7 @@ class HealthGuardrails:
 🎯 Please ask me about health, fitness, or wellness topics!
 """
         
-        elif any(word in input_lower for word in ['politics', 'government', 'news', 'current events']):
+        elif scores['redirect_politics']:
             return """
 📰 I'm a Health & Wellness Coach, so I can't discuss politics or current events.
 
@@ -281,7 +427,7 @@ class HealthGuardrails:
 🎯 Please ask me about health, fitness, or wellness topics!
 """
         
-        elif any(word in input_lower for word in ['movie', 'tv', 'music', 'entertainment', 'game']):
+        elif scores['redirect_entertainment']:
             return """
 🎬 I'm a Health & Wellness Coach, not an entertainment expert.
 
@@ -328,7 +474,8 @@ class HealthGuardrails:
                 'should_proceed': True
             }
         
-        is_related, reason = self.is_health_fitness_related(user_input)
+        scores = self.score_input(user_input)
+        is_related, reason = self.is_health_fitness_related(user_input, scores)
         
         if is_related:
             return {
@@ -339,7 +486,7 @@ class HealthGuardrails:
         else:
             return {
                 'is_valid': False,
-                'message': self.get_redirection_message(user_input),
+                'message': self.get_redirection_message(user_input, scores),
                 'should_proceed': False
             }
 
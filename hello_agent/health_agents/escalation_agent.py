@@ -3,14 +3,15 @@ Escalation Agent
 Handles requests to speak with human support and provides escalation procedures
 """
 
-import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from tools.storage import RecordStore, create_store
 
 class EscalationAgent:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None):
         self.escalation_log_file = "escalation_log.json"
-        self.escalation_log = self.load_escalation_log()
+        self.store = store or create_store(self.escalation_log_file, ["escalations"])
         self.support_contacts = {
             "general": {
                 "phone": "1-800-HEALTH-1",
@@ -34,19 +35,6 @@ class EscalationAgent:
             }
         }
     
-    def load_escalation_log(self) -> Dict:
-        """Load escalation log from file"""
-        try:
-            with open(self.escalation_log_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"escalations": [], "created_date": datetime.now().isoformat()}
-    
-    def save_escalation_log(self):
-        """Save escalation log to file"""
-        with open(self.escalation_log_file, 'w') as f:
-            json.dump(self.escalation_log, f, indent=2)
-    
     def handle_escalation_request(self, user_info: Dict, reason: str = "General inquiry") -> str:
         """Handle escalation request and provide human support options"""
         
@@ -58,8 +46,7 @@ class EscalationAgent:
             "status": "pending"
         }
         
-        self.escalation_log["escalations"].append(escalation_entry)
-        self.save_escalation_log()
+        self.store.append("escalations", escalation_entry)
         
         response = f"""
 🔄 ESCALATION REQUEST HANDLED
@@ -107,12 +94,12 @@ Your escalation request has been logged and will be followed up within 24 hours.
     
     def get_escalation_history(self) -> str:
         """Get escalation request history"""
-        if not self.escalation_log["escalations"]:
+        if not self.store.count("escalations"):
             return "📝 No escalation requests recorded."
         
         history = "📋 ESCALATION REQUEST HISTORY\n\n"
         
-        for i, escalation in enumerate(self.escalation_log["escalations"], 1):
+        for i, escalation in enumerate(self.store.all("escalations"), 1):
             date = datetime.fromisoformat(escalation["timestamp"]).strftime("%B %d, %Y at %I:%M %p")
             history += f"{i}. {date}\n"
             history += f"   Reason: {escalation['reason']}\n"
@@ -121,6 +108,6 @@ Your escalation request has been logged and will be followed up within 24 hours.
         
         return history
 
-def create_escalation_agent() -> EscalationAgent:
+def create_escalation_agent(store: Optional[RecordStore] = None) -> EscalationAgent:
     """Factory function to create an escalation agent instance"""
-    return EscalationAgent() 
\ No newline at end of file
+    return EscalationAgent(store) 
\ No newline at end of file
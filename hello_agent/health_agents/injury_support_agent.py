@@ -3,29 +3,17 @@ Injury Support Agent
 Provides guidance for injuries, pain management, and when to seek medical attention
 """
 
-import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from tools.storage import RecordStore, create_store
 
 class InjurySupportAgent:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None):
         self.injury_log_file = "injury_log.json"
-        self.injury_log = self.load_injury_log()
+        self.store = store or create_store(self.injury_log_file, ["injuries"])
         self.injury_guidelines = self.load_injury_guidelines()
     
-    def load_injury_log(self) -> Dict:
-        """Load injury log from file"""
-        try:
-            with open(self.injury_log_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"injuries": [], "created_date": datetime.now().isoformat()}
-    
-    def save_injury_log(self):
-        """Save injury log to file"""
-        with open(self.injury_log_file, 'w') as f:
-            json.dump(self.injury_log, f, indent=2)
-    
     def load_injury_guidelines(self) -> Dict:
         """Load injury assessment guidelines"""
         return {
@@ -69,8 +57,7 @@ class InjurySupportAgent:
             "status": "assessed"
         }
         
-        self.injury_log["injuries"].append(injury_entry)
-        self.save_injury_log()
+        self.store.append("injuries", injury_entry)
         
         # Assess severity based on symptoms
         severity_level = self.determine_severity(symptoms)
@@ -211,12 +198,12 @@ class InjurySupportAgent:
     
     def get_injury_history(self) -> str:
         """Get injury history"""
-        if not self.injury_log["injuries"]:
+        if not self.store.count("injuries"):
             return "📝 No injury reports recorded."
         
         history = "📋 INJURY HISTORY\n\n"
         
-        for i, injury in enumerate(self.injury_log["injuries"], 1):
+        for i, injury in enumerate(self.store.all("injuries"), 1):
             date = datetime.fromisoformat(injury["timestamp"]).strftime("%B %d, %Y at %I:%M %p")
             history += f"{i}. {date}\n"
             history += f"   Injury: {injury['injury_description']}\n"
@@ -225,6 +212,6 @@ class InjurySupportAgent:
         
         return history
 
-def create_injury_support_agent() -> InjurySupportAgent:
+def create_injury_support_agent(store: Optional[RecordStore] = None) -> InjurySupportAgent:
     """Factory function to create an injury support agent instance"""
-    return InjurySupportAgent() 
\ No newline at end of file
+    return InjurySupportAgent(store) 
\ No newline at end of file
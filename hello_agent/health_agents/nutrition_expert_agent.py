@@ -3,29 +3,17 @@ Nutrition Expert Agent
 Provides detailed nutritional advice, meal planning, and dietary recommendations
 """
 
-import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from tools.storage import RecordStore, create_store
+
 class NutritionExpertAgent:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None):
         self.nutrition_log_file = "nutrition_log.json"
-        self.nutrition_log = self.load_nutrition_log()
+        self.store = store or create_store(self.nutrition_log_file, ["consultations"])
         self.nutrition_database = self.load_nutrition_database()
     
-    def load_nutrition_log(self) -> Dict:
-        """Load nutrition log from file"""
-        try:
-            with open(self.nutrition_log_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"consultations": [], "created_date": datetime.now().isoformat()}
-    
-    def save_nutrition_log(self):
-        """Save nutrition log to file"""
-        with open(self.nutrition_log_file, 'w') as f:
-            json.dump(self.nutrition_log, f, indent=2)
-    
     def load_nutrition_database(self) -> Dict:
         """Load nutrition database"""
         return {
@@ -102,8 +90,7 @@ class NutritionExpertAgent:
             "status": "consulted"
         }
         
-        self.nutrition_log["consultations"].append(consultation_entry)
-        self.save_nutrition_log()
+        self.store.append("consultations", consultation_entry)
         
         response = f"""
 🥗 NUTRITION EXPERT CONSULTATION
@@ -366,12 +353,12 @@ class NutritionExpertAgent:
     
     def get_nutrition_history(self) -> str:
         """Get nutrition consultation history"""
-        if not self.nutrition_log["consultations"]:
+        if not self.store.count("consultations"):
             return "📝 No nutrition consultations recorded."
         
         history = "📋 NUTRITION CONSULTATION HISTORY\n\n"
         
-        for i, consultation in enumerate(self.nutrition_log["consultations"], 1):
+        for i, consultation in enumerate(self.store.all("consultations"), 1):
             date = datetime.fromisoformat(consultation["timestamp"]).strftime("%B %d, %Y at %I:%M %p")
             history += f"{i}. {date}\n"
             history += f"   Question: {consultation['nutrition_question']}\n"
@@ -380,6 +367,6 @@ class NutritionExpertAgent:
         
         return history
 
-def create_nutrition_expert_agent() -> NutritionExpertAgent:
+def create_nutrition_expert_agent(store: Optional[RecordStore] = None) -> NutritionExpertAgent:
     """Factory function to create a nutrition expert agent instance"""
-    return NutritionExpertAgent() 
\ No newline at end of file
+    return NutritionExpertAgent(store) 
\ No newline at end of file
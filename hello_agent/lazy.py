@@ -0,0 +1,91 @@
+"""
+Lazy Resources
+Objects built on first use instead of at import, so the API process starts accepting connections sooner
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Every lazy resource in the process, in creation order, for warm-up and startup reports
+_registry: List["Lazy"] = []
+
+
+class Lazy:
+    """
+    Stand-in for an object that is built by `build()` the first time one of
+    its attributes is used (or when it is warmed). The build runs once, even
+    when several threads hit it together, and its duration is recorded.
+    Resources in `requires` are built first.
+    """
+
+    def __init__(self, name: str, build: Callable[[], Any], requires: Sequence["Lazy"] = ()):
+        self._name = name
+        self._build = build
+        self._requires = list(requires)
+        self._value: Optional[Any] = None
+        self._built = False
+        self._build_ms: Optional[float] = None
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def get(self) -> Any:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    for requirement in self._requires:
+                        requirement.get()
+                    started = time.perf_counter()
+                    self._value = self._build()
+                    self._build_ms = (time.perf_counter() - started) * 1000
+                    self._built = True
+        return self._value
+
+    async def aget(self) -> Any:
+        """`get` for async code: a first build runs in a thread so the event loop keeps serving"""
+        if self._built:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only reached for attributes Lazy itself does not define
+        return getattr(self.get(), attribute)
+
+    def __repr__(self) -> str:
+        return f"<Lazy {self._name} ({'built' if self._built else 'not built'})>"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    @property
+    def build_ms(self) -> Optional[float]:
+        return self._build_ms
+
+
+def lazy(name: str, build: Callable[[], Any], requires: Sequence[Lazy] = ()) -> Lazy:
+    """Register an object to be built on first use"""
+    return Lazy(name, build, requires)
+
+
+def lazy_import(name: str, module: str, factory: str, requires: Sequence[Lazy] = (), **kwargs) -> Lazy:
+    """Register `module.factory(**kwargs)`; the module itself is only imported on first use"""
+    return Lazy(name, lambda: getattr(importlib.import_module(module), factory)(**kwargs), requires)
+
+
+def warm_all() -> Dict[str, float]:
+    """Build every registered resource now, returning build times in ms"""
+    for resource in _registry:
+        resource.get()
+    return build_report()
+
+
+def build_report() -> Dict[str, Optional[float]]:
+    """Build time in ms of each registered resource (None if it has not been built yet)"""
+    return {resource.name: resource.build_ms for resource in _registry}
@@ -0,0 +1,194 @@
+"""
+LLM Dispatcher
+Bounded-concurrency gate in front of every agent run, with a bounded wait queue and priority lanes
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Lanes in the order they are served; anything not listed goes to "normal"
+LANES = ["urgent", "normal"]
+
+
+class LLMOverloaded(Exception):
+    """Raised when the wait queue is full; callers should answer 503 with Retry-After"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM capacity exhausted, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class LaneStats:
+    """Wait-time counters for one priority lane"""
+
+    __slots__ = ("admitted", "rejected", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def to_dict(self, queued: int) -> Dict[str, Any]:
+        return {
+            "queued": queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 2),
+        }
+
+
+class LLMDispatcher:
+    """
+    Admission control for agent runs on one event loop.
+
+    At most `max_in_flight` runs execute at once. Further callers wait in a
+    FIFO per lane, with "urgent" always served before "normal". Once
+    `max_queue` callers are waiting, new ones are rejected immediately with
+    LLMOverloaded instead of piling more latency onto everyone; an arrival
+    in a higher lane instead displaces the newest waiter of a lower lane,
+    so a queue full of general chat never turns urgent prompts away.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 32, lanes: Optional[List[str]] = None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.lanes = lanes or LANES
+        self.queues: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in self.lanes}
+        self.lane_stats: Dict[str, LaneStats] = {lane: LaneStats() for lane in self.lanes}
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        # Exponentially weighted average run time, used to estimate Retry-After
+        self.avg_run_seconds = 2.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def lane(self, name: Optional[str]) -> str:
+        return name if name in self.queues else "normal"
+
+    def lower_lanes(self, lane: str) -> List[str]:
+        """Lanes served after `lane`, lowest priority first"""
+        return list(reversed(self.lanes[self.lanes.index(lane) + 1:]))
+
+    def is_saturated(self, lane: str = "normal") -> bool:
+        """True when a new caller in `lane` would be rejected right now"""
+        lane = self.lane(lane)
+        return (self.in_flight >= self.max_in_flight and self.queued >= self.max_queue
+                and not any(self.queues[lower] for lower in self.lower_lanes(lane)))
+
+    def displace(self, lane: str) -> bool:
+        """Reject the newest waiter of the lowest lane below `lane` to make room; False if there is none"""
+        for lower in self.lower_lanes(lane):
+            queue = self.queues[lower]
+            while queue:
+                waiter = queue.pop()
+                if not waiter.done():
+                    waiter.set_exception(LLMOverloaded(self.retry_after()))
+                    self.lane_stats[lower].rejected += 1
+                    return True
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = (self.queued + 1) / max(self.max_in_flight, 1)
+        return min(60, max(1, math.ceil(backlog * self.avg_run_seconds)))
+
+    async def acquire(self, lane: str = "normal"):
+        """Wait for a run slot in the given lane"""
+        lane = self.lane(lane)
+        stats = self.lane_stats[lane]
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            stats.admitted += 1
+            return
+        if self.queued >= self.max_queue and not self.displace(lane):
+            stats.rejected += 1
+            raise LLMOverloaded(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self.queues[lane]
+        queue.append(waiter)
+        started = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                # release() or displace() may already have popped it while skipping done waiters
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+            else:
+                # The slot was handed over just before we were cancelled
+                self.release()
+            raise
+        waited = time.perf_counter() - started
+        stats.admitted += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+
+    def release(self):
+        """Hand the slot to the next waiter, highest-priority lane first"""
+        for lane in self.lanes:
+            queue = self.queues[lane]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "normal") -> AsyncIterator[None]:
+        """Hold a run slot for the duration of the block"""
+        await self.acquire(lane)
+        started = time.perf_counter()
+        try:
+            yield
+            self.completed += 1
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.avg_run_seconds = 0.8 * self.avg_run_seconds + 0.2 * (time.perf_counter() - started)
+            self.release()
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], lane: str = "normal") -> Any:
+        """Await `fn()` once a slot in `lane` is free"""
+        async with self.slot(lane):
+            return await fn()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and throughput counters"""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_run_ms": round(1000 * self.avg_run_seconds, 2),
+            "lanes": {lane: self.lane_stats[lane].to_dict(len(self.queues[lane])) for lane in self.lanes},
+        }
+
+
+def create_llm_dispatcher() -> LLMDispatcher:
+    """
+    Factory function to create the dispatcher from the environment.
+
+    LLM_MAX_IN_FLIGHT caps concurrent agent runs; LLM_MAX_QUEUE caps how many
+    requests may wait for one before new ones get a 503.
+    """
+    return LLMDispatcher(
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+        max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+    )
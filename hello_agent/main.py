@@ -1,71 +1,120 @@
 import os
 from dotenv import load_dotenv, find_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, AsyncIterator, Optional, List, Dict, Any
 import re
 import json
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from types import SimpleNamespace
 
-# Import agents/tools
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
-from agents.run import RunConfig
-from tools import (
-    create_goal_analyzer,
-    create_meal_planner,
-    create_progress_tracker,
-    create_workout_recommender
-)
-from health_agents.escalation_agent import create_escalation_agent
-from health_agents.injury_support_agent import create_injury_support_agent
-from health_agents.nutrition_expert_agent import create_nutrition_expert_agent
+# Import agents/tools; the agents SDK, tools and specialized agents are imported on first use
+from lazy import lazy, lazy_import, warm_all
+from metrics import MetricsMiddleware, create_metrics
 from guardrails import create_health_guardrails
+from router import create_intent_router
+from response_cache import cache_allowed, create_response_cache
+from singleflight import create_singleflight
+from llm_dispatcher import LLMOverloaded, create_llm_dispatcher
+from tool_executor import create_tool_executor
+
+if TYPE_CHECKING:
+    from user_state import UserState
 
 # Load environment variables
 load_dotenv(find_dotenv())
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
+# Any OpenAI-compatible endpoint works, e.g. the local mock server for load tests (benchmarks.mock_llm)
+llm_base_url = os.getenv("LLM_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
+llm_model = os.getenv("LLM_MODEL", "gemini-2.0-flash")
 
-# Setup client and model
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+# Latency of each request stage, served at /metrics and in Server-Timing headers
+metrics = create_metrics()
 
-# Initialize tools and agents
-goal_analyzer = create_goal_analyzer()
-meal_planner = create_meal_planner()
-progress_tracker = create_progress_tracker()
-workout_recommender = create_workout_recommender()
-escalation_agent = create_escalation_agent()
-injury_support_agent = create_injury_support_agent()
-nutrition_expert_agent = create_nutrition_expert_agent()
+# Initialize tools and agents. Tools, specialized agents and the LLM client
+# are built on first use, or at startup when PRELOAD=1.
+def report_store_writes():
+    """Time every store's disk writes as `persist.<backend>` stages"""
+    from tools.storage import set_write_observer
+    set_write_observer(lambda backend, seconds: metrics.record(f"persist.{backend}", seconds))
+
+def build_user_states():
+    """Shared tools for requests without a userId, and the cache of per-user tools"""
+    from tools import (
+        create_goal_analyzer,
+        create_meal_planner,
+        create_progress_tracker,
+        create_workout_recommender
+    )
+    from user_state import UserState, create_user_state_cache
+    meal_planner = create_meal_planner(plan_cache=plan_cache.get())
+    workout_recommender = create_workout_recommender(plan_cache=plan_cache.get())
+    # Requests with a userId get that user's own stores; requests without one share these tools
+    return create_user_state_cache(
+        meal_planner, workout_recommender,
+        default=UserState(None, create_goal_analyzer(), meal_planner, create_progress_tracker(), workout_recommender)
+    )
+
+store_metrics = lazy("store_metrics", report_store_writes)
+plan_cache = lazy_import("plan_cache", "tools.plan_cache", "create_plan_cache")
+user_states = lazy("user_states", build_user_states, requires=[store_metrics])
+escalation_agent = lazy_import("escalation_agent", "health_agents.escalation_agent", "create_escalation_agent",
+                               requires=[store_metrics])
+injury_support_agent = lazy_import("injury_support_agent", "health_agents.injury_support_agent",
+                                   "create_injury_support_agent", requires=[store_metrics])
+nutrition_expert_agent = lazy_import("nutrition_expert_agent", "health_agents.nutrition_expert_agent",
+                                     "create_nutrition_expert_agent", requires=[store_metrics])
 guardrails = create_health_guardrails()
+intent_router = create_intent_router()
+response_cache = create_response_cache()
+llm_flights = create_singleflight()
+llm_dispatcher = create_llm_dispatcher()
+tool_executor = create_tool_executor()
+
+# Gauges and totals read from the components' own counters at scrape time
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of each cache that exists yet, with its hits and misses under common names"""
+    caches = {"response": response_cache.stats()}
+    if plan_cache.built:
+        caches["plan"] = plan_cache.stats()
+    if user_states.built:
+        users = user_states.stats()
+        caches["user_state"] = dict(users, misses=users["loads"])
+    return caches
 
-# In-memory storage for workout logs (replace with file/database for persistence)
-workout_logs = []
+metrics.add_gauge("cache_hit_ratio", "Share of lookups answered from each cache",
+                  lambda: [({"cache": name}, stats["hit_rate"]) for name, stats in cache_stats().items()])
+metrics.add_gauge("cache_lookups_total", "Cache lookups by result", lambda: [
+    ({"cache": name, "result": result}, stats[key])
+    for name, stats in cache_stats().items() for result, key in (("hit", "hits"), ("miss", "misses"))
+], kind="counter")
+metrics.add_gauge("llm_in_flight", "Agent runs holding a dispatcher slot", lambda: llm_dispatcher.in_flight)
+metrics.add_gauge("llm_queued", "Requests waiting for an agent run slot", lambda: llm_dispatcher.queued)
+metrics.add_gauge("llm_max_in_flight", "Concurrent agent runs allowed", lambda: llm_dispatcher.max_in_flight)
+metrics.add_gauge("llm_runs_total", "Finished agent runs by result", lambda: [
+    ({"result": "completed"}, llm_dispatcher.completed), ({"result": "failed"}, llm_dispatcher.failed)
+], kind="counter")
+metrics.add_gauge("tool_calls_running", "Tool calls running on the tool thread pool", lambda: tool_executor.running)
+metrics.add_gauge("tool_calls_waiting", "Tool calls waiting for a tool thread", lambda: tool_executor.waiting)
 
 # Pydantic model for workout log
 class WorkoutLogData(BaseModel):
+    userId: Optional[str] = None
     date: str
     workout_type: str
+    duration: Optional[int] = None
+    calories_burned: Optional[int] = None
     notes: Optional[str] = None
 
 # Health coach agent
-health_coach_agent = Agent(
-        name="Health Coach",
-    instructions="""
+HEALTH_COACH_INSTRUCTIONS = """
 You are a friendly and knowledgeable health and wellness coach with access to specialized tools and agents. Your role is to:
 1. Provide personalized health, fitness, and wellness advice based on the user's age and health information
 2. Use the available tools to help users:
@@ -109,12 +158,41 @@ TOOL USAGE:
 - When users report injuries or pain, the system will use the Injury Support Agent
 - When users want to speak with humans, the system will use the Escalation Agent
 - All tools are used automatically based on user intent - no need to manually specify tool usage
-""",
+"""
+
+def build_llm() -> SimpleNamespace:
+    """Import the agents SDK and set up the Gemini client, model and health coach agent"""
+    from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
+    from agents.run import RunConfig
+    from openai.types.responses import ResponseTextDeltaEvent
+
+    # Setup client and model
+    external_client = AsyncOpenAI(
+        api_key=gemini_api_key,
+        base_url=llm_base_url,
+    )
+    model = OpenAIChatCompletionsModel(
+        model=llm_model,
+        openai_client=external_client
+    )
+    config = RunConfig(
+        model=model,
+        model_provider=external_client,
+        tracing_disabled=True
+    )
+    health_coach_agent = Agent(
+        name="Health Coach",
+        instructions=HEALTH_COACH_INSTRUCTIONS,
         model=model
     )
+    return SimpleNamespace(client=external_client, model=model, config=config, agent=health_coach_agent,
+                           Runner=Runner, ResponseTextDeltaEvent=ResponseTextDeltaEvent)
+
+llm = lazy("llm", build_llm)
 
 # Pydantic models
 class ChatRequest(BaseModel):
+    userId: Optional[str] = None
     prompt: str
     userInfo: Optional[Dict[str, Any]] = None
 class ChatResponse(BaseModel):
@@ -127,11 +205,23 @@ class UserProfile(BaseModel):
     healthGoals: Optional[str] = None
     equipment: Optional[List[str]] = None
 class MealPlanRequest(BaseModel):
+    userId: Optional[str] = None
     dietaryRestrictions: Optional[List[str]] = None
     userInfo: Optional[Dict[str, Any]] = None
+    optimize: Optional[bool] = False
+    seed: Optional[int] = None
 class WorkoutRequest(BaseModel):
+    userId: Optional[str] = None
     userInfo: Optional[Dict[str, Any]] = None
+    seed: Optional[int] = None
+class ProgramRequest(BaseModel):
+    userId: Optional[str] = None
+    userInfo: Optional[Dict[str, Any]] = None
+    weeks: int = 8
+    sessionsPerWeek: int = 3
+    seed: Optional[int] = None
 class ProgressData(BaseModel):
+    userId: Optional[str] = None
     date: str
     weight: Optional[float] = None
     bodyFat: Optional[float] = None
@@ -139,13 +229,25 @@ class ProgressData(BaseModel):
     waist: Optional[float] = None
     notes: Optional[str] = None
 class GoalData(BaseModel):
+    userId: Optional[str] = None
     goalType: str
     target: str
     timeframe: str
     userInfo: Optional[Dict[str, Any]] = None
 
 # FastAPI app
-app = FastAPI(title="Health Coach API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.getenv("PRELOAD", "0") != "0":
+        # Build everything before accepting connections, so no request pays for it
+        timings = await asyncio.to_thread(warm_all)
+        print(f"🔥 Preloaded {len(timings)} resources in {sum(timings.values()):.0f} ms")
+    yield
+    # Write back every loaded user's queued changes
+    if user_states.built:
+        user_states.close()
+
+app = FastAPI(title="Health Coach API", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins for now, you can restrict this later
@@ -153,6 +255,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 @app.get("/")
 async def root():
@@ -165,88 +268,128 @@ def extract_calorie_target(prompt: str) -> int:
         return int(match.group(1))
     return None
 
+def run_user_tool(user_id: Optional[str], tool: str, method: str, *args, **kwargs) -> Any:
+    """Call a method of one of the user's tools, leasing the user's state for the call"""
+    with metrics.span(f"tool.{tool}"), user_states.use(user_id) as state:
+        return getattr(getattr(state, tool), method)(*args, **kwargs)
+
+def answer_from_tools(request: ChatRequest, route) -> Optional[ChatResponse]:
+    """Answer prompts routed to a tool or specialized agent; None means fall back to the LLM"""
+    if needs_agent(route):
+        return None
+    with metrics.span(f"tool.{route.primary}"), user_states.use(request.userId) as state:
+        return answer_from_user_tools(request, route, state)
+
+def answer_from_user_tools(request: ChatRequest, route, state: "UserState") -> Optional[ChatResponse]:
+    """answer_from_tools against one user's tools"""
+    # Escalation
+    if route.primary == "escalation":
+        result = escalation_agent.handle_escalation_request(request.userInfo or {}, request.prompt)
+        return ChatResponse(response=result, success=True)
+    # Injury
+    if route.primary == "injury":
+        result = injury_support_agent.assess_injury(request.userInfo or {}, request.prompt, [])
+        return ChatResponse(response=result, success=True)
+    # Meal plan
+    if route.primary == "meal_plan":
+        dietary_restrictions = extract_dietary_restrictions(request.prompt)
+        calorie_target = extract_calorie_target(request.prompt)
+        if not calorie_target or not dietary_restrictions:
+            return ChatResponse(
+                response="To create a personalized meal plan, please tell me your daily calorie target (e.g., 2200 calories) and any dietary restrictions (e.g., vegetarian, vegan, gluten-free, etc.).",
+                success=False
+            )
+        # Pass calorie_target and dietary_restrictions to the meal planner if both are provided
+        user_info = request.userInfo or {}
+        user_info['calorie_target'] = calorie_target
+        result = state.meal_planner.generate_meal_plan(user_info, dietary_restrictions=dietary_restrictions)
+        return ChatResponse(response=result, success=True)
+    # Nutrition
+    if route.primary == "nutrition":
+        result = nutrition_expert_agent.provide_nutrition_consultation(request.userInfo or {}, request.prompt, None)
+        return ChatResponse(response=result, success=True)
+    # Goal
+    if route.primary == "goal":
+        goal_info = extract_goal_from_prompt(request.prompt)
+        print(f"[DEBUG] Extracted goal_info: {goal_info}")  # Log extracted goal info
+        if goal_info and 'target' in goal_info and 'timeframe' in goal_info:
+            print("[DEBUG] Calling set_smart_goal with:", goal_info)
+            # Use set_smart_goal when we have complete goal information
+            result = state.goal_analyzer.set_smart_goal(
+                goal_type=goal_info.get('type', 'general'),
+                target=goal_info['target'],
+                timeframe=goal_info['timeframe']
+            )
+            return ChatResponse(response=result, success=True)
+        elif goal_info:
+            print("[DEBUG] Calling analyze_user_input with userInfo:", request.userInfo)
+            # Use analyze_user_input when we have partial goal information
+            result = state.goal_analyzer.analyze_user_input(request.userInfo or {})
+            return ChatResponse(response=result, success=True)
+        else:
+            print("[DEBUG] No goal info extracted from prompt.")
+            return ChatResponse(response="To set a goal, please specify: goal type, target, and timeframe", success=True)
+    # Progress
+    if route.primary == "progress":
+        result = state.progress_tracker.get_progress_summary()
+        return ChatResponse(response=result, success=True)
+    # Workout
+    if route.primary == "workout":
+        result = state.workout_recommender.generate_workout_routine(request.userInfo or {})
+        return ChatResponse(response=result, success=True)
+    return None
+
+def needs_agent(route) -> bool:
+    """True when answer_from_tools leaves the prompt to the health coach agent"""
+    return route.primary is None or route.primary == "urgent_care"
+
+def build_agent_context(request: ChatRequest) -> str:
+    """Prompt sent to the health coach agent for questions no tool handles"""
+    return f"User Information: {request.userInfo or 'Not specified'}\n\nUser Question: {request.prompt}"
+
+async def run_health_coach(request: ChatRequest, cache_key: str, may_store: bool, lane: str) -> str:
+    """Ask the health coach agent once a dispatcher slot is free, and cache its answer"""
+    coach = await llm.aget()
+    queued = time.perf_counter()
+    async with llm_dispatcher.slot(lane):
+        metrics.record("llm_queue", time.perf_counter() - queued)
+        with metrics.span("llm"):
+            result = await coach.Runner.run(coach.agent, build_agent_context(request), run_config=coach.config)
+    if may_store and result.final_output:
+        await response_cache.aset(cache_key, result.final_output)
+    return result.final_output
+
 @app.post("/ask", response_model=ChatResponse)
-async def ask_health_coach(request: ChatRequest):
+async def ask_health_coach(request: ChatRequest, response: Response,
+                           cache_control: Optional[str] = Header(None)):
     try:
-        validation_result = guardrails.validate_user_input(request.prompt)
+        with metrics.span("guardrails"):
+            validation_result = guardrails.validate_user_input(request.prompt)
         if not validation_result['should_proceed']:
             return ChatResponse(
                 response=validation_result['message'],
                 success=False,
                 error="Invalid input"
             )
-        # Escalation
-        if any(word in request.prompt.lower() for word in ['human', 'speak to', 'talk to', 'real person', 'agent', 'representative']):
-            result = escalation_agent.handle_escalation_request(request.userInfo or {}, request.prompt)
-            return ChatResponse(response=result, success=True)
-        # Injury
-        if any(word in request.prompt.lower() for word in ['injury', 'pain', 'hurt', 'sprain', 'strain', 'broken', 'fracture', 'swelling', 'bruise']):
-            result = injury_support_agent.assess_injury(request.userInfo or {}, request.prompt, [])
-            return ChatResponse(response=result, success=True)
-        # Meal/Nutrition
-        meal_nutrition_keywords = [
-            'meal plan', 'meal planning', 'weekly meal', 'daily meal', 'food plan', 'eating plan',
-            'nutrition', 'diet', 'vitamin', 'mineral', 'supplement', 'protein', 'carbohydrate', 'fat', 'eating',
-            'calories', 'macros', 'meal prep', 'diet plan', 'nutrition plan', 'food', 'nutrition advice'
-        ]
-        if any(keyword in request.prompt.lower() for keyword in meal_nutrition_keywords):
-            meal_plan_keywords = ['meal plan', 'meal planning', 'weekly meal', 'daily meal', 'food plan', 'eating plan', 'meal prep', 'diet plan']
-            if any(keyword in request.prompt.lower() for keyword in meal_plan_keywords):
-                dietary_restrictions = extract_dietary_restrictions(request.prompt)
-                calorie_target = extract_calorie_target(request.prompt)
-                if not calorie_target or not dietary_restrictions:
-                    return ChatResponse(
-                        response="To create a personalized meal plan, please tell me your daily calorie target (e.g., 2200 calories) and any dietary restrictions (e.g., vegetarian, vegan, gluten-free, etc.).",
-                        success=False
-                    )
-                # Pass calorie_target and dietary_restrictions to the meal planner if both are provided
-                user_info = request.userInfo or {}
-                user_info['calorie_target'] = calorie_target
-                result = meal_planner.generate_meal_plan(user_info, dietary_restrictions=dietary_restrictions)
-                return ChatResponse(response=result, success=True)
-            else:
-                result = nutrition_expert_agent.provide_nutrition_consultation(request.userInfo or {}, request.prompt, None)
-                return ChatResponse(response=result, success=True)
-        # Goal
-        goal_keywords = ['goal', 'gain', 'lose', 'weight', 'muscle', 'fitness', 'target', 'achieve']
-        has_goal_keyword = any(keyword in request.prompt.lower() for keyword in goal_keywords)
-        if has_goal_keyword or 'analyze' in request.prompt.lower() or 'set' in request.prompt.lower():
-            goal_info = extract_goal_from_prompt(request.prompt)
-            print(f"[DEBUG] Extracted goal_info: {goal_info}")  # Log extracted goal info
-            if goal_info and 'target' in goal_info and 'timeframe' in goal_info:
-                print("[DEBUG] Calling set_smart_goal with:", goal_info)
-                # Use set_smart_goal when we have complete goal information
-                result = goal_analyzer.set_smart_goal(
-                    goal_type=goal_info.get('type', 'general'),
-                    target=goal_info['target'],
-                    timeframe=goal_info['timeframe']
-                )
-                return ChatResponse(response=result, success=True)
-            elif goal_info:
-                print("[DEBUG] Calling analyze_user_input with userInfo:", request.userInfo)
-                # Use analyze_user_input when we have partial goal information
-                result = goal_analyzer.analyze_user_input(request.userInfo or {})
-                return ChatResponse(response=result, success=True)
-            else:
-                print("[DEBUG] No goal info extracted from prompt.")
-                return ChatResponse(response="To set a goal, please specify: goal type, target, and timeframe", success=True)
-        # Progress
-        if any(word in request.prompt.lower() for word in ['progress', 'track', 'measurement', 'weight', 'body fat', 'measure', 'log', 'record', 'monitor', 'check progress', 'how am i doing', 'my progress']):
-            result = progress_tracker.get_progress_summary()
-            workout_count = get_logged_workouts_count()
-            if "Workouts:" in result:
-                result = result.replace("Workouts: 0 sessions", f"Workouts: {workout_count} sessions")
-            else:
-                result += f"\n💪 Workouts: {workout_count} sessions"
-            return ChatResponse(response=result, success=True)
-        # Workout
-        if any(word in request.prompt.lower() for word in ['workout', 'exercise', 'training', 'routine', 'fitness', 'gym', 'strength', 'cardio', 'aerobics', 'sports', 'activity', 'movement', 'training plan', 'exercise plan']):
-            result = workout_recommender.generate_workout_routine(request.userInfo or {})
-            return ChatResponse(response=result, success=True)
-        # Fallback: use agent
-        context = f"User Information: {request.userInfo or 'Not specified'}\n\nUser Question: {request.prompt}"
-        result = await Runner.run(health_coach_agent, context, run_config=config)
-        return ChatResponse(response=result.final_output, success=True)
+        with metrics.span("routing"):
+            route = intent_router.classify(request.prompt)
+        routed = await tool_executor.call(answer_from_tools, request, route)
+        if routed is not None:
+            return routed
+        # Fallback: use agent, answering repeated questions from the response cache
+        may_read, may_store = cache_allowed(cache_control)
+        cache_key = response_cache.make_key(request.prompt, request.userInfo)
+        if may_read:
+            cached = await response_cache.aget(cache_key)
+            if cached is not None:
+                response.headers["X-Cache"] = "HIT"
+                return ChatResponse(response=cached, success=True)
+        # Concurrent identical questions share a single agent run
+        answer = await llm_flights.do(cache_key, lambda: run_health_coach(request, cache_key, may_store, route.lane))
+        response.headers["X-Cache"] = "MISS" if may_read else "BYPASS"
+        return ChatResponse(response=answer, success=True)
+    except LLMOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         print(f"[ERROR] Exception in /ask endpoint: {str(e)}")
         print(f"[ERROR] Exception type: {type(e).__name__}")
@@ -258,6 +401,120 @@ async def ask_health_coach(request: ChatRequest):
             error=str(e)
         )
 
+# --- Streaming ---
+# Tool and cached answers are already complete, so they are sent in line-aligned chunks of about this size
+STREAM_CHUNK_SIZE = 400
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def chunk_text(text: str, size: int = STREAM_CHUNK_SIZE) -> List[str]:
+    """Split text on line boundaries into chunks of roughly `size` characters"""
+    chunks, current = [], ""
+    for line in text.splitlines(keepends=True):
+        if current and len(current) + len(line) > size:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def stream_ask(request: ChatRequest, cache_control: Optional[str]) -> AsyncIterator[str]:
+    """Yield `delta` events with the answer text, then a `done` event with the outcome"""
+    stream = None
+    try:
+        with metrics.span("guardrails"):
+            validation_result = guardrails.validate_user_input(request.prompt)
+        if not validation_result['should_proceed']:
+            for chunk in chunk_text(validation_result['message']):
+                yield sse_event("delta", {"text": chunk})
+            yield sse_event("done", {"success": False, "error": "Invalid input", "route": None, "cache": None})
+            return
+        with metrics.span("routing"):
+            route = intent_router.classify(request.prompt)
+        routed = await tool_executor.call(answer_from_tools, request, route)
+        if routed is not None:
+            for chunk in chunk_text(routed.response):
+                yield sse_event("delta", {"text": chunk})
+            yield sse_event("done", {"success": routed.success, "error": routed.error, "route": route.primary, "cache": None})
+            return
+        # Fallback: stream the agent's tokens as they arrive
+        may_read, may_store = cache_allowed(cache_control)
+        cache_key = response_cache.make_key(request.prompt, request.userInfo)
+        if may_read:
+            cached = await response_cache.aget(cache_key)
+            if cached is not None:
+                for chunk in chunk_text(cached):
+                    yield sse_event("delta", {"text": chunk})
+                yield sse_event("done", {"success": True, "error": None, "route": "agent", "cache": "HIT"})
+                return
+        coach = await llm.aget()
+        queued = time.perf_counter()
+        async with llm_dispatcher.slot(route.lane):
+            metrics.record("llm_queue", time.perf_counter() - queued)
+            with metrics.span("llm"):
+                stream = coach.Runner.run_streamed(coach.agent, build_agent_context(request), run_config=coach.config)
+                async for event in stream.stream_events():
+                    if event.type == "raw_response_event" and isinstance(event.data, coach.ResponseTextDeltaEvent) and event.data.delta:
+                        yield sse_event("delta", {"text": event.data.delta})
+        if may_store and stream.final_output:
+            await response_cache.aset(cache_key, stream.final_output)
+        yield sse_event("done", {"success": True, "error": None, "route": "agent", "cache": "MISS" if may_read else "BYPASS"})
+    except LLMOverloaded as e:
+        # Lost the race for the last queue place after the endpoint's saturation check
+        yield sse_event("done", {"success": False, "error": str(e), "route": "agent", "cache": None, "retry_after": e.retry_after})
+    except Exception as e:
+        print(f"[ERROR] Exception in /ask/stream endpoint: {str(e)}")
+        yield sse_event("done", {"success": False, "error": str(e), "route": None, "cache": None})
+    finally:
+        # Stop generating tokens for clients that disconnected mid-answer
+        if stream is not None and not stream.is_complete:
+            stream.cancel()
+
+@app.post("/ask/stream")
+async def ask_health_coach_stream(request: ChatRequest, cache_control: Optional[str] = Header(None)):
+    # Reject LLM-bound prompts before the 200 status goes out; the stream itself may still wait in the queue
+    route = intent_router.classify(request.prompt)
+    if needs_agent(route) and llm_dispatcher.is_saturated(route.lane):
+        retry_after = llm_dispatcher.retry_after()
+        raise HTTPException(status_code=503, detail="LLM capacity exhausted", headers={"Retry-After": str(retry_after)})
+    return StreamingResponse(
+        stream_ask(request, cache_control),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of stage latencies, cache hit ratios and LLM load"""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return response_cache.stats()
+
+@app.get("/singleflight/stats")
+async def get_singleflight_stats():
+    return llm_flights.stats()
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    return llm_dispatcher.stats()
+
+@app.get("/tools/stats")
+async def get_tool_stats():
+    return tool_executor.stats()
+
+@app.get("/users/stats")
+async def get_user_state_stats():
+    return (await user_states.aget()).stats()
+
+@app.get("/plans/cache/stats")
+async def get_plan_cache_stats():
+    return (await plan_cache.aget()).stats()
+
 @app.get("/profile", response_model=UserProfile)
 async def get_user_profile():
     return UserProfile()
@@ -270,7 +527,11 @@ async def update_user_profile(profile: UserProfile):
 async def get_meal_plan(request: MealPlanRequest):
     try:
         dietary_restrictions = request.dietaryRestrictions or []
-        result = meal_planner.generate_meal_plan(request.userInfo or {}, dietary_restrictions=dietary_restrictions)
+        result = await tool_executor.call(
+            run_user_tool, request.userId, "meal_planner", "generate_meal_plan",
+            request.userInfo or {}, dietary_restrictions=dietary_restrictions,
+            mode="optimize" if request.optimize else "random", seed=request.seed
+        )
         return {"mealPlan": result, "success": True}
     except Exception as e:
         return {"error": str(e), "success": False}
@@ -278,15 +539,40 @@ async def get_meal_plan(request: MealPlanRequest):
 @app.post("/workout")
 async def get_workout_routine(request: WorkoutRequest):
     try:
-        result = workout_recommender.generate_workout_routine(request.userInfo or {})
+        result = await tool_executor.call(
+            run_user_tool, request.userId, "workout_recommender", "generate_workout_routine",
+            request.userInfo or {}, seed=request.seed
+        )
         return {"workout": result, "success": True}
     except Exception as e:
         return {"error": str(e), "success": False}
 
+@app.post("/program")
+async def create_program(request: ProgramRequest):
+    try:
+        result = await tool_executor.call(
+            run_user_tool, request.userId, "workout_recommender", "generate_program", request.userInfo or {},
+            weeks=request.weeks, sessions_per_week=request.sessionsPerWeek, seed=request.seed
+        )
+        return {"program": result, "success": True}
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+@app.get("/program/{program_id}/week/{week}")
+async def get_program_week(program_id: int, week: int, userId: Optional[str] = None):
+    try:
+        result = await tool_executor.call(
+            run_user_tool, userId, "workout_recommender", "get_program_week", program_id, week
+        )
+        return {"week": result, "success": True}
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
 @app.post("/progress")
 async def track_progress(data: ProgressData):
     try:
-        result = progress_tracker.add_measurement(
+        result = await tool_executor.call(
+            run_user_tool, data.userId, "progress_tracker", "add_measurement",
             data.date, 
             data.weight, 
             data.bodyFat, 
@@ -298,10 +584,30 @@ async def track_progress(data: ProgressData):
     except Exception as e:
         return {"error": str(e), "success": False}
 
+@app.get("/progress/trends")
+async def get_progress_trends(targetWeight: Optional[float] = None, targetBodyFat: Optional[float] = None,
+                              userId: Optional[str] = None):
+    try:
+        result = await tool_executor.call(
+            run_user_tool, userId, "progress_tracker", "get_measurement_trends", targetWeight, targetBodyFat
+        )
+        return {"trends": result, "success": True}
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+@app.post("/progress/rollups/backfill")
+async def backfill_progress_rollups(userId: Optional[str] = None):
+    try:
+        result = await tool_executor.call(run_user_tool, userId, "progress_tracker", "backfill_rollups")
+        return {"rebuilt": result, "success": True}
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
 @app.post("/goal")
 async def set_goal(data: GoalData):
     try:
-        result = goal_analyzer.set_smart_goal(
+        result = await tool_executor.call(
+            run_user_tool, data.userId, "goal_analyzer", "set_smart_goal",
             goal_type=data.goalType,
             target=data.target,
             timeframe=data.timeframe
@@ -317,9 +623,18 @@ async def log_workout(data: WorkoutLogData):
         datetime.strptime(data.date, "%Y-%m-%d")
     except ValueError:
         return {"error": "Invalid date format. Use YYYY-MM-DD.", "success": False}
-    # Store the workout log
-    workout_logs.append(data.dict())
-    return {"message": "Workout logged successfully!", "success": True}
+    try:
+        await tool_executor.call(
+            run_user_tool, data.userId, "progress_tracker", "add_workout",
+            data.date,
+            data.workout_type,
+            data.duration or 0,
+            data.calories_burned,
+            data.notes or ""
+        )
+        return {"message": "Workout logged successfully!", "success": True}
+    except Exception as e:
+        return {"error": str(e), "success": False}
 
 # --- Helper functions ---
 def extract_dietary_restrictions(prompt: str) -> list:
@@ -375,20 +690,6 @@ def extract_goal_from_prompt(prompt: str) -> dict:
             break
     return goal_info
 
-# Update the progress summary in progress_tracker.get_progress_summary if possible
-# For now, add a helper to count logged workouts in the last 30 days
-def get_logged_workouts_count():
-    now = datetime.now()
-    count = 0
-    for log in workout_logs:
-        try:
-            log_date = datetime.strptime(log["date"], "%Y-%m-%d")
-            if (now - log_date).days <= 30:
-                count += 1
-        except Exception:
-            continue
-    return count
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
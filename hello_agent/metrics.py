@@ -0,0 +1,206 @@
+"""
+Metrics
+Per-route, per-stage latency histograms, Server-Timing headers and a Prometheus text endpoint
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond tool calls to slow LLM runs
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# A gauge reads either one number, or (labels, value) pairs for a labelled family
+GaugeValue = Union[float, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    """Counts of observations per bucket (not cumulative; the exposition adds them up)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += seconds
+            self.count += 1
+
+
+class RequestTimings:
+    """
+    Stage durations of one request. Spans are buffered until the response
+    starts, when the matched route is known; later spans (e.g. while a
+    stream is being sent) go straight to the histograms.
+    """
+
+    __slots__ = ("route", "spans", "started")
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.spans: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+
+
+# Timings of the request being handled; copied into tool threads by the tool executor
+_current_request: ContextVar[Optional[RequestTimings]] = ContextVar("current_request", default=None)
+
+
+class Span:
+    """Times a `with` block as one stage"""
+
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """
+    Latency histograms keyed by (route, stage), plus gauges read at scrape time.
+
+    Stages are timed with `span(stage)` or reported with `record(stage, seconds)`
+    from anywhere in a request, including tool threads. Work outside any
+    request, such as background disk writes, is filed under the route
+    "background".
+    """
+
+    def __init__(self, namespace: str = "health_coach", buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.gauges: List[Tuple[str, str, str, Callable[[], GaugeValue]]] = []
+        self._lock = threading.Lock()
+
+    def span(self, stage: str) -> Span:
+        return Span(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        timings = _current_request.get()
+        if timings is None:
+            self.observe("background", stage, seconds)
+        elif timings.route is None:
+            timings.spans.append((stage, seconds))
+        else:
+            self.observe(timings.route, stage, seconds)
+
+    def observe(self, route: str, stage: str, seconds: float):
+        histogram = self.histograms.get((route, stage))
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault((route, stage), Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def add_gauge(self, name: str, help_text: str, read: Callable[[], GaugeValue], kind: str = "gauge"):
+        """Expose `read()` at every scrape; `kind` may be "counter" for monotonic totals"""
+        self.gauges.append((name, help_text, kind, read))
+
+    # --- Requests ---
+    def start_request(self) -> Tuple[RequestTimings, Any]:
+        timings = RequestTimings()
+        return timings, _current_request.set(timings)
+
+    def end_request(self, token: Any):
+        _current_request.reset(token)
+
+    def finish(self, timings: RequestTimings, route: str) -> str:
+        """File a request's buffered spans under its route and return its Server-Timing header value"""
+        total = time.perf_counter() - timings.started
+        timings.route = route
+        spans, timings.spans = timings.spans, []
+        per_stage: Dict[str, float] = {}
+        for stage, seconds in spans:
+            self.observe(route, stage, seconds)
+            per_stage[stage] = per_stage.get(stage, 0.0) + seconds
+        self.observe(route, "total", total)
+        per_stage["total"] = total
+        return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in per_stage.items())
+
+    # --- Exposition ---
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        name = f"{self.namespace}_stage_seconds"
+        lines.append(f"# HELP {name} Time spent in each stage of a request, by route")
+        lines.append(f"# TYPE {name} histogram")
+        for (route, stage), histogram in sorted(self.histograms.items()):
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            labels = f'route="{_escape(route)}",stage="{_escape(stage)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {total}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        for gauge_name, help_text, kind, read in self.gauges:
+            full_name = f"{self.namespace}_{gauge_name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            value = read()
+            if isinstance(value, list):
+                for labels, sample in value:
+                    rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                    lines.append(f"{full_name}{{{rendered}}} {sample}")
+            else:
+                lines.append(f"{full_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that opens a RequestTimings for each HTTP request and adds
+    a Server-Timing header listing the stages that ran before the response
+    started. Routes are labelled by their path template, so `/program/{program_id}/week/{week}`
+    is one series however many programs exist.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings, token = self.metrics.start_request()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                header = self.metrics.finish(timings, getattr(route, "path", "unmatched"))
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.end_request(token)
+
+
+def create_metrics() -> Metrics:
+    """Factory function to create the metrics registry"""
+    return Metrics()
@@ -0,0 +1,255 @@
+"""
+Response Cache
+TTL + LRU cache for LLM fallback answers, with an optional SQLite tier that survives restarts
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Anything that is not a letter, digit or whitespace is dropped before keying
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Expired and overflowing disk rows are pruned at most this often (seconds); reads skip expired rows anyway
+PRUNE_INTERVAL = 60
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    prompt = PUNCTUATION_PATTERN.sub(" ", prompt.lower())
+    return WHITESPACE_PATTERN.sub(" ", prompt).strip()
+
+
+def canonicalize_user_info(user_info: Optional[Dict[str, Any]]) -> Any:
+    """Drop empty values and normalize strings so equivalent profiles share a key"""
+    if isinstance(user_info, dict):
+        canonical = {}
+        for key, value in user_info.items():
+            value = canonicalize_user_info(value)
+            if value not in (None, "", [], {}):
+                canonical[str(key)] = value
+        return canonical
+    if isinstance(user_info, (list, tuple)):
+        return [canonicalize_user_info(value) for value in user_info]
+    if isinstance(user_info, str):
+        return user_info.strip().lower()
+    return user_info
+
+
+class ResponseCache:
+    """
+    In-process LRU of recent answers, bounded by entry count and age.
+
+    When `db_path` is set, every answer is also written to SQLite and misses
+    in memory fall through to disk, so a restarted server starts warm.
+    Code on the event loop should use `aget`/`aset`, which run the disk tier
+    in a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.pruned_at = 0.0
+        if self.db_path:
+            self.create_schema()
+
+    # --- Keys ---
+    def make_key(self, prompt: str, user_info: Optional[Dict[str, Any]] = None) -> str:
+        """Hash of the normalized prompt and the canonical user info"""
+        payload = json.dumps(
+            [normalize_prompt(prompt), canonicalize_user_info(user_info or {})],
+            sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # --- Lookups ---
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response, or None on a miss"""
+        now = time.time()
+        response = self.get_from_memory(key, now)
+        if response is not None:
+            return response
+        return self.finish_lookup(key, self.load_from_disk(key, now))
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Like get, with the disk read off the event loop"""
+        now = time.time()
+        response = self.get_from_memory(key, now)
+        if response is not None:
+            return response
+        entry = await asyncio.to_thread(self.load_from_disk, key, now) if self.db_path else None
+        return self.finish_lookup(key, entry)
+
+    def get_from_memory(self, key: str, now: float) -> Optional[str]:
+        """Fresh response from the in-memory tier, counted as a hit"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            created, response = entry
+            if now - created <= self.ttl_seconds:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self.entries[key]
+            return None
+
+    def finish_lookup(self, key: str, entry: Optional[Tuple[float, str]]) -> Optional[str]:
+        """Count a memory miss as a disk hit or a miss, promoting disk hits into memory"""
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.hits += 1
+            self.remember(key, entry)
+            return entry[1]
+
+    def set(self, key: str, response: str):
+        """Store a response in memory and, when configured, on disk"""
+        created = time.time()
+        with self._lock:
+            self.remember(key, (created, response))
+        self.save_to_disk(key, created, response)
+
+    async def aset(self, key: str, response: str):
+        """Like set, with the disk write off the event loop"""
+        created = time.time()
+        with self._lock:
+            self.remember(key, (created, response))
+        if self.db_path:
+            await asyncio.to_thread(self.save_to_disk, key, created, response)
+
+    def remember(self, key: str, entry: Tuple[float, str]):
+        """Insert into the LRU and evict the least recently used entries (caller holds the lock)"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached response, in memory and on disk"""
+        with self._lock:
+            self.entries.clear()
+        if self.db_path:
+            self.connection.execute("DELETE FROM response_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "disk_tier": bool(self.db_path),
+            }
+
+    # --- Disk tier ---
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread, as sqlite3 connections are not shareable"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def create_schema(self):
+        """Create the cache table if it does not exist yet"""
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                response TEXT NOT NULL
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_created ON response_cache (created)")
+
+    def load_from_disk(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        """Read a fresh entry from SQLite"""
+        if not self.db_path:
+            return None
+        try:
+            row = self.connection.execute(
+                "SELECT created, response FROM response_cache WHERE key = ? AND created >= ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Response cache read failed: {e}")
+            return None
+        return (row[0], row[1]) if row else None
+
+    def save_to_disk(self, key: str, created: float, response: str):
+        """Upsert an entry, pruning expired or overflowing rows every PRUNE_INTERVAL seconds"""
+        if not self.db_path:
+            return
+        try:
+            connection = self.connection
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, created, response) VALUES (?, ?, ?)",
+                (key, created, response)
+            )
+            if created - self.pruned_at < PRUNE_INTERVAL:
+                return
+            self.pruned_at = created
+            connection.execute("DELETE FROM response_cache WHERE created < ?", (created - self.ttl_seconds,))
+            connection.execute("""
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY created DESC LIMIT -1 OFFSET ?
+                )""", (self.max_disk_entries,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Response cache write failed: {e}")
+
+
+def cache_allowed(cache_control: Optional[str]) -> Tuple[bool, bool]:
+    """
+    Interpret a request's Cache-Control header as (may_read, may_store).
+
+    `no-cache` skips the lookup but still refreshes the entry; `no-store`
+    bypasses the cache entirely.
+    """
+    directives = {part.strip().lower() for part in (cache_control or "").split(",")}
+    if "no-store" in directives:
+        return False, False
+    if "no-cache" in directives:
+        return False, True
+    return True, True
+
+
+def create_response_cache() -> ResponseCache:
+    """
+    Factory function to create the response cache from the environment.
+
+    RESPONSE_CACHE_SIZE and RESPONSE_CACHE_TTL bound the in-memory tier;
+    RESPONSE_CACHE_DB enables the on-disk tier.
+    """
+    return ResponseCache(
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+        ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+        db_path=os.getenv("RESPONSE_CACHE_DB") or None,
+    )
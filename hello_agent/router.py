@@ -0,0 +1,154 @@
+"""
+Intent Router
+Classifies a prompt into coaching intents with a single Aho-Corasick pass over every keyword lexicon
+"""
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Keyword lexicons, matched as plain substrings of the lowercased prompt
+INTENT_LEXICONS = {
+    "escalation": ['human', 'speak to', 'talk to', 'real person', 'agent', 'representative'],
+    "injury": ['injury', 'pain', 'hurt', 'sprain', 'strain', 'broken', 'fracture', 'swelling', 'bruise'],
+    "meal_plan": ['meal plan', 'meal planning', 'weekly meal', 'daily meal', 'food plan', 'eating plan',
+                  'meal prep', 'diet plan'],
+    "nutrition": [
+        'meal plan', 'meal planning', 'weekly meal', 'daily meal', 'food plan', 'eating plan',
+        'nutrition', 'diet', 'vitamin', 'mineral', 'supplement', 'protein', 'carbohydrate', 'fat', 'eating',
+        'calories', 'macros', 'meal prep', 'diet plan', 'nutrition plan', 'food', 'nutrition advice'
+    ],
+    "goal": ['goal', 'gain', 'lose', 'weight', 'muscle', 'fitness', 'target', 'achieve', 'analyze', 'set'],
+    "progress": ['progress', 'track', 'measurement', 'weight', 'body fat', 'measure', 'log', 'record', 'monitor',
+                 'check progress', 'how am i doing', 'my progress'],
+    "workout": ['workout', 'exercise', 'training', 'routine', 'fitness', 'gym', 'strength', 'cardio', 'aerobics',
+                'sports', 'activity', 'movement', 'training plan', 'exercise plan'],
+    # Symptoms no tool answers; they still reach the LLM, but ahead of general chat
+    "urgent_care": ['dizzy', 'dizziness', 'faint', 'chest tightness', 'shortness of breath', "can't breathe",
+                    'palpitation', 'numbness', 'bleeding', 'emergency', 'urgent'],
+}
+
+# Routing order: the first matched intent in this list handles the prompt
+INTENT_PRIORITY = ["escalation", "injury", "meal_plan", "nutrition", "goal", "progress", "workout", "urgent_care"]
+
+# Intents whose LLM runs are dispatched in the urgent lane
+URGENT_INTENTS = {"escalation", "injury", "urgent_care"}
+
+
+class IntentMatch(NamedTuple):
+    intent: str
+    keyword: str
+    start: int
+    end: int
+
+
+class RouteResult:
+    """All intents found in a prompt, with the spans of the keywords that matched"""
+
+    def __init__(self, matches: List[IntentMatch], priority: List[str]):
+        self.matches = matches
+        self.intents = {match.intent for match in matches}
+        self.primary = next((intent for intent in priority if intent in self.intents), None)
+
+    def has(self, intent: str) -> bool:
+        return intent in self.intents
+
+    def keywords(self, intent: str) -> List[str]:
+        return [match.keyword for match in self.matches if match.intent == intent]
+
+    def spans(self, intent: str) -> List[Tuple[int, int]]:
+        return [(match.start, match.end) for match in self.matches if match.intent == intent]
+
+    @property
+    def lane(self) -> str:
+        """LLM dispatcher lane for this prompt"""
+        return "urgent" if self.intents & URGENT_INTENTS else "normal"
+
+
+class IntentRouter:
+    """
+    Aho-Corasick automaton compiled once from all intent lexicons.
+
+    A keyword shared by several lexicons (e.g. "weight") is stored once and
+    reports every intent it belongs to. Matching is substring-based, exactly
+    like the `keyword in prompt.lower()` checks it replaces.
+    """
+
+    def __init__(self, lexicons: Optional[Dict[str, List[str]]] = None,
+                 priority: Optional[List[str]] = None):
+        self.lexicons = lexicons or INTENT_LEXICONS
+        self.priority = priority or INTENT_PRIORITY
+        self.compile()
+
+    def compile(self):
+        """Build the goto, failure and output tables"""
+        keyword_intents: Dict[str, List[str]] = {}
+        for intent, keywords in self.lexicons.items():
+            for keyword in keywords:
+                intents = keyword_intents.setdefault(keyword.lower(), [])
+                if intent not in intents:
+                    intents.append(intent)
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[str, Tuple[str, ...]]]] = [[]]
+        for keyword, intents in keyword_intents.items():
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((keyword, tuple(intents)))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        # Fold the failure links into a complete transition table (a DFA), so the
+        # scan does a single dict lookup per character and never backtracks
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            table = dict(transitions[fail[state]])
+            table.update(goto[state])
+            transitions[state] = table
+            queue.extend(goto[state].values())
+
+        self.transitions = transitions
+        self.outputs = {state: output for state, output in enumerate(outputs) if output}
+
+    def classify(self, prompt: str) -> RouteResult:
+        """Return every matched intent in one linear pass over the lowercased prompt"""
+        transitions, outputs = self.transitions, self.outputs
+        matches = []
+        state = 0
+        for position, char in enumerate(prompt.lower()):
+            state = transitions[state].get(char, 0)
+            if state in outputs:
+                end = position + 1
+                for keyword, intents in outputs[state]:
+                    for intent in intents:
+                        matches.append(IntentMatch(intent, keyword, end - len(keyword), end))
+        return RouteResult(matches, self.priority)
+
+
+_default_router: Optional[IntentRouter] = None
+
+
+def create_intent_router() -> IntentRouter:
+    """Factory function returning the process-wide intent router"""
+    global _default_router
+    if _default_router is None:
+        _default_router = IntentRouter()
+    return _default_router
@@ -0,0 +1,85 @@
+"""
+Singleflight
+Coalesces concurrent identical async calls so they share one in-flight result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class Flight:
+    """One in-flight call and the number of requests awaiting it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key call deduplication for a single event loop.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same task. Results and exceptions are delivered to every waiter.
+    A waiter that is cancelled only detaches itself, and the shared call is
+    cancelled once nobody is left waiting for it.
+    """
+
+    def __init__(self):
+        self.flights: Dict[str, Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn()` for `key`, or join the call already running for it"""
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = Flight(asyncio.ensure_future(fn()))
+            self.flights[key] = flight
+            flight.task.add_done_callback(lambda task, key=key, flight=flight: self.finish(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        self.max_waiters = max(self.max_waiters, flight.waiters)
+
+        try:
+            # Shield so one waiter's cancellation does not cancel the shared call
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def finish(self, key: str, flight: Flight):
+        """Forget a completed call so the next request starts a fresh one"""
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        # Mark the exception as retrieved when every waiter had already left
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def waiters(self, key: str) -> int:
+        """Number of requests currently awaiting the call for `key`"""
+        flight = self.flights.get(key)
+        return flight.waiters if flight else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters and the waiters of each in-flight key"""
+        return {
+            "in_flight": len(self.flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "max_waiters": self.max_waiters,
+            "waiters": {key[:12]: flight.waiters for key, flight in self.flights.items()},
+        }
+
+
+def create_singleflight() -> SingleFlight:
+    """Factory function to create a singleflight group"""
+    return SingleFlight()
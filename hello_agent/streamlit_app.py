@@ -4,7 +4,10 @@ from dotenv import load_dotenv, find_dotenv
 from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel
 from agents.run import RunConfig
 import asyncio
+import re
+import threading
 from datetime import datetime
+from typing import Any, Dict
 
 # Import tools
 from tools import (
@@ -22,6 +25,9 @@ from health_agents.nutrition_expert_agent import create_nutrition_expert_agent
 # Import guardrails
 from guardrails import create_health_guardrails
 
+# Import intent router
+from router import create_intent_router
+
 # Load environment variables
 load_dotenv(find_dotenv())
 gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -31,47 +37,42 @@ if not gemini_api_key:
     st.error("GEMINI_API_KEY is not set. Please ensure it is defined in your .env file.")
     st.stop()
 
-# Setup client 
-external_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+@st.cache_resource
+def get_agent_loop() -> asyncio.AbstractEventLoop:
+    """One long-lived event loop, shared by every session, that runs all agent calls"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+    return loop
 
-# Preferred model setup
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=external_client
-)
+def run_async(coroutine):
+    """Run a coroutine on the shared agent loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_agent_loop()).result()
 
-# Runner config
-config = RunConfig(
-    model=model,
-    model_provider=external_client,
-    tracing_disabled=True
-)
+@st.cache_resource
+def get_shared_resources() -> Dict[str, Any]:
+    """Create the client, tools, agents and guardrails once per process"""
+    # Setup client; it is only ever used from the shared agent loop
+    external_client = AsyncOpenAI(
+        api_key=gemini_api_key,
+        base_url=os.getenv("LLM_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/"),
+    )
 
-# Initialize session state
-if 'user_info' not in st.session_state:
-    st.session_state.user_info = {}
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
-if 'tools_initialized' not in st.session_state:
-    st.session_state.tools_initialized = False
+    # Preferred model setup
+    model = OpenAIChatCompletionsModel(
+        model=os.getenv("LLM_MODEL", "gemini-2.0-flash"),
+        openai_client=external_client
+    )
 
-def initialize_tools():
-    """Initialize all tools and agents"""
-    if not st.session_state.tools_initialized:
-        st.session_state.goal_analyzer = create_goal_analyzer()
-        st.session_state.meal_planner = create_meal_planner()
-        st.session_state.progress_tracker = create_progress_tracker()
-        st.session_state.workout_recommender = create_workout_recommender()
-        st.session_state.escalation_agent = create_escalation_agent()
-        st.session_state.injury_support_agent = create_injury_support_agent()
-        st.session_state.nutrition_expert_agent = create_nutrition_expert_agent()
-        st.session_state.guardrails = create_health_guardrails()
-        st.session_state.agent = Agent(
-            name="Health Coach",
-            instructions="""You are a friendly and knowledgeable health and wellness coach with access to specialized tools and agents. Your role is to:
+    # Runner config
+    config = RunConfig(
+        model=model,
+        model_provider=external_client,
+        tracing_disabled=True
+    )
+
+    agent = Agent(
+        name="Health Coach",
+        instructions="""You are a friendly and knowledgeable health and wellness coach with access to specialized tools and agents. Your role is to:
 
 1. Provide personalized health, fitness, and wellness advice based on the user's age and health information
 2. Use the available tools to help users:
@@ -101,8 +102,36 @@ Specialized Agents:
 - Nutrition Expert Agent: For detailed nutrition consultations
 
 Remember: You are a coach, not a doctor. For medical concerns, always recommend consulting healthcare professionals.""",
-            model=model
-        )
+        model=model
+    )
+
+    return {
+        "config": config,
+        "agent": agent,
+        "goal_analyzer": create_goal_analyzer(),
+        "meal_planner": create_meal_planner(),
+        "progress_tracker": create_progress_tracker(),
+        "workout_recommender": create_workout_recommender(),
+        "escalation_agent": create_escalation_agent(),
+        "injury_support_agent": create_injury_support_agent(),
+        "nutrition_expert_agent": create_nutrition_expert_agent(),
+        "guardrails": create_health_guardrails(),
+        "intent_router": create_intent_router(),
+    }
+
+# Initialize session state
+if 'user_info' not in st.session_state:
+    st.session_state.user_info = {}
+if 'chat_history' not in st.session_state:
+    st.session_state.chat_history = []
+if 'tools_initialized' not in st.session_state:
+    st.session_state.tools_initialized = False
+
+def initialize_tools():
+    """Attach the process-wide tools and agents to this session"""
+    if not st.session_state.tools_initialized:
+        for name, resource in get_shared_resources().items():
+            st.session_state[name] = resource
         st.session_state.tools_initialized = True
 
 def add_to_chat_history(role, content):
@@ -117,7 +146,22 @@ def display_chat_history():
         else:
             st.chat_message("assistant").write(message["content"])
 
-async def process_user_input(user_question):
+def chat_intent(route, user_question):
+    """
+    Intent the chat handles: the router's first match, except that "goal" only
+    counts when the prompt says "goal" and "analyze" or "set" (as whole words);
+    otherwise the next matched intent, or the agent, answers it.
+    """
+    words = set(re.findall(r"[a-z]+", user_question.lower()))
+    for intent in st.session_state.intent_router.priority:
+        if not route.has(intent):
+            continue
+        if intent == "goal" and not ('goal' in route.keywords("goal") and words & {'analyze', 'set'}):
+            continue
+        return intent
+    return None
+
+def process_user_input(user_question):
     """Process user input and return response"""
     user_info = st.session_state.user_info
     
@@ -127,18 +171,21 @@ async def process_user_input(user_question):
     if not validation_result['should_proceed']:
         return validation_result['message']
     
+    route = st.session_state.intent_router.classify(user_question)
+    intent = chat_intent(route, user_question)
+    
     # Check for escalation requests
-    if any(word in user_question.lower() for word in ['human', 'speak to', 'talk to', 'real person', 'agent', 'representative']):
+    if intent == "escalation":
         result = st.session_state.escalation_agent.handle_escalation_request(user_info, user_question)
         return f"🔄 **Escalation Agent Response:**\n\n{result}"
     
     # Check for injury-related queries
-    if any(word in user_question.lower() for word in ['injury', 'pain', 'hurt', 'sprain', 'strain', 'broken', 'fracture', 'swelling', 'bruise']):
+    if intent == "injury":
         result = st.session_state.injury_support_agent.assess_injury(user_info, user_question, [])
         return f"🏥 **Injury Support Response:**\n\n{result}"
     
     # Check for meal planning
-    if any(word in user_question.lower() for word in ['meal plan', 'meal planning', '7 days', 'weekly meal', 'daily meal', 'food plan', 'eating plan']):
+    if intent == "meal_plan":
         dietary_restrictions = []
         if 'vegetarian' in user_question.lower():
             dietary_restrictions.append('vegetarian')
@@ -151,12 +198,12 @@ async def process_user_input(user_question):
         return f"🍽️ **Meal Plan Generated:**\n\n{result}"
     
     # Check for nutrition expert queries
-    elif any(word in user_question.lower() for word in ['nutrition', 'diet', 'vitamin', 'mineral', 'supplement', 'protein', 'carbohydrate', 'fat', 'eating']):
+    if intent == "nutrition":
         result = st.session_state.nutrition_expert_agent.provide_nutrition_consultation(user_info, user_question, None)
         return f"🥗 **Nutrition Expert Response:**\n\n{result}"
     
     # Check for goal analysis
-    if 'goal' in user_question.lower() and ('analyze' in user_question.lower() or 'set' in user_question.lower()):
+    if intent == "goal":
         if 'analyze' in user_question.lower():
             result = st.session_state.goal_analyzer.analyze_user_input(user_info)
             return f"🎯 **Goal Analysis:**\n\n{result}"
@@ -164,19 +211,20 @@ async def process_user_input(user_question):
             return "To set a goal, please specify: goal type, target, and timeframe\nExample: 'set goal weight loss 10 pounds 3 months'"
     
     # Check for progress tracking
-    elif 'progress' in user_question.lower() or 'track' in user_question.lower():
+    if intent == "progress":
         result = st.session_state.progress_tracker.get_progress_summary()
         return f"📊 **Progress Summary:**\n\n{result}"
     
     # Check for workout recommendations
-    elif 'workout' in user_question.lower() or 'exercise' in user_question.lower():
+    if intent == "workout":
         result = st.session_state.workout_recommender.generate_workout_routine(user_info)
         return f"💪 **Workout Recommendation:**\n\n{result}"
     
     # Default: Use the main agent
     context = f"User Information: Age: {user_info.get('age', 'Not specified')}, Fitness Level: {user_info.get('fitness_level', 'Not specified')}, Goals: {user_info.get('health_goals', 'Not specified')}\n\nUser Question: {user_question}"
     
-    result = await Runner.run(st.session_state.agent, context, run_config=config)
+    # Only the agent run goes to the shared loop; session state must stay on this script thread
+    result = run_async(Runner.run(st.session_state.agent, context, run_config=st.session_state.config))
     return result.final_output
 
 # Streamlit UI
@@ -314,7 +362,7 @@ if prompt := st.chat_input("Ask me anything about health, fitness, nutrition, or
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             try:
-                response = asyncio.run(process_user_input(prompt))
+                response = process_user_input(prompt)
                 add_to_chat_history("assistant", response)
                 st.write(response)
             except Exception as e:
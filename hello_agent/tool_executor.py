@@ -0,0 +1,108 @@
+"""
+Tool Executor
+Runs the synchronous tools and agents on a bounded thread pool so they never block the event loop
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ToolExecutor:
+    """
+    Bounded thread pool for tool calls made from async handlers.
+
+    At most `max_workers` calls run at once; further callers wait on an
+    asyncio semaphore rather than in the pool's unbounded work queue, so the
+    backlog stays visible in `stats()`. With `max_workers=0` calls run inline
+    on the event loop, which is only useful for debugging and benchmarks.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool") if max_workers else None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self._counter_lock = threading.Lock()
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool and await its result"""
+        if self.pool is None:
+            return self.record(fn, *args, **kwargs)
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - queued
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        try:
+            loop = asyncio.get_running_loop()
+            # Carry the caller's context (e.g. the request's metrics timings) into the worker thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self.pool, functools.partial(context.run, self.record, fn, *args, **kwargs))
+        finally:
+            self.slots.release()
+
+    def record(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a call and update the run-time counters"""
+        started = time.perf_counter()
+        with self._counter_lock:
+            self.running += 1
+        succeeded = False
+        try:
+            result = fn(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            with self._counter_lock:
+                self.running -= 1
+                self.total_run += time.perf_counter() - started
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy, backlog and timing counters"""
+        calls = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(1000 * self.total_wait / calls, 2) if calls else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 2),
+            "avg_run_ms": round(1000 * self.total_run / calls, 2) if calls else 0.0,
+        }
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+
+
+def create_tool_executor() -> ToolExecutor:
+    """Factory function to create the tool executor; TOOL_WORKERS sets the pool size"""
+    return ToolExecutor(max_workers=int(os.getenv("TOOL_WORKERS", "4")))
@@ -7,6 +7,13 @@ from .goal_analyzer import create_goal_analyzer, GoalAnalyzer
 from .meal_planner import create_meal_planner, MealPlanner
 from .progress_tracker import create_progress_tracker, ProgressTracker
 from .workout_recommender import create_workout_recommender, WorkoutRecommender
+from .storage import create_store, create_json_store, create_journal_store, create_sqlite_store, RecordStore
+from .exercise_catalog import create_exercise_index, ExerciseIndex
+from .program_generator import create_program_generator, ProgramGenerator
+from .trend_analytics import create_trend_analyzer, TrendAnalyzer
+from .time_index import create_time_index, create_trailing_counter, TimeIndex, TrailingCounter
+from .plan_cache import create_plan_cache, PlanCache
+from .recipe_catalog import create_recipe_index, get_recipe_catalog, load_recipe_catalog, RecipeCatalog, RecipeIndex
 
 __all__ = [
     'create_goal_analyzer',
@@ -16,5 +23,27 @@ __all__ = [
     'create_progress_tracker',
     'ProgressTracker',
     'create_workout_recommender',
-    'WorkoutRecommender'
+    'WorkoutRecommender',
+    'create_store',
+    'create_json_store',
+    'create_journal_store',
+    'create_sqlite_store',
+    'RecordStore',
+    'create_recipe_index',
+    'RecipeIndex',
+    'get_recipe_catalog',
+    'load_recipe_catalog',
+    'RecipeCatalog',
+    'create_plan_cache',
+    'PlanCache',
+    'create_exercise_index',
+    'ExerciseIndex',
+    'create_program_generator',
+    'ProgramGenerator',
+    'create_time_index',
+    'TimeIndex',
+    'create_trailing_counter',
+    'TrailingCounter',
+    'create_trend_analyzer',
+    'TrendAnalyzer'
 ] 
\ No newline at end of file
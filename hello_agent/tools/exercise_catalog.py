@@ -0,0 +1,118 @@
+"""
+Exercise Catalog
+Exercise library indexed by (category, fitness level, equipment) so routine filters are set unions
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+# Exercises with this equipment token are always available
+NO_EQUIPMENT = "none"
+
+
+def equipment_tokens(equipment: Union[str, Iterable[str], None]) -> FrozenSet[str]:
+    """A user's equipment as a set of tokens; a string may list several, comma-separated"""
+    if not equipment:
+        return frozenset()
+    if isinstance(equipment, str):
+        equipment = equipment.split(",")
+    return frozenset(token.strip().lower() for token in equipment if token and token.strip())
+
+
+def library_fingerprint(library: Dict[str, Dict[str, List[Dict]]]) -> str:
+    """Short hash of the library's content and order, which exercise IDs depend on"""
+    payload = json.dumps(library, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ExerciseIndex:
+    """
+    Exercises numbered in library order, bucketed at load time.
+
+    `buckets[(category, level, equipment)]` holds the IDs of every exercise
+    needing that equipment, so the exercises a user can do are the union of
+    the "none" bucket and one bucket per token they own. Results come back
+    in library order, which keeps seeded selections stable, and are memoized
+    per (category, level, equipment set).
+    """
+
+    def __init__(self, library: Dict[str, Dict[str, List[Dict]]]):
+        self.version = library_fingerprint(library)
+        self.exercises: List[Dict] = []
+        self.levels: Dict[str, List[str]] = {}
+        self.buckets: Dict[Tuple[str, str, str], List[int]] = {}
+        self.level_tokens: Dict[Tuple[str, str], set] = {}
+        for category, levels in library.items():
+            self.levels[category] = list(levels)
+            for level, exercises in levels.items():
+                for exercise in exercises:
+                    exercise_id = len(self.exercises)
+                    self.exercises.append(exercise)
+                    token = str(exercise.get("equipment", NO_EQUIPMENT)).strip().lower()
+                    self.buckets.setdefault((category, level, token), []).append(exercise_id)
+                    self.level_tokens.setdefault((category, level), set()).add(token)
+        # Memoized per index, so a dropped index takes its caches with it
+        self._available_ids = lru_cache(maxsize=4096)(self._select_ids)
+        self._available = lru_cache(maxsize=4096)(self._select)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def has_level(self, category: str, level: str) -> bool:
+        return level in self.levels.get(category, ())
+
+    def exercise(self, exercise_id: int) -> Dict:
+        return self.exercises[exercise_id]
+
+    def available(self, category: str, level: str, equipment: Union[str, Iterable[str], None]) -> Tuple[Dict, ...]:
+        """Exercises doable with the equipment (or none at all), in library order"""
+        return self._available(category, level, equipment_tokens(equipment))
+
+    def bodyweight(self, category: str, level: str) -> Tuple[Dict, ...]:
+        """Exercises that need no equipment"""
+        return self._available(category, level, frozenset())
+
+    def everything(self, category: str, level: str) -> Tuple[Dict, ...]:
+        """Every exercise of a category and level, regardless of equipment"""
+        return self._available(category, level, frozenset(self.level_tokens.get((category, level), ())))
+
+    def available_ids(self, category: str, level: str, equipment: Union[str, Iterable[str], None]) -> Tuple[int, ...]:
+        """IDs of the exercises doable with the equipment (or none at all), ascending"""
+        return self._available_ids(category, level, equipment_tokens(equipment))
+
+    def _select_ids(self, category: str, level: str, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        ids = set(self.buckets.get((category, level, NO_EQUIPMENT), ()))
+        for token in tokens:
+            ids.update(self.buckets.get((category, level, token), ()))
+        # Memoized results are shared between callers, so they are tuples
+        return tuple(sorted(ids))
+
+    def _select(self, category: str, level: str, tokens: FrozenSet[str]) -> Tuple[Dict, ...]:
+        return tuple(self.exercises[exercise_id] for exercise_id in self._available_ids(category, level, tokens))
+
+
+def load_exercise_library(path: str) -> Dict[str, Dict[str, List[Dict]]]:
+    """JSONL library, one exercise per line with `category` and `level` fields, into the nested layout"""
+    library: Dict[str, Dict[str, List[Dict]]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            category = record.pop("category")
+            level = record.pop("level")
+            library.setdefault(category, {}).setdefault(level, []).append(record)
+    return library
+
+
+def exercise_library_path() -> Optional[str]:
+    """External library file from EXERCISE_LIBRARY, if set"""
+    return os.getenv("EXERCISE_LIBRARY") or None
+
+
+def create_exercise_index(library: Dict[str, Dict[str, List[Dict]]]) -> ExerciseIndex:
+    """Factory function to build the exercise index"""
+    return ExerciseIndex(library)
@@ -3,27 +3,15 @@ Goal Analyzer Tool
 Helps users set, analyze, and track their health and fitness goals
 """
 
-import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from .storage import RecordStore, create_store
+
 class GoalAnalyzer:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None):
         self.goals_file = "user_goals.json"
-        self.goals = self.load_goals()
-    
-    def load_goals(self) -> Dict:
-        """Load existing goals from file"""
-        try:
-            with open(self.goals_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"goals": [], "created_date": datetime.now().isoformat()}
-    
-    def save_goals(self):
-        """Save goals to file"""
-        with open(self.goals_file, 'w') as f:
-            json.dump(self.goals, f, indent=2)
+        self.store = store or create_store(self.goals_file, ["goals"])
     
     def analyze_user_input(self, user_info: Dict) -> str:
         """Analyze user information and provide goal recommendations"""
@@ -94,8 +82,7 @@ class GoalAnalyzer:
             "progress": 0
         }
         
-        self.goals["goals"].append(goal)
-        self.save_goals()
+        self.store.append("goals", goal)
         
         return f"""
 ✅ SMART Goal Set Successfully!
@@ -114,12 +101,12 @@ class GoalAnalyzer:
     
     def get_goal_progress(self) -> str:
         """Get current goal progress"""
-        if not self.goals["goals"]:
+        if not self.store.count("goals"):
             return "📝 No goals set yet. Use 'set_goal' to create your first goal!"
         
         progress_report = "📊 GOAL PROGRESS REPORT\n\n"
         
-        for i, goal in enumerate(self.goals["goals"], 1):
+        for i, goal in enumerate(self.store.all("goals"), 1):
             progress_report += f"{i}. {goal['type']}\n"
             progress_report += f"   Target: {goal['target']}\n"
             progress_report += f"   Timeframe: {goal['timeframe']}\n"
@@ -130,17 +117,18 @@ class GoalAnalyzer:
     
     def update_progress(self, goal_index: int, progress_percentage: int) -> str:
         """Update goal progress"""
-        if 0 <= goal_index < len(self.goals["goals"]):
-            self.goals["goals"][goal_index]["progress"] = progress_percentage
+        if 0 <= goal_index < self.store.count("goals"):
+            goal = dict(self.store.get("goals", goal_index))
+            goal["progress"] = progress_percentage
             
             if progress_percentage >= 100:
-                self.goals["goals"][goal_index]["status"] = "completed"
+                goal["status"] = "completed"
             
-            self.save_goals()
+            self.store.update("goals", goal_index, goal)
             return f"✅ Progress updated! Goal {goal_index + 1} is now {progress_percentage}% complete."
         else:
             return "❌ Invalid goal index. Please check your goal list."
 
-def create_goal_analyzer() -> GoalAnalyzer:
+def create_goal_analyzer(store: Optional[RecordStore] = None) -> GoalAnalyzer:
     """Factory function to create a goal analyzer instance"""
-    return GoalAnalyzer() 
\ No newline at end of file
+    return GoalAnalyzer(store) 
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Meal Optimizer
+Picks each day's meals to hit calorie and protein/carb/fat targets, scoring whole-day combinations at once
+"""
+
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .recipe_catalog import CALORIES, MUSCLE_GAIN, WEIGHT_LOSS, RecipeCatalog, RecipeIndex
+
+# Day slots in plan order: (slot name, catalog meal type, share of daily calories)
+MEAL_SLOTS = [
+    ("breakfast", "breakfast", 0.25),
+    ("lunch", "lunch", 0.35),
+    ("dinner", "dinner", 0.30),
+    ("snack", "snacks", 0.10),
+]
+
+# Share of calories from protein, carbs and fat for each goal
+MACRO_SPLITS = {
+    WEIGHT_LOSS: (0.30, 0.40, 0.30),
+    MUSCLE_GAIN: (0.30, 0.45, 0.25),
+    None: (0.20, 0.50, 0.30),
+}
+CALORIES_PER_GRAM = np.array([4.0, 4.0, 9.0])
+
+# Weight of each macro's relative error (calories, protein, carbs, fat)
+ERROR_WEIGHTS = np.array([2.0, 1.5, 1.0, 1.0])
+# Added to a recipe's score for every earlier day it already appears on
+VARIETY_PENALTY = 0.05
+
+
+def macro_targets(daily_calories: float, goal: Optional[str]) -> np.ndarray:
+    """Daily [calories, protein g, carbs g, fat g] for a calorie target and goal"""
+    split = np.array(MACRO_SPLITS.get(goal, MACRO_SPLITS[None]))
+    return np.concatenate(([daily_calories], daily_calories * split / CALORIES_PER_GRAM))
+
+
+class MealOptimizer:
+    """
+    Anytime search for a multi-day plan that tracks the macro targets.
+
+    Each slot keeps a pool of the `pool_size` recipes closest to its calorie
+    share. A pass scores every combination of a `shortlist`-sized subset of
+    each pool in one broadcast over the macro matrix, takes the best day,
+    and moves on, with recipes already used `max_repeats` times dropped and
+    earlier uses penalized so the horizon stays varied. The first pass uses
+    the closest recipes; later passes sample random shortlists until the
+    time budget runs out, and the plan with the lowest total error wins.
+    The first pass always completes, so tiny budgets still return a plan.
+    """
+
+    def __init__(self, catalog: RecipeCatalog, recipe_index: RecipeIndex, budget_ms: float = 50.0,
+                 shortlist: int = 10, pool_size: int = 64, max_repeats: int = 2):
+        self.catalog = catalog
+        self.recipe_index = recipe_index
+        self.macros = catalog.macros.astype(np.float64)
+        self.budget_ms = budget_ms
+        self.shortlist = shortlist
+        self.pool_size = pool_size
+        self.max_repeats = max_repeats
+
+    def slot_pools(self, daily_calories: float, dietary_restrictions: Optional[List[str]]) -> List[np.ndarray]:
+        """Rows allowed by the restrictions for each slot, nearest to the slot's calorie share first"""
+        pools = []
+        for _, meal_type, share in MEAL_SLOTS:
+            rows = self.recipe_index.candidates(meal_type, daily_calories * share, None, dietary_restrictions)
+            distance = np.abs(self.macros[rows, CALORIES] - daily_calories * share)
+            if len(rows) > self.pool_size:
+                nearest = np.argpartition(distance, self.pool_size)[:self.pool_size]
+                rows, distance = rows[nearest], distance[nearest]
+            pools.append(rows[np.argsort(distance, kind='stable')])
+        return pools
+
+    def best_day(self, shortlists: List[np.ndarray], scale: np.ndarray, uses: Dict[int, int]):
+        """Lowest-error combination of one recipe per slot, as (rows, error without penalties)"""
+        allowed = []
+        for rows in shortlists:
+            counts = np.array([uses.get(row, 0) for row in rows.tolist()])
+            fresh = counts < self.max_repeats
+            # Every recipe is used up: fall back to the least used ones
+            keep = fresh if fresh.any() else counts == counts.min()
+            allowed.append((rows[keep], counts[keep]))
+
+        # Macros are pre-divided by the targets and multiplied by the weights, so the
+        # error of a day is sum(|scaled totals - ERROR_WEIGHTS|). Combinations are
+        # folded in slot order into a flat (k0 * k1 * ..., 4) array.
+        totals = np.zeros((1, len(ERROR_WEIGHTS)), dtype=np.float32) - ERROR_WEIGHTS.astype(np.float32)
+        penalty = np.zeros(1, dtype=np.float32)
+        for rows, counts in allowed:
+            totals = (totals[:, None, :] + (self.macros[rows] * scale).astype(np.float32)[None, :, :]).reshape(-1, totals.shape[1])
+            penalty = (penalty[:, None] + (VARIETY_PENALTY * counts).astype(np.float32)[None, :]).reshape(-1)
+        errors = np.abs(totals).sum(axis=1)
+        flat = int(np.argmin(errors + penalty))
+        best = np.unravel_index(flat, [len(rows) for rows, _ in allowed])
+        day = [int(rows[i]) for (rows, _), i in zip(allowed, best)]
+        return day, float(errors[flat])
+
+    def search(self, shortlists: List[np.ndarray], scale: np.ndarray, days: int):
+        """One greedy pass over the horizon"""
+        uses: Dict[int, int] = {}
+        plan, errors = [], []
+        for _ in range(days):
+            day, error = self.best_day(shortlists, scale, uses)
+            for row in day:
+                uses[row] = uses.get(row, 0) + 1
+            plan.append(day)
+            errors.append(error)
+        return plan, errors
+
+    def optimize(self, daily_calories: float, goal: Optional[str], dietary_restrictions: Optional[List[str]] = None,
+                 days: int = 7, rng: Optional[random.Random] = None) -> Dict:
+        """Best plan found within the time budget: rows per day and slot, plus per-day errors"""
+        rng = rng or random
+        started = time.perf_counter()
+        deadline = started + self.budget_ms / 1000
+        targets = macro_targets(daily_calories, goal)
+        scale = ERROR_WEIGHTS / targets
+        pools = self.slot_pools(daily_calories, dietary_restrictions)
+        can_resample = any(len(pool) > self.shortlist for pool in pools)
+
+        best_plan, best_errors = None, None
+        passes = 0
+        while True:
+            if passes == 0:
+                shortlists = [pool[:self.shortlist] for pool in pools]
+            else:
+                shortlists = [pool if len(pool) <= self.shortlist
+                              else pool[sorted(rng.sample(range(len(pool)), self.shortlist))] for pool in pools]
+            plan, errors = self.search(shortlists, scale, days)
+            passes += 1
+            if best_errors is None or sum(errors) < sum(best_errors):
+                best_plan, best_errors = plan, errors
+            if not can_resample or time.perf_counter() >= deadline:
+                break
+
+        return {
+            "days": [{slot: row for (slot, _, _), row in zip(MEAL_SLOTS, day)} for day in best_plan],
+            "errors": best_errors,
+            "targets": targets,
+            "passes": passes,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def day_totals(self, rows: List[int]) -> np.ndarray:
+        """Summed [calories, protein, carbs, fat] of a day's recipes"""
+        return self.macros[rows].sum(axis=0)
+
+
+def create_meal_optimizer(catalog: RecipeCatalog, recipe_index: RecipeIndex,
+                          budget_ms: Optional[float] = None) -> MealOptimizer:
+    """Factory function to create a meal optimizer; MEAL_OPTIMIZER_BUDGET_MS sets the default time budget"""
+    if budget_ms is None:
+        budget_ms = float(os.getenv("MEAL_OPTIMIZER_BUDGET_MS", "50"))
+    return MealOptimizer(catalog, recipe_index, budget_ms=budget_ms)
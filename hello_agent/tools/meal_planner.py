@@ -3,224 +3,42 @@ Meal Planner Tool
 Generates personalized meal plans based on user goals, preferences, and dietary restrictions
 """
 
-import json
+import copy
+import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from .meal_optimizer import create_meal_optimizer, macro_targets
+from .plan_cache import PlanCache, create_plan_cache
+from .recipe_catalog import RecipeCatalog, create_recipe_index, get_recipe_catalog, goal_filter
+from .storage import RecordStore, create_store
+
 class MealPlanner:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None, catalog: Optional[RecipeCatalog] = None,
+                 optimizer_budget_ms: Optional[float] = None, plan_cache: Optional[PlanCache] = None):
         self.meal_plans_file = "meal_plans.json"
-        self.meal_plans = self.load_meal_plans()
-        self.recipes = self.load_recipes()
-    
-    def load_meal_plans(self) -> Dict:
-        """Load existing meal plans from file"""
-        try:
-            with open(self.meal_plans_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"plans": [], "created_date": datetime.now().isoformat()}
+        self.store = store or create_store(self.meal_plans_file, ["plans"])
+        self.catalog = catalog or self.load_recipes()
+        self.recipe_index = create_recipe_index(self.catalog)
+        self.optimizer = create_meal_optimizer(self.catalog, self.recipe_index, optimizer_budget_ms)
+        self.plan_cache = plan_cache or create_plan_cache()
     
-    def save_meal_plans(self):
-        """Save meal plans to file"""
-        with open(self.meal_plans_file, 'w') as f:
-            json.dump(self.meal_plans, f, indent=2)
+    def with_store(self, store: RecordStore) -> "MealPlanner":
+        """Copy sharing the catalog, indexes, optimizer and plan cache, saving to `store` (one user's)"""
+        planner = copy.copy(self)
+        planner.store = store
+        return planner
     
-    def load_recipes(self) -> Dict:
-        """Load recipe database"""
-        return {
-            "breakfast": {
-                "protein_pancakes": {
-                    "name": "Protein Pancakes",
-                    "calories": 350,
-                    "protein": 25,
-                    "carbs": 30,
-                    "fat": 12,
-                    "ingredients": ["oats", "protein powder", "eggs", "banana"],
-                    "instructions": "Blend ingredients, cook on griddle",
-                    "dietary": ["vegetarian"]
-                },
-                "greek_yogurt_bowl": {
-                    "name": "Greek Yogurt Bowl",
-                    "calories": 280,
-                    "protein": 20,
-                    "carbs": 25,
-                    "fat": 8,
-                    "ingredients": ["greek yogurt", "berries", "honey", "nuts"],
-                    "instructions": "Mix yogurt with toppings",
-                    "dietary": ["vegetarian"]
-                },
-                "oatmeal_banana": {
-                    "name": "Banana Oatmeal",
-                    "calories": 320,
-                    "protein": 12,
-                    "carbs": 55,
-                    "fat": 6,
-                    "ingredients": ["oats", "banana", "milk", "cinnamon"],
-                    "instructions": "Cook oats with milk, add banana",
-                    "dietary": ["vegetarian"]
-                },
-                "tofu_scramble": {
-                    "name": "Tofu Scramble",
-                    "calories": 300,
-                    "protein": 20,
-                    "carbs": 15,
-                    "fat": 18,
-                    "ingredients": ["tofu", "vegetables", "turmeric", "olive oil"],
-                    "instructions": "Scramble tofu with vegetables and spices",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "chia_pudding": {
-                    "name": "Chia Pudding",
-                    "calories": 250,
-                    "protein": 8,
-                    "carbs": 35,
-                    "fat": 10,
-                    "ingredients": ["chia seeds", "almond milk", "berries", "honey"],
-                    "instructions": "Mix chia with milk, refrigerate overnight",
-                    "dietary": ["vegetarian", "vegan"]
-                }
-            },
-            "lunch": {
-                "grilled_chicken_salad": {
-                    "name": "Grilled Chicken Salad",
-                    "calories": 420,
-                    "protein": 35,
-                    "carbs": 15,
-                    "fat": 18,
-                    "ingredients": ["chicken breast", "mixed greens", "olive oil", "vegetables"],
-                    "instructions": "Grill chicken, assemble salad",
-                    "dietary": ["none"]
-                },
-                "quinoa_bowl": {
-                    "name": "Quinoa Protein Bowl",
-                    "calories": 380,
-                    "protein": 18,
-                    "carbs": 45,
-                    "fat": 12,
-                    "ingredients": ["quinoa", "black beans", "vegetables", "avocado"],
-                    "instructions": "Cook quinoa, mix with beans and vegetables",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "tuna_sandwich": {
-                    "name": "Tuna Sandwich",
-                    "calories": 340,
-                    "protein": 22,
-                    "carbs": 35,
-                    "fat": 10,
-                    "ingredients": ["tuna", "whole grain bread", "mayo", "vegetables"],
-                    "instructions": "Mix tuna with mayo, serve on bread",
-                    "dietary": ["none"]
-                },
-                "chickpea_salad": {
-                    "name": "Chickpea Salad",
-                    "calories": 320,
-                    "protein": 15,
-                    "carbs": 40,
-                    "fat": 12,
-                    "ingredients": ["chickpeas", "vegetables", "olive oil", "lemon"],
-                    "instructions": "Mix chickpeas with vegetables and dressing",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "tempeh_wrap": {
-                    "name": "Tempeh Wrap",
-                    "calories": 360,
-                    "protein": 20,
-                    "carbs": 35,
-                    "fat": 15,
-                    "ingredients": ["tempeh", "whole grain wrap", "vegetables", "hummus"],
-                    "instructions": "Grill tempeh, wrap with vegetables and hummus",
-                    "dietary": ["vegetarian", "vegan"]
-                }
-            },
-            "dinner": {
-                "salmon_vegetables": {
-                    "name": "Baked Salmon with Vegetables",
-                    "calories": 450,
-                    "protein": 40,
-                    "carbs": 20,
-                    "fat": 22,
-                    "ingredients": ["salmon", "broccoli", "sweet potato", "olive oil"],
-                    "instructions": "Bake salmon with vegetables",
-                    "dietary": ["none"]
-                },
-                "lean_beef_stirfry": {
-                    "name": "Lean Beef Stir Fry",
-                    "calories": 380,
-                    "protein": 35,
-                    "carbs": 25,
-                    "fat": 15,
-                    "ingredients": ["lean beef", "brown rice", "vegetables", "soy sauce"],
-                    "instructions": "Stir fry beef with vegetables and rice",
-                    "dietary": ["none"]
-                },
-                "vegetarian_lentils": {
-                    "name": "Lentil Curry",
-                    "calories": 320,
-                    "protein": 18,
-                    "carbs": 50,
-                    "fat": 8,
-                    "ingredients": ["lentils", "brown rice", "vegetables", "spices"],
-                    "instructions": "Cook lentils with spices and vegetables",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "tofu_stirfry": {
-                    "name": "Tofu Stir Fry",
-                    "calories": 350,
-                    "protein": 20,
-                    "carbs": 30,
-                    "fat": 15,
-                    "ingredients": ["tofu", "brown rice", "vegetables", "soy sauce"],
-                    "instructions": "Stir fry tofu with vegetables and rice",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "chickpea_curry": {
-                    "name": "Chickpea Curry",
-                    "calories": 340,
-                    "protein": 16,
-                    "carbs": 45,
-                    "fat": 12,
-                    "ingredients": ["chickpeas", "quinoa", "vegetables", "coconut milk"],
-                    "instructions": "Cook chickpeas in coconut curry sauce",
-                    "dietary": ["vegetarian", "vegan"]
-                }
-            },
-            "snacks": {
-                "protein_smoothie": {
-                    "name": "Protein Smoothie",
-                    "calories": 220,
-                    "protein": 25,
-                    "carbs": 20,
-                    "fat": 5,
-                    "ingredients": ["protein powder", "banana", "milk", "peanut butter"],
-                    "instructions": "Blend all ingredients",
-                    "dietary": ["vegetarian"]
-                },
-                "nuts_fruit": {
-                    "name": "Nuts and Fruit",
-                    "calories": 180,
-                    "protein": 6,
-                    "carbs": 25,
-                    "fat": 8,
-                    "ingredients": ["almonds", "apple", "dried fruit"],
-                    "instructions": "Mix nuts with fruit",
-                    "dietary": ["vegetarian", "vegan"]
-                },
-                "hummus_veggies": {
-                    "name": "Hummus with Vegetables",
-                    "calories": 150,
-                    "protein": 8,
-                    "carbs": 20,
-                    "fat": 6,
-                    "ingredients": ["hummus", "carrots", "cucumber", "bell peppers"],
-                    "instructions": "Serve hummus with fresh vegetables",
-                    "dietary": ["vegetarian", "vegan"]
-                }
-            }
-        }
+    def load_recipes(self) -> RecipeCatalog:
+        """Load the recipe catalog (shared by every planner in the process)"""
+        return get_recipe_catalog()
     
-    def generate_meal_plan(self, user_info: Dict, days: int = 7, dietary_restrictions: List[str] = None) -> str:
-        """Generate a personalized meal plan"""
+    def generate_meal_plan(self, user_info: Dict, days: int = 7, dietary_restrictions: List[str] = None,
+                           mode: str = "random", seed: Optional[int] = None) -> str:
+        """Generate a personalized meal plan; mode "optimize" fits each day to calorie and macro targets.
+        
+        With a seed the same inputs always give the same plan, and repeats are served from the plan cache.
+        """
         age = user_info.get('age', 25)
         fitness_level = user_info.get('fitness_level', 'beginner')
         health_goals = user_info.get('health_goals', 'general fitness')
@@ -244,15 +62,32 @@ class MealPlanner:
         else:
             daily_calories = base_calories
         
+        cache_key = None
+        if seed is not None:
+            cache_key = ("meal_plan", daily_calories, goal_filter(health_goals),
+                         tuple(sorted(set(dietary_restrictions))), days, mode, seed)
+        meals, body_text = self.plan_cache.get_or_create(
+            cache_key,
+            lambda: self.render_meal_days(daily_calories, health_goals, dietary_restrictions, days, mode, random.Random(seed))
+        )
+        
         meal_plan = {
             "user_info": user_info,
             "daily_calories": daily_calories,
             "days": days,
             "dietary_restrictions": dietary_restrictions,
             "created_date": datetime.now().isoformat(),
-            "meals": {}
+            "catalog_version": self.catalog.version,
+            "mode": mode,
+            "seed": seed,
+            "meals": {day: dict(day_meals) for day, day_meals in meals.items()}
         }
         
+        macro_text = ""
+        if mode == "optimize":
+            _, protein, carbs, fat = self.optimizer_targets(daily_calories, health_goals)
+            macro_text = f"🧮 Macro Targets: Protein {protein}g | Carbs {carbs}g | Fat {fat}g\n"
+        
         plan_text = f"""
 🍽️ PERSONALIZED MEAL PLAN
 
@@ -260,12 +95,27 @@ class MealPlanner:
 🎯 Goal: {health_goals}
 ⏰ Duration: {days} days
 🥗 Dietary Restrictions: {', '.join(dietary_restrictions) if dietary_restrictions else 'None'}
-
+{macro_text}
 """
         
-        for day in range(1, days + 1):
-            day_meals = self.generate_daily_meals(daily_calories, health_goals, dietary_restrictions)
-            meal_plan["meals"][f"day_{day}"] = day_meals
+        # Save the meal plan (one journal record, independent of history size)
+        self.store.append("plans", meal_plan)
+        
+        return plan_text + body_text
+    
+    def render_meal_days(self, daily_calories: int, health_goals: str, dietary_restrictions: List[str], days: int,
+                         mode: str, rng: random.Random):
+        """Pick every day's meals and render them with the tips, as ({day: {slot: recipe id}}, text)"""
+        if mode == "optimize":
+            plan_days = self.optimize_daily_meals(daily_calories, health_goals, dietary_restrictions, days, rng)
+        else:
+            plan_days = [self.generate_daily_meals(daily_calories, health_goals, dietary_restrictions, rng) for _ in range(days)]
+        
+        meals = {}
+        plan_text = ""
+        for day, day_meals in enumerate(plan_days, 1):
+            # Saved plans reference recipes by catalog ID instead of embedding copies
+            meals[f"day_{day}"] = {meal_type: meal["id"] for meal_type, meal in day_meals.items()}
             
             plan_text += f"\n📅 DAY {day}:\n"
             plan_text += "=" * 30 + "\n"
@@ -279,10 +129,10 @@ class MealPlanner:
                 plan_text += f"   Instructions: {meal['instructions']}\n"
                 if 'dietary' in meal:
                     plan_text += f"   Dietary: {', '.join(meal['dietary'])}\n"
-        
-        # Save the meal plan
-        self.meal_plans["plans"].append(meal_plan)
-        self.save_meal_plans()
+            
+            if mode == "optimize":
+                calories, protein, carbs, fat = self.day_totals(day_meals)
+                plan_text += f"\n📊 Day Total: {calories} calories | Protein: {protein}g | Carbs: {carbs}g | Fat: {fat}g\n"
         
         plan_text += f"\n💡 Tips:\n"
         plan_text += "• Prep meals in advance to save time\n"
@@ -299,11 +149,12 @@ class MealPlanner:
                 plan_text += "• Ensure adequate B12 intake through fortified foods or supplements\n"
                 plan_text += "• Combine grains and legumes for complete protein\n"
         
-        return plan_text
+        return meals, plan_text
     
-    def generate_daily_meals(self, daily_calories: int, health_goals: str, dietary_restrictions: List[str] = None) -> Dict:
+    def generate_daily_meals(self, daily_calories: int, health_goals: str, dietary_restrictions: List[str] = None,
+                             rng: Optional[random.Random] = None) -> Dict:
         """Generate meals for one day"""
-        import random
+        goal = goal_filter(health_goals)
         
         # Calorie distribution
         breakfast_calories = int(daily_calories * 0.25)
@@ -312,10 +163,10 @@ class MealPlanner:
         snack_calories = int(daily_calories * 0.10)
         
         # Select meals based on calorie targets, goals, and dietary restrictions
-        breakfast = self.select_meal("breakfast", breakfast_calories, health_goals, dietary_restrictions)
-        lunch = self.select_meal("lunch", lunch_calories, health_goals, dietary_restrictions)
-        dinner = self.select_meal("dinner", dinner_calories, health_goals, dietary_restrictions)
-        snack = self.select_meal("snacks", snack_calories, health_goals, dietary_restrictions)
+        breakfast = self.pick_meal("breakfast", breakfast_calories, goal, dietary_restrictions, rng)
+        lunch = self.pick_meal("lunch", lunch_calories, goal, dietary_restrictions, rng)
+        dinner = self.pick_meal("dinner", dinner_calories, goal, dietary_restrictions, rng)
+        snack = self.pick_meal("snacks", snack_calories, goal, dietary_restrictions, rng)
         
         return {
             "breakfast": breakfast,
@@ -324,54 +175,45 @@ class MealPlanner:
             "snack": snack
         }
     
-    def select_meal(self, meal_type: str, target_calories: int, health_goals: str, dietary_restrictions: List[str] = None) -> Dict:
+    def optimize_daily_meals(self, daily_calories: int, health_goals: str, dietary_restrictions: List[str] = None,
+                             days: int = 7, rng: Optional[random.Random] = None) -> List[Dict]:
+        """Meals for every day of the plan, chosen together by the macro optimizer"""
+        result = self.optimizer.optimize(daily_calories, goal_filter(health_goals), dietary_restrictions, days, rng)
+        return [{slot: self.catalog.recipe(row) for slot, row in day.items()} for day in result["days"]]
+    
+    def optimizer_targets(self, daily_calories: int, health_goals: str) -> List[int]:
+        """Rounded daily [calories, protein, carbs, fat] targets used by the optimizer"""
+        return [round(value) for value in macro_targets(daily_calories, goal_filter(health_goals)).tolist()]
+    
+    def day_totals(self, day_meals: Dict) -> List[int]:
+        """Rounded [calories, protein, carbs, fat] of a day's meals"""
+        return [round(value) for value in self.optimizer.day_totals([self.catalog.row(meal["id"]) for meal in day_meals.values()]).tolist()]
+    
+    def select_meal(self, meal_type: str, target_calories: int, health_goals: str, dietary_restrictions: List[str] = None,
+                    rng: Optional[random.Random] = None) -> Dict:
         """Select appropriate meal based on calories, goals, and dietary restrictions"""
-        available_meals = self.recipes[meal_type]
-        
-        # Filter meals based on dietary restrictions
-        suitable_meals = []
-        for meal_id, meal in available_meals.items():
-            # Check dietary restrictions
-            if dietary_restrictions:
-                meal_dietary = meal.get('dietary', ['none'])
-                if not any(diet in meal_dietary for diet in dietary_restrictions):
-                    continue
-            
-            # Filter meals based on goals
-            if 'weight loss' in health_goals.lower():
-                if meal['calories'] <= target_calories + 50:
-                    suitable_meals.append(meal)
-            elif 'muscle gain' in health_goals.lower():
-                if meal['protein'] >= 15:  # High protein for muscle gain
-                    suitable_meals.append(meal)
-            else:
-                suitable_meals.append(meal)
-        
-        if not suitable_meals:
-            # Fallback to any meals that match dietary restrictions
-            for meal_id, meal in available_meals.items():
-                if dietary_restrictions:
-                    meal_dietary = meal.get('dietary', ['none'])
-                    if any(diet in meal_dietary for diet in dietary_restrictions):
-                        suitable_meals.append(meal)
-                else:
-                    suitable_meals.append(meal)
-        
-        if not suitable_meals:
-            suitable_meals = list(available_meals.values())
-        
-        # Select random meal from suitable options
-        import random
-        return random.choice(suitable_meals)
+        return self.pick_meal(meal_type, target_calories, goal_filter(health_goals), dietary_restrictions, rng)
+    
+    def pick_meal(self, meal_type: str, target_calories: int, goal: Optional[str], dietary_restrictions: List[str] = None,
+                  rng: Optional[random.Random] = None) -> Dict:
+        """Pick a random recipe from the precomputed candidates for this meal, goal and diet"""
+        suitable_rows = self.recipe_index.candidates(meal_type, target_calories, goal, dietary_restrictions)
+        return self.catalog.recipe(suitable_rows[(rng or random).randrange(len(suitable_rows))])
+    
+    def resolve_meal(self, meal) -> Optional[Dict]:
+        """Recipe for a saved plan entry: a catalog ID, or a full copy in plans saved before IDs"""
+        if isinstance(meal, dict):
+            return meal
+        return self.catalog.recipe_by_id(meal)
     
     def get_meal_plan_history(self) -> str:
         """Get history of meal plans"""
-        if not self.meal_plans["plans"]:
+        if not self.store.count("plans"):
             return "📝 No meal plans created yet. Use 'generate_plan' to create your first meal plan!"
         
         history = "📋 MEAL PLAN HISTORY\n\n"
         
-        for i, plan in enumerate(self.meal_plans["plans"], 1):
+        for i, plan in enumerate(self.store.all("plans"), 1):
             history += f"{i}. Plan created on {plan['created_date'][:10]}\n"
             history += f"   Daily calories: {plan['daily_calories']}\n"
             history += f"   Duration: {plan['days']} days\n"
@@ -381,15 +223,17 @@ class MealPlanner:
     
     def get_shopping_list(self, plan_index: int = -1) -> str:
         """Generate shopping list for a meal plan"""
-        if not self.meal_plans["plans"]:
+        if not self.store.count("plans"):
             return "📝 No meal plans available to generate shopping list."
         
-        plan = self.meal_plans["plans"][plan_index]
+        plan = self.store.get("plans", plan_index)
         all_ingredients = set()
         
         for day_meals in plan["meals"].values():
             for meal in day_meals.values():
-                all_ingredients.update(meal['ingredients'])
+                recipe = self.resolve_meal(meal)
+                if recipe:
+                    all_ingredients.update(recipe['ingredients'])
         
         shopping_list = "🛒 SHOPPING LIST\n\n"
         shopping_list += "📦 Ingredients needed:\n"
@@ -402,6 +246,7 @@ class MealPlanner:
         
         return shopping_list
 
-def create_meal_planner() -> MealPlanner:
+def create_meal_planner(store: Optional[RecordStore] = None, catalog: Optional[RecipeCatalog] = None,
+                        optimizer_budget_ms: Optional[float] = None, plan_cache: Optional[PlanCache] = None) -> MealPlanner:
     """Factory function to create a meal planner instance"""
-    return MealPlanner() 
\ No newline at end of file
+    return MealPlanner(store, catalog, optimizer_budget_ms, plan_cache) 
\ No newline at end of file
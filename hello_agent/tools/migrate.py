@@ -0,0 +1,31 @@
+"""
+Storage Migration
+Imports the legacy JSON files into the SQLite store: python -m tools.migrate health_coach.db
+"""
+
+import os
+import sys
+
+from .storage import create_sqlite_store, import_json_file, journal_path_for
+
+LEGACY_FILES = {
+    "meal_plans.json": ["plans"],
+    "workout_routines.json": ["routines", "programs"],
+    "user_progress.json": ["measurements", "workouts", "achievements"],
+    "user_goals.json": ["goals"],
+    "escalation_log.json": ["escalations"],
+    "injury_log.json": ["injuries"],
+    "nutrition_log.json": ["consultations"],
+}
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("STORAGE_DB", "health_coach.db")
+    found = False
+    for legacy_path, legacy_collections in LEGACY_FILES.items():
+        # Collections written by the journal backend may exist only as a journal so far
+        if os.path.exists(legacy_path) or os.path.exists(journal_path_for(legacy_path)):
+            found = True
+            target = create_sqlite_store(db_path, legacy_collections)
+            print(f"✅ {legacy_path}: {import_json_file(target, legacy_path, legacy_collections)} records imported")
+    if not found:
+        print(f"⚠️ No legacy JSON files or journals found in {os.getcwd()}")
@@ -0,0 +1,79 @@
+"""
+Plan Cache
+Bounded LRU of rendered meal plans and workout routines for seeded, reproducible requests
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class PlanCache:
+    """
+    In-process LRU keyed on the inputs that fully determine a generated plan.
+
+    Only seeded generation is cacheable: the same key always renders the
+    same text, so a hit can skip both selection and formatting. Calls come
+    from the tool thread pool, so every access holds a lock.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: Optional[Hashable], build: Callable[[], Any]) -> Any:
+        """Cached value for `key`, building and storing it on a miss; a None key is never cached"""
+        if key is None:
+            return build()
+        value = self.get(key)
+        if value is None:
+            # Two threads may build the same entry at once; both results are identical
+            value = build()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def create_plan_cache(max_entries: Optional[int] = None) -> PlanCache:
+    """Factory function to create a plan cache; PLAN_CACHE_SIZE sets the default size"""
+    if max_entries is None:
+        max_entries = int(os.getenv("PLAN_CACHE_SIZE", "256"))
+    return PlanCache(max_entries)
@@ -0,0 +1,220 @@
+"""
+Program Generator
+Multi-week periodized training programs with progressive overload and deload weeks
+"""
+
+import random
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .exercise_catalog import ExerciseIndex
+
+MIN_WEEKS = 4
+MAX_WEEKS = 16
+MAX_SESSIONS_PER_WEEK = 7
+
+# Weeks per mesocycle; the last week of each one is a deload
+BLOCK_WEEKS = 4
+DELOAD_FACTOR = 0.6
+# Reps added per loading week, extra sets per completed block (capped), duration growth per loading week
+REPS_STEP = 1
+MAX_EXTRA_SETS = 2
+DURATION_STEP = 0.10
+
+# Exercises per session for each focus: (category, count), in session order
+FOCUS_TEMPLATES = {
+    "cardio_heavy": [("cardio", 3), ("strength", 3)],
+    "strength_heavy": [("strength", 5), ("cardio", 2)],
+    "balanced": [("cardio", 2), ("strength", 4), ("flexibility", 3)],
+}
+
+# Marks an empty slot in the exercise matrix when too few exercises are available
+EMPTY_SLOT = -1
+
+
+class Program:
+    """
+    A generated program: exercise IDs shaped (weeks, sessions, slots) plus
+    the prescriptions derived from them.
+
+    Only the ID matrix and the generation parameters are saved; sets, reps,
+    durations and the weekly totals are recomputed in one vectorized pass
+    over the whole block whenever a program is loaded. IDs are positions in
+    the exercise library, so the record also keeps the library's fingerprint.
+    """
+
+    def __init__(self, exercise_ids: np.ndarray, slot_categories: List[str], fitness_level: str, focus: str,
+                 library_version: Optional[str] = None):
+        self.exercise_ids = exercise_ids
+        self.library_version = library_version
+        self.slot_categories = slot_categories
+        self.fitness_level = fitness_level
+        self.focus = focus
+        self.sets = self.reps = self.duration = self.calories = None
+        self.deload_weeks = np.zeros(self.weeks, dtype=bool)
+        self.weekly_volume = self.weekly_cardio_minutes = self.weekly_calories = None
+
+    @property
+    def weeks(self) -> int:
+        return self.exercise_ids.shape[0]
+
+    @property
+    def sessions_per_week(self) -> int:
+        return self.exercise_ids.shape[1]
+
+    def to_record(self) -> Dict:
+        """Compact form for the store: parameters and the ID matrix, no prose"""
+        return {
+            "fitness_level": self.fitness_level,
+            "focus": self.focus,
+            "weeks": self.weeks,
+            "sessions_per_week": self.sessions_per_week,
+            "slot_categories": self.slot_categories,
+            "exercise_ids": self.exercise_ids.tolist(),
+            "library_version": self.library_version,
+        }
+
+    def week_summary(self, week: int) -> Dict:
+        """Totals for one week (1-based)"""
+        i = week - 1
+        return {
+            "week": week,
+            "deload": bool(self.deload_weeks[i]),
+            "strength_volume_reps": int(self.weekly_volume[i]),
+            "cardio_minutes": int(self.weekly_cardio_minutes[i]),
+            "calories": int(self.weekly_calories[i]),
+        }
+
+    def summary(self) -> List[Dict]:
+        return [self.week_summary(week) for week in range(1, self.weeks + 1)]
+
+
+class ProgramGenerator:
+    """Builds programs from the exercise index; per-exercise numbers are kept as columns"""
+
+    def __init__(self, exercise_index: ExerciseIndex):
+        self.exercise_index = exercise_index
+        exercises = exercise_index.exercises
+        self.base_sets = np.array([exercise.get("sets", 0) for exercise in exercises], dtype=np.float64)
+        self.base_reps = np.array([exercise.get("reps", 0) for exercise in exercises], dtype=np.float64)
+        self.base_duration = np.array([exercise.get("duration", 0) for exercise in exercises], dtype=np.float64)
+        self.base_calories = np.array([exercise.get("calories", 0) for exercise in exercises], dtype=np.float64)
+
+    def generate(self, fitness_level: str, focus: str, equipment: List[str], weeks: int = 8,
+                 sessions_per_week: int = 3, rng: Optional[random.Random] = None) -> Program:
+        """Pick exercises for every session; each mesocycle gets a fresh selection"""
+        if not MIN_WEEKS <= weeks <= MAX_WEEKS:
+            raise ValueError(f"Programs run {MIN_WEEKS}-{MAX_WEEKS} weeks, got {weeks}")
+        if not 1 <= sessions_per_week <= MAX_SESSIONS_PER_WEEK:
+            raise ValueError(f"Programs have 1-{MAX_SESSIONS_PER_WEEK} sessions per week, got {sessions_per_week}")
+        rng = rng or random
+        template = FOCUS_TEMPLATES.get(focus, FOCUS_TEMPLATES["balanced"])
+        slot_categories = [category for category, count in template for _ in range(count)]
+
+        blocks = -(-weeks // BLOCK_WEEKS)
+        block_ids = np.full((blocks, sessions_per_week, len(slot_categories)), EMPTY_SLOT, dtype=np.int32)
+        for block in range(blocks):
+            for session in range(sessions_per_week):
+                slot = 0
+                for category, count in template:
+                    level = fitness_level if self.exercise_index.has_level(category, fitness_level) else 'beginner'
+                    available = self.exercise_index.available_ids(category, level, equipment)
+                    picked = rng.sample(available, min(count, len(available)))
+                    block_ids[block, session, slot:slot + len(picked)] = picked
+                    slot += count
+
+        # Every week of a block repeats its sessions, so overload applies to the same exercises
+        exercise_ids = np.repeat(block_ids, BLOCK_WEEKS, axis=0)[:weeks]
+        program = Program(exercise_ids, slot_categories, fitness_level, focus, self.exercise_index.version)
+        return self.prescribe(program)
+
+    def from_record(self, record: Dict) -> Program:
+        """Rebuild a saved program; raises ValueError if it was built from a different exercise library"""
+        exercise_ids = np.array(record["exercise_ids"], dtype=np.int32)
+        library_version = record.get("library_version")
+        # Programs saved before fingerprints were recorded can only be checked for IDs out of range
+        if library_version is None:
+            stale = bool((exercise_ids >= len(self.exercise_index)).any())
+        else:
+            stale = library_version != self.exercise_index.version
+        if stale:
+            raise ValueError("This program was built from a different exercise library; generate a new one")
+        program = Program(exercise_ids, record["slot_categories"], record["fitness_level"], record["focus"],
+                          library_version)
+        return self.prescribe(program)
+
+    def prescribe(self, program: Program) -> Program:
+        """Sets, reps, durations and weekly totals for every slot of every week at once"""
+        ids = program.exercise_ids
+        filled = ids != EMPTY_SLOT
+        safe_ids = np.where(filled, ids, 0)
+
+        week = np.arange(program.weeks)
+        position = week % BLOCK_WEEKS
+        block = week // BLOCK_WEEKS
+        deload = position == BLOCK_WEEKS - 1
+        # Loading weeks climb within a block, and each block starts a step above the last
+        step = np.where(deload, 0, position + block)[:, None, None]
+        extra_sets = np.minimum(block, MAX_EXTRA_SETS)[:, None, None]
+        deload = deload[:, None, None]
+
+        base_sets = self.base_sets[safe_ids]
+        base_reps = self.base_reps[safe_ids]
+        base_duration = self.base_duration[safe_ids]
+
+        sets = np.where(deload, np.maximum(base_sets - 1, 1), base_sets + extra_sets)
+        reps = np.where(deload, np.round(base_reps * DELOAD_FACTOR), base_reps + REPS_STEP * step)
+        duration = np.where(deload, base_duration * DELOAD_FACTOR, base_duration * (1 + DURATION_STEP * step))
+        duration = np.round(duration)
+        # Calories are listed per exercise at its base duration
+        calories = np.where(base_duration > 0, self.base_calories[safe_ids] * duration / np.maximum(base_duration, 1), 0)
+
+        has_sets = filled & (base_sets > 0)
+        program.sets = np.where(has_sets, sets, 0).astype(np.int32)
+        program.reps = np.where(has_sets & (base_reps > 0), reps, 0).astype(np.int32)
+        program.duration = np.where(filled, duration, 0).astype(np.int32)
+        program.calories = np.where(filled, calories, 0)
+        program.deload_weeks = deload[:, 0, 0]
+
+        cardio = np.array([category == "cardio" for category in program.slot_categories])
+        program.weekly_volume = (program.sets * program.reps).sum(axis=(1, 2))
+        program.weekly_cardio_minutes = np.where(cardio, program.duration, 0).sum(axis=(1, 2))
+        program.weekly_calories = np.round(program.calories.sum(axis=(1, 2)))
+        return program
+
+    def render_week(self, program: Program, week: int) -> str:
+        """Text for one week (1-based) of a program"""
+        if not 1 <= week <= program.weeks:
+            raise ValueError(f"Week must be between 1 and {program.weeks}, got {week}")
+        i = week - 1
+        summary = program.week_summary(week)
+        phase = "Deload" if summary["deload"] else f"Build {i % BLOCK_WEEKS + 1}/{BLOCK_WEEKS - 1}"
+
+        text = f"📅 WEEK {week} of {program.weeks} ({phase})\n"
+        text += "=" * 40 + "\n"
+        for session in range(program.sessions_per_week):
+            text += f"\n🏋️ SESSION {session + 1}:\n"
+            for slot, category in enumerate(program.slot_categories):
+                exercise_id = int(program.exercise_ids[i, session, slot])
+                if exercise_id == EMPTY_SLOT:
+                    continue
+                exercise = self.exercise_index.exercise(exercise_id)
+                sets, reps = program.sets[i, session, slot], program.reps[i, session, slot]
+                duration = program.duration[i, session, slot]
+                if category == "strength" and reps:
+                    detail = f"{sets} x {reps} reps"
+                elif category == "strength":
+                    detail = f"{sets} x {duration} seconds"
+                else:
+                    detail = f"{duration} minutes"
+                text += f"   • {exercise['name']} ({category}): {detail}\n"
+
+        text += (f"\n📊 Week Totals: {summary['strength_volume_reps']} strength reps | "
+                 f"{summary['cardio_minutes']} cardio minutes | ~{summary['calories']} calories\n")
+        return text
+
+
+def create_program_generator(exercise_index: ExerciseIndex) -> ProgramGenerator:
+    """Factory function to create a program generator"""
+    return ProgramGenerator(exercise_index)
@@ -3,33 +3,283 @@ Progress Tracker Tool
 Tracks fitness progress, measurements, and achievements over time
 """
 
-import json
-from datetime import datetime, timedelta
+from datetime import date as Date, datetime, timedelta
+import threading
 from typing import Dict, List, Optional
 
-class ProgressTracker:
+from .storage import RecordStore, create_store
+from .time_index import (EPOCH, SECONDS_PER_DAY, TimeIndex, TrailingCounter, create_time_index,
+                         create_trailing_counter, parse_epoch, to_epoch)
+from .trend_analytics import Series, create_trend_analyzer, series_from_epochs
+
+COLLECTIONS = ["measurements", "workouts", "achievements"]
+PERIODS = ["day", "week", "month"]
+# Default summary window; record counts for it are kept as trailing counters
+SUMMARY_DAYS = 30
+# Measurement fields tracked per bucket as min/max/first/last
+TRACKED_FIELDS = ["weight", "body_fat"]
+
+
+class FieldStats:
+    """Min, max, and earliest/latest (by date) value of one measurement field"""
+    __slots__ = ("count", "low", "high", "first", "first_at", "last", "last_at")
+
+    def __init__(self):
+        self.count = 0
+        self.low = self.high = self.first = self.last = None
+        self.first_at = self.last_at = None
+
+    def add(self, value: float, epoch: int):
+        self.count += 1
+        if self.low is None:
+            self.low = self.high = self.first = self.last = value
+            self.first_at = self.last_at = epoch
+            return
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        if epoch < self.first_at:
+            self.first, self.first_at = value, epoch
+        # Records fold in store order, so on a tie the later record is the latest
+        if epoch >= self.last_at:
+            self.last, self.last_at = value, epoch
+
+    def merge(self, other: "FieldStats"):
+        if other.low is None:
+            return
+        self.count += other.count
+        if self.low is None:
+            self.low, self.high = other.low, other.high
+            self.first, self.first_at, self.last, self.last_at = other.first, other.first_at, other.last, other.last_at
+            return
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        if other.first_at < self.first_at:
+            self.first, self.first_at = other.first, other.first_at
+        if other.last_at >= self.last_at:
+            self.last, self.last_at = other.last, other.last_at
+
+
+class Rollup:
+    """Aggregates for a set of records; adding a record or merging another rollup is O(1) in history size"""
+    __slots__ = ("counts", "duration", "calories", "fields", "workout_types")
+
+    def __init__(self):
+        self.counts = {collection: 0 for collection in COLLECTIONS}
+        self.duration = 0
+        self.calories = 0
+        self.fields = {field: FieldStats() for field in TRACKED_FIELDS}
+        self.workout_types: Dict[str, int] = {}
+
+    def add(self, collection: str, record: Dict, epoch: Optional[int]):
+        """Fold in one record; records without a readable date still count but have no first/last"""
+        fold_record([self], collection, record, epoch)
+
+    def merge(self, other: "Rollup"):
+        for collection, count in other.counts.items():
+            self.counts[collection] += count
+        self.duration += other.duration
+        self.calories += other.calories
+        for field, stats in other.fields.items():
+            self.fields[field].merge(stats)
+        for workout_type, count in other.workout_types.items():
+            self.workout_types[workout_type] = self.workout_types.get(workout_type, 0) + count
+
+
+def fold_record(targets: List[Rollup], collection: str, record: Dict, epoch: Optional[int]):
+    """Add one record to several rollups, reading its fields once"""
+    if collection == "workouts":
+        duration = record.get("duration") or 0
+        calories = record.get("calories_burned") or 0
+        workout_type = record.get("workout_type")
+        for target in targets:
+            target.counts[collection] += 1
+            target.duration += duration
+            target.calories += calories
+            target.workout_types[workout_type] = target.workout_types.get(workout_type, 0) + 1
+        return
+    for target in targets:
+        target.counts[collection] += 1
+    if collection == "measurements" and epoch is not None:
+        for field in TRACKED_FIELDS:
+            value = record.get(field)
+            if value:
+                for target in targets:
+                    target.fields[field].add(value, epoch)
+
+
+def period_start(day: Date, period: str) -> Date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_month(day: Date) -> Date:
+    return Date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class Rollups:
+    """
+    Daily, weekly and monthly buckets plus an all-time total.
+
+    A window is answered by merging whole months, then whole weeks, then
+    single days to cover it, so any window touches a handful of buckets
+    whatever the history size.
+    """
+
     def __init__(self):
+        self.buckets: Dict[str, Dict[Date, Rollup]] = {period: {} for period in PERIODS}
+        self.total = Rollup()
+        # Epoch day number -> [total, day, week, month] buckets
+        self.targets: Dict[int, List[Rollup]] = {}
+        self.first_day: Optional[Date] = None
+        self.last_day: Optional[Date] = None
+
+    def add(self, collection: str, record: Dict, epoch: Optional[int]):
+        if epoch is None:
+            fold_record([self.total], collection, record, epoch)
+            return
+        day_number = epoch // SECONDS_PER_DAY
+        targets = self.targets.get(day_number)
+        if targets is None:
+            targets = self.targets[day_number] = self.day_targets(day_number)
+        fold_record(targets, collection, record, epoch)
+
+    def day_targets(self, day_number: int) -> List[Rollup]:
+        """The total and the day, week and month buckets a day's records go to, created as needed"""
+        day = EPOCH.date() + timedelta(days=day_number)
+        targets = [self.total]
+        for period in PERIODS:
+            buckets = self.buckets[period]
+            key = period_start(day, period)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = Rollup()
+            targets.append(bucket)
+        self.first_day = day if self.first_day is None else min(self.first_day, day)
+        self.last_day = day if self.last_day is None else max(self.last_day, day)
+        return targets
+
+    def window(self, start: Optional[Date] = None, end: Optional[Date] = None) -> Rollup:
+        """Aggregates for days in [start, end); open ends take all history"""
+        result = Rollup()
+        if self.first_day is None:
+            return result
+        day = max(start or self.first_day, self.first_day)
+        stop = min(end or self.last_day + timedelta(days=1), self.last_day + timedelta(days=1))
+        while day < stop:
+            month_end = next_month(day)
+            if day.day == 1 and month_end <= stop:
+                period, following = "month", month_end
+            elif day.weekday() == 0 and day + timedelta(days=7) <= min(stop, month_end):
+                period, following = "week", day + timedelta(days=7)
+            else:
+                period, following = "day", day + timedelta(days=1)
+            bucket = self.buckets[period].get(day)
+            if bucket is not None:
+                result.merge(bucket)
+            day = following
+        return result
+
+    def bucket_counts(self) -> Dict[str, int]:
+        return {period: len(buckets) for period, buckets in self.buckets.items()}
+
+class ProgressTracker:
+    def __init__(self, store: Optional[RecordStore] = None):
         self.progress_file = "user_progress.json"
-        self.progress_data = self.load_progress()
-    
-    def load_progress(self) -> Dict:
-        """Load existing progress data from file"""
-        try:
-            with open(self.progress_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {
-                "user_info": {},
-                "measurements": [],
-                "workouts": [],
-                "achievements": [],
-                "created_date": datetime.now().isoformat()
-            }
-    
-    def save_progress(self):
-        """Save progress data to file"""
-        with open(self.progress_file, 'w') as f:
-            json.dump(self.progress_data, f, indent=2)
+        self.store = store or create_store(self.progress_file, COLLECTIONS)
+        # Per-collection date index, built from history once and then kept up to date by each add_*
+        # Rollups are folded in alongside, from the same records
+        self._index_lock = threading.Lock()
+        self.trend_analyzer = create_trend_analyzer()
+        self.reset_indexes()
+        for collection in COLLECTIONS:
+            self.sync_index(collection)
+    
+    def reset_indexes(self):
+        self.time_indexes: Dict[str, TimeIndex] = {collection: create_time_index() for collection in COLLECTIONS}
+        self.indexed_counts: Dict[str, int] = {collection: 0 for collection in COLLECTIONS}
+        self.rollups = Rollups()
+        self.trailing_counts: Dict[str, TrailingCounter] = {
+            collection: create_trailing_counter(SUMMARY_DAYS) for collection in COLLECTIONS
+        }
+    
+    def fold(self, collection: str, record: Dict, epoch: Optional[int]):
+        """Add a record to the rollups and trailing counters (caller holds the index lock)"""
+        self.rollups.add(collection, record, epoch)
+        if epoch is not None:
+            self.trailing_counts[collection].add(epoch)
+    
+    def backfill_rollups(self) -> Dict[str, int]:
+        """Rebuild the date indexes and rollups from stored history, e.g. after records were imported or edited"""
+        with self._index_lock:
+            self.reset_indexes()
+            for collection in COLLECTIONS:
+                self.catch_up(collection, self.store.count(collection))
+            return {**self.rollups.bucket_counts(), **self.rollups.total.counts}
+    
+    def sync_index(self, collection: str):
+        """Index records appended since the last sync (by this or another process sharing the store)"""
+        with self._index_lock:
+            self.catch_up(collection, self.store.count(collection))
+    
+    def catch_up(self, collection: str, total: int):
+        """Index stored records up to position `total` (caller holds the index lock)"""
+        entries = []
+        for position in range(self.indexed_counts[collection], total):
+            record = self.store.get(collection, position)
+            epoch = self.record_epoch(collection, position, record)
+            self.fold(collection, record, epoch)
+            if epoch is not None:
+                entries.append((epoch, position))
+        self.time_indexes[collection].extend(entries)
+        self.indexed_counts[collection] = max(total, self.indexed_counts[collection])
+    
+    def record_epoch(self, collection: str, position: int, record: Dict) -> Optional[int]:
+        epoch = parse_epoch(record.get("date"))
+        if epoch is None:
+            print(f"⚠️ Skipping {collection} record {position} with unreadable date: {record.get('date')!r}")
+        return epoch
+    
+    def index_record(self, collection: str, position: int, record: Dict):
+        epoch = self.record_epoch(collection, position, record)
+        self.fold(collection, record, epoch)
+        if epoch is not None:
+            self.time_indexes[collection].add(epoch, position)
+    
+    def append_record(self, collection: str, record: Dict):
+        """Save a record, index it and fold it into the rollups"""
+        with self._index_lock:
+            position = self.store.append(collection, record)
+            self.catch_up(collection, position)
+            self.index_record(collection, position, record)
+            self.indexed_counts[collection] = position + 1
+    
+    def records_between(self, collection: str, start: datetime, end: Optional[datetime] = None,
+                        limit: Optional[int] = None) -> List[Dict]:
+        """Records dated in [start, end), oldest first; with `limit`, only the latest ones"""
+        self.sync_index(collection)
+        positions = self.time_indexes[collection].between(to_epoch(start), None if end is None else to_epoch(end))
+        if limit is not None:
+            positions = positions[-limit:] if limit else []
+        return [self.store.get(collection, position) for position in positions]
+    
+    def rollup_since(self, start: datetime) -> Rollup:
+        """Aggregates for records dated on or after `start`: the part-day at the start is read from the index, whole days from buckets"""
+        for collection in COLLECTIONS:
+            self.sync_index(collection)
+        next_day = start.date() + timedelta(days=1)
+        # Tool threads fold new records into the buckets, so they are merged into a fresh rollup under the lock
+        with self._index_lock:
+            if start == datetime.combine(start.date(), datetime.min.time()):
+                return self.rollups.window(start.date())
+            result = self.rollups.window(next_day)
+        head_end = datetime.combine(next_day, datetime.min.time())
+        for collection in COLLECTIONS:
+            for record in self.records_between(collection, start, head_end):
+                result.add(collection, record, parse_epoch(record["date"]))
+        return result
     
     def add_measurement(self, date: str, weight: float = None, body_fat: float = None,
                        chest: float = None, waist: float = None, arms: float = None,
@@ -47,8 +297,7 @@ class ProgressTracker:
             "timestamp": datetime.now().isoformat()
         }
         
-        self.progress_data["measurements"].append(measurement)
-        self.save_progress()
+        self.append_record("measurements", measurement)
         
         return f"""
 ✅ Measurement recorded for {date}!
@@ -76,8 +325,7 @@ class ProgressTracker:
             "timestamp": datetime.now().isoformat()
         }
         
-        self.progress_data["workouts"].append(workout)
-        self.save_progress()
+        self.append_record("workouts", workout)
         
         return f"""
 💪 Workout logged for {date}!
@@ -103,8 +351,7 @@ Keep up the great work! 💪
             "timestamp": datetime.now().isoformat()
         }
         
-        self.progress_data["achievements"].append(achievement)
-        self.save_progress()
+        self.append_record("achievements", achievement)
         
         return f"""
 🏆 Achievement Unlocked!
@@ -116,41 +363,35 @@ Keep up the great work! 💪
 Congratulations! You're making amazing progress! 🎊
 """
     
-    def get_progress_summary(self, days: int = 30) -> str:
-        """Get a summary of progress over the last N days"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Filter recent measurements
-        recent_measurements = [
-            m for m in self.progress_data["measurements"]
-            if datetime.fromisoformat(m["date"]) >= start_date
-        ]
-        
-        # Filter recent workouts
-        recent_workouts = [
-            w for w in self.progress_data["workouts"]
-            if datetime.fromisoformat(w["date"]) >= start_date
-        ]
-        
-        # Filter recent achievements
-        recent_achievements = [
-            a for a in self.progress_data["achievements"]
-            if datetime.fromisoformat(a["date"]) >= start_date
-        ]
+    def recent_counts(self) -> Dict[str, int]:
+        """Records per collection dated within the last SUMMARY_DAYS calendar days, from the trailing counters"""
+        for collection in COLLECTIONS:
+            self.sync_index(collection)
+        with self._index_lock:
+            return {collection: counter.count() for collection, counter in self.trailing_counts.items()}
+    
+    def get_progress_summary(self, days: int = SUMMARY_DAYS) -> str:
+        """Get a summary of progress over the last N calendar days (from midnight N days ago)"""
+        start_date = datetime.combine(datetime.now().date() - timedelta(days=days), datetime.min.time())
+        
+        # Totals come from the rollups; only the last few records are read for display
+        window = self.rollup_since(start_date)
+        counts = self.recent_counts() if days == SUMMARY_DAYS else window.counts
+        recent_measurements = self.records_between("measurements", start_date, limit=3)
+        recent_achievements = self.records_between("achievements", start_date, limit=3)
         
         summary = f"""
 📊 PROGRESS SUMMARY (Last {days} days)
 
-📈 Measurements: {len(recent_measurements)} entries
-💪 Workouts: {len(recent_workouts)} sessions
-🏆 Achievements: {len(recent_achievements)} unlocked
+📈 Measurements: {counts['measurements']} entries
+💪 Workouts: {counts['workouts']} sessions
+🏆 Achievements: {counts['achievements']} unlocked
 
 """
         
         if recent_measurements:
             summary += "\n📏 Recent Measurements:\n"
-            for m in recent_measurements[-3:]:  # Show last 3
+            for m in recent_measurements:  # Show last 3
                 summary += f"• {m['date']}: "
                 if m['weight']:
                     summary += f"Weight: {m['weight']}kg "
@@ -158,42 +399,74 @@ Congratulations! You're making amazing progress! 🎊
                     summary += f"Body Fat: {m['body_fat']}% "
                 summary += "\n"
         
-        if recent_workouts:
-            total_duration = sum(w['duration'] for w in recent_workouts)
-            total_calories = sum(w.get('calories_burned', 0) for w in recent_workouts)
+        if counts['workouts']:
             summary += f"\n💪 Workout Stats:\n"
-            summary += f"• Total sessions: {len(recent_workouts)}\n"
-            summary += f"• Total duration: {total_duration} minutes\n"
-            summary += f"• Total calories burned: {total_calories}\n"
-            summary += f"• Average session: {total_duration//len(recent_workouts)} minutes\n"
+            summary += f"• Total sessions: {counts['workouts']}\n"
+            summary += f"• Total duration: {window.duration} minutes\n"
+            summary += f"• Total calories burned: {window.calories}\n"
+            summary += f"• Average session: {window.duration//counts['workouts']} minutes\n"
         
         if recent_achievements:
             summary += f"\n🏆 Recent Achievements:\n"
-            for a in recent_achievements[-3:]:  # Show last 3
+            for a in recent_achievements:  # Show last 3
                 summary += f"• {a['date']}: {a['description']}\n"
         
         return summary
     
-    def get_measurement_trends(self) -> str:
-        """Analyze measurement trends"""
-        if len(self.progress_data["measurements"]) < 2:
+    def measurement_series(self, field: str) -> Series:
+        """Dates and values of every measurement that has `field`, oldest first"""
+        self.sync_index("measurements")
+        index = self.time_indexes["measurements"]
+        epochs, values = [], []
+        for epoch, position in zip(index.epochs, index.positions):
+            value = self.store.get("measurements", position).get(field)
+            if value:
+                epochs.append(epoch)
+                values.append(value)
+        return series_from_epochs(epochs, values)
+    
+    def trend_lines(self, field: str, unit: str, goal: Optional[float] = None) -> str:
+        """Smoothed level, weekly rate, plateau and goal projection for one field"""
+        analyzer = self.trend_analyzer
+        stats = analyzer.analyze_series(self.measurement_series(field), goal)
+        lines = f"• {analyzer.window}-entry average: {stats['rolling_mean']:.1f}{unit}\n"
+        lines += f"• Smoothed: {stats['ewma']:.1f}{unit}\n"
+        if stats['weekly_rate'] == stats['weekly_rate']:
+            lines += f"• Rate: {stats['weekly_rate']:+.2f}{unit}/week (last {analyzer.fit_days // 7} weeks)\n"
+        if stats['plateau']:
+            lines += f"⏸️ Plateau: under {analyzer.plateau_rate}{unit}/week change for {analyzer.min_plateau_days}+ days\n"
+        if goal is not None:
+            if stats['days_to_goal'] == 0:
+                lines += f"🎯 Goal of {goal}{unit} reached\n"
+            elif stats['goal_day'] == stats['goal_day']:
+                goal_date = (EPOCH + timedelta(days=stats['goal_day'])).strftime("%Y-%m-%d")
+                lines += f"🎯 At this rate you'll reach {goal}{unit} around {goal_date}\n"
+            else:
+                lines += f"🎯 Not on course for {goal}{unit} at the current rate\n"
+        return lines
+    
+    def get_measurement_trends(self, target_weight: Optional[float] = None,
+                               target_body_fat: Optional[float] = None) -> str:
+        """Analyze measurement trends; targets add a projected date for reaching them"""
+        if self.store.count("measurements") < 2:
             return "📝 Need at least 2 measurements to show trends."
         
-        measurements = sorted(self.progress_data["measurements"], key=lambda x: x["date"])
-        
         trends = "📈 MEASUREMENT TRENDS\n\n"
         
+        fields = self.all_time().fields
+        
         # Weight trends
-        weight_measurements = [m for m in measurements if m.get('weight')]
-        if len(weight_measurements) >= 2:
-            first_weight = weight_measurements[0]['weight']
-            last_weight = weight_measurements[-1]['weight']
+        weight = fields["weight"]
+        if weight.count >= 2:
+            first_weight = weight.first
+            last_weight = weight.last
             weight_change = last_weight - first_weight
             
             trends += f"⚖️ Weight Trend:\n"
             trends += f"• Started: {first_weight} kg\n"
             trends += f"• Current: {last_weight} kg\n"
             trends += f"• Change: {weight_change:+.1f} kg\n"
+            trends += f"• Range: {weight.low}-{weight.high} kg\n"
             
             if weight_change > 0:
                 trends += "📈 Weight increased\n"
@@ -201,51 +474,57 @@ Congratulations! You're making amazing progress! 🎊
                 trends += "📉 Weight decreased\n"
             else:
                 trends += "➡️ Weight maintained\n"
+            trends += self.trend_lines("weight", " kg", target_weight)
         
         # Body fat trends
-        body_fat_measurements = [m for m in measurements if m.get('body_fat')]
-        if len(body_fat_measurements) >= 2:
-            first_bf = body_fat_measurements[0]['body_fat']
-            last_bf = body_fat_measurements[-1]['body_fat']
+        body_fat = fields["body_fat"]
+        if body_fat.count >= 2:
+            first_bf = body_fat.first
+            last_bf = body_fat.last
             bf_change = last_bf - first_bf
             
             trends += f"\n📊 Body Fat Trend:\n"
             trends += f"• Started: {first_bf}%\n"
             trends += f"• Current: {last_bf}%\n"
             trends += f"• Change: {bf_change:+.1f}%\n"
+            trends += f"• Range: {body_fat.low}-{body_fat.high}%\n"
+            trends += self.trend_lines("body_fat", "%", target_body_fat)
         
         return trends
     
-    def get_workout_analytics(self) -> str:
-        """Analyze workout patterns"""
-        if not self.progress_data["workouts"]:
+    def all_time(self) -> Rollup:
+        """Aggregates over the whole history, as a copy the caller can read without the lock"""
+        for collection in COLLECTIONS:
+            self.sync_index(collection)
+        result = Rollup()
+        with self._index_lock:
+            result.merge(self.rollups.total)
+        return result
+    
+    def get_workout_analytics(self, days: Optional[int] = None) -> str:
+        """Analyze workout patterns over the whole history, or the last N days"""
+        rollup = self.all_time() if days is None else self.rollup_since(datetime.now() - timedelta(days=days))
+        total_workouts = rollup.counts["workouts"]
+        if not total_workouts:
             return "📝 No workouts recorded yet."
         
-        workouts = self.progress_data["workouts"]
-        
-        # Workout type frequency
-        workout_types = {}
-        for workout in workouts:
-            workout_type = workout['workout_type']
-            workout_types[workout_type] = workout_types.get(workout_type, 0) + 1
-        
         analytics = "💪 WORKOUT ANALYTICS\n\n"
-        analytics += f"📊 Total workouts: {len(workouts)}\n"
+        analytics += f"📊 Total workouts: {total_workouts}\n"
         
-        total_duration = sum(w['duration'] for w in workouts)
-        total_calories = sum(w.get('calories_burned', 0) for w in workouts)
+        total_duration = rollup.duration
+        total_calories = rollup.calories
         
         analytics += f"⏱️ Total time: {total_duration} minutes ({total_duration//60} hours)\n"
         analytics += f"🔥 Total calories burned: {total_calories}\n"
-        analytics += f"📈 Average session: {total_duration//len(workouts)} minutes\n\n"
+        analytics += f"📈 Average session: {total_duration//total_workouts} minutes\n\n"
         
         analytics += "🏃‍♀️ Workout Type Breakdown:\n"
-        for workout_type, count in sorted(workout_types.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(workouts)) * 100
+        for workout_type, count in sorted(rollup.workout_types.items(), key=lambda x: x[1], reverse=True):
+            percentage = (count / total_workouts) * 100
             analytics += f"• {workout_type}: {count} sessions ({percentage:.1f}%)\n"
         
         return analytics
 
-def create_progress_tracker() -> ProgressTracker:
+def create_progress_tracker(store: Optional[RecordStore] = None) -> ProgressTracker:
     """Factory function to create a progress tracker instance"""
-    return ProgressTracker() 
\ No newline at end of file
+    return ProgressTracker(store) 
@@ -0,0 +1,325 @@
+"""
+Recipe Catalog
+Columnar recipe catalog loaded from a versioned JSONL or CSV file, with a precomputed filter index
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# Catalog shipped with the app; RECIPE_CATALOG points at another JSONL or CSV file
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "recipes.jsonl")
+CATALOG_SCHEMA = 1
+
+# Column order of the macro matrix
+MACROS = ("calories", "protein", "carbs", "fat")
+CALORIES, PROTEIN, CARBS, FAT = range(len(MACROS))
+
+# Goal filters understood by the index (derived once from the free-text health goals)
+WEIGHT_LOSS = "weight_loss"
+MUSCLE_GAIN = "muscle_gain"
+
+# Muscle-gain plans only use recipes with at least this much protein (grams)
+HIGH_PROTEIN_GRAMS = 15
+# Weight-loss plans allow recipes up to this many calories over the meal target
+WEIGHT_LOSS_CALORIE_SLACK = 50
+
+
+def goal_filter(health_goals: str) -> Optional[str]:
+    """Map free-text health goals onto the goal filter applied to recipes"""
+    goals = (health_goals or "").lower()
+    if 'weight loss' in goals:
+        return WEIGHT_LOSS
+    if 'muscle gain' in goals:
+        return MUSCLE_GAIN
+    return None
+
+
+def plain_number(value: float):
+    """Macros are stored as float32; whole numbers are handed back as ints"""
+    return int(value) if value.is_integer() else round(value, 1)
+
+
+class RecipeCatalog:
+    """
+    Recipes stored column-wise, one row per recipe.
+
+    Macros live in a float32 matrix (rows x MACROS), dietary tags in a uint64
+    bitmask per row, and ingredients as codes into an interned vocabulary
+    (CSR layout), so a 100k-recipe catalog costs a few arrays instead of
+    100k nested dicts. `recipe(row)` materializes the familiar dict on demand.
+    """
+
+    def __init__(self, version: str, ids: List[str], meal_types: List[str], meal_type_codes: np.ndarray,
+                 macros: np.ndarray, diet_tags: List[str], diet_masks: np.ndarray, names: List[str],
+                 ingredient_vocab: List[str], ingredient_offsets: np.ndarray, ingredient_codes: np.ndarray,
+                 instructions: List[str]):
+        self.version = version
+        self.ids = ids
+        self.rows_by_id = {recipe_id: row for row, recipe_id in enumerate(ids)}
+        self.meal_types = meal_types
+        self.meal_type_codes = meal_type_codes
+        self.macros = macros
+        self.diet_tags = diet_tags
+        self.diet_masks = diet_masks
+        self.names = names
+        self.ingredient_vocab = ingredient_vocab
+        self.ingredient_offsets = ingredient_offsets
+        self.ingredient_codes = ingredient_codes
+        self.instructions = instructions
+        for array in (meal_type_codes, macros, diet_masks, ingredient_offsets, ingredient_codes):
+            array.setflags(write=False)
+        # Memoized per catalog, so a dropped catalog takes its cache with it
+        self.recipe = lru_cache(maxsize=4096)(self._recipe)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, recipe_id: str) -> Optional[int]:
+        return self.rows_by_id.get(recipe_id)
+
+    def tags(self, mask: int) -> List[str]:
+        return [tag for bit, tag in enumerate(self.diet_tags) if mask >> bit & 1]
+
+    def ingredients(self, row: int) -> List[str]:
+        start, end = self.ingredient_offsets[row:row + 2].tolist()
+        return [self.ingredient_vocab[code] for code in self.ingredient_codes[start:end].tolist()]
+
+    def _recipe(self, row: int) -> Dict:
+        """Materialize one recipe as a dict (cached and shared, so treat it as read-only)"""
+        calories, protein, carbs, fat = self.macros[row].tolist()
+        return {
+            "id": self.ids[row],
+            "name": self.names[row],
+            "calories": plain_number(calories),
+            "protein": plain_number(protein),
+            "carbs": plain_number(carbs),
+            "fat": plain_number(fat),
+            "ingredients": self.ingredients(row),
+            "instructions": self.instructions[row],
+            "dietary": self.tags(int(self.diet_masks[row])),
+        }
+
+    def recipe_by_id(self, recipe_id: str) -> Optional[Dict]:
+        row = self.row(recipe_id)
+        return None if row is None else self.recipe(row)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the catalog's arrays and strings"""
+        arrays = (self.meal_type_codes, self.macros, self.diet_masks, self.ingredient_offsets, self.ingredient_codes)
+        strings = self.ids + self.names + self.instructions + self.ingredient_vocab
+        return (sum(array.nbytes for array in arrays) + sum(sys.getsizeof(text) for text in strings)
+                + sys.getsizeof(self.rows_by_id))
+
+
+class CatalogBuilder:
+    """Accumulates recipe rows and freezes them into a RecipeCatalog"""
+
+    def __init__(self, version: str = "unversioned"):
+        self.version = version
+        self.ids: List[str] = []
+        self.seen_ids = set()
+        self.meal_types: Dict[str, int] = {}
+        self.meal_type_codes: List[int] = []
+        self.macros: List[List[float]] = []
+        self.diet_tags: Dict[str, int] = {}
+        self.diet_masks: List[int] = []
+        self.names: List[str] = []
+        self.ingredient_vocab: Dict[str, int] = {}
+        self.ingredient_offsets: List[int] = [0]
+        self.ingredient_codes: List[int] = []
+        self.instructions: List[str] = []
+
+    def add(self, recipe_id: str, meal_type: str, recipe: Dict):
+        if recipe_id in self.seen_ids:
+            raise ValueError(f"Duplicate recipe id in catalog: {recipe_id}")
+        self.seen_ids.add(recipe_id)
+        self.ids.append(sys.intern(recipe_id))
+        self.meal_type_codes.append(self.meal_types.setdefault(meal_type, len(self.meal_types)))
+        self.macros.append([float(recipe[macro]) for macro in MACROS])
+
+        # Tags get bits in first-seen order, so recipes list them in their original order
+        mask = 0
+        for tag in recipe.get('dietary') or ['none']:
+            bit = self.diet_tags.setdefault(tag, len(self.diet_tags))
+            if bit >= 64:
+                raise ValueError("Recipe catalog supports at most 64 dietary tags")
+            mask |= 1 << bit
+        self.diet_masks.append(mask)
+
+        self.names.append(sys.intern(recipe['name']))
+        for ingredient in recipe.get('ingredients', []):
+            self.ingredient_codes.append(self.ingredient_vocab.setdefault(ingredient, len(self.ingredient_vocab)))
+        self.ingredient_offsets.append(len(self.ingredient_codes))
+        self.instructions.append(recipe.get('instructions', ''))
+
+    def build(self) -> RecipeCatalog:
+        return RecipeCatalog(
+            version=self.version,
+            ids=self.ids,
+            meal_types=list(self.meal_types),
+            meal_type_codes=np.array(self.meal_type_codes, dtype=np.uint8),
+            macros=np.array(self.macros, dtype=np.float32).reshape(-1, len(MACROS)),
+            diet_tags=list(self.diet_tags),
+            diet_masks=np.array(self.diet_masks, dtype=np.uint64),
+            names=self.names,
+            ingredient_vocab=[sys.intern(ingredient) for ingredient in self.ingredient_vocab],
+            ingredient_offsets=np.array(self.ingredient_offsets, dtype=np.int64),
+            ingredient_codes=np.array(self.ingredient_codes, dtype=np.int32),
+            instructions=self.instructions,
+        )
+
+
+def split_list(value: str) -> List[str]:
+    """CSV list cells are `;`-separated"""
+    return [item.strip() for item in (value or "").split(";") if item.strip()]
+
+
+def read_jsonl(path: str, builder: CatalogBuilder):
+    """JSONL: a header line {"catalog_version", "schema"} followed by one recipe per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "catalog_version" in record:
+                if record.get("schema", CATALOG_SCHEMA) != CATALOG_SCHEMA:
+                    raise ValueError(f"{path}: unsupported catalog schema {record.get('schema')}")
+                builder.version = str(record["catalog_version"])
+                continue
+            builder.add(record["id"], record["meal_type"], record)
+
+
+def read_csv(path: str, builder: CatalogBuilder):
+    """CSV: optional `# catalog_version: X` line, then a header row; list cells are `;`-separated"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        lines = iter(f)
+        rows: Iterator[str] = lines
+        first = next(lines, "")
+        if first.startswith("#"):
+            key, _, value = first.lstrip("# ").partition(":")
+            if key.strip() == "catalog_version":
+                builder.version = value.strip()
+        else:
+            rows = iter([first, *lines])
+        for record in csv.DictReader(rows):
+            record["ingredients"] = split_list(record.get("ingredients"))
+            record["dietary"] = split_list(record.get("dietary"))
+            builder.add(record["id"], record["meal_type"], record)
+
+
+def load_recipe_catalog(path: Optional[str] = None) -> RecipeCatalog:
+    """Load a catalog file; the format is picked by extension (.csv, anything else is JSONL)"""
+    path = path or os.getenv("RECIPE_CATALOG") or DEFAULT_CATALOG
+    builder = CatalogBuilder()
+    if path.lower().endswith(".csv"):
+        read_csv(path, builder)
+    else:
+        read_jsonl(path, builder)
+    return builder.build()
+
+
+def catalog_from_dict(recipes: Dict[str, Dict[str, Dict]], version: str = "inline") -> RecipeCatalog:
+    """Build a catalog from the nested {meal_type: {recipe_id: recipe}} layout"""
+    builder = CatalogBuilder(version)
+    for meal_type, meals in recipes.items():
+        for recipe_id, recipe in meals.items():
+            builder.add(recipe_id, meal_type, recipe)
+    return builder.build()
+
+
+_catalogs: Dict[str, RecipeCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_recipe_catalog(path: Optional[str] = None) -> RecipeCatalog:
+    """Process-wide catalog per file, loaded on first use"""
+    path = os.path.abspath(path or os.getenv("RECIPE_CATALOG") or DEFAULT_CATALOG)
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = load_recipe_catalog(path)
+        return _catalogs[path]
+
+
+class MealTypeIndex:
+    """Rows of one meal type with the columns the filters need, in catalog order"""
+
+    __slots__ = ("rows", "calories", "diet_masks", "high_protein", "calorie_order", "sorted_calories")
+
+    def __init__(self, catalog: RecipeCatalog, code: int):
+        self.rows = np.flatnonzero(catalog.meal_type_codes == code).astype(np.int32)
+        self.calories = catalog.macros[self.rows, CALORIES]
+        self.diet_masks = catalog.diet_masks[self.rows]
+        self.high_protein = catalog.macros[self.rows, PROTEIN] >= HIGH_PROTEIN_GRAMS
+        # Ascending calories, so "calories <= limit" is a searchsorted plus a prefix of this order
+        self.calorie_order = np.argsort(self.calories, kind='stable')
+        self.sorted_calories = self.calories[self.calorie_order]
+
+    def calorie_rank(self, limit: float) -> int:
+        """Number of recipes with calories <= limit"""
+        return int(np.searchsorted(self.sorted_calories, limit, side='right'))
+
+
+class RecipeIndex:
+    """Precomputed filter tables for every meal type, built once when the catalog loads"""
+
+    def __init__(self, catalog: RecipeCatalog):
+        self.catalog = catalog
+        self.tag_index = {tag: bit for bit, tag in enumerate(catalog.diet_tags)}
+        self.meal_types = {meal_type: MealTypeIndex(catalog, code) for code, meal_type in enumerate(catalog.meal_types)}
+        self._candidates = lru_cache(maxsize=1024)(self._select_candidates)
+
+    def diet_mask(self, dietary_restrictions: Optional[Iterable[str]]) -> int:
+        """Tag bitmask for a restriction list (0 means no restriction); unknown tags match nothing"""
+        mask = 0
+        for restriction in dietary_restrictions or ():
+            bit = self.tag_index.get(restriction)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def candidates(self, meal_type: str, target_calories: int, goal: Optional[str],
+                   dietary_restrictions: Optional[List[str]] = None) -> np.ndarray:
+        """Catalog rows matching the restrictions and goal, falling back like the original select_meal"""
+        # Targets between the same two recipe calorie values select the same recipes,
+        # so the cache is keyed on the calorie rank rather than the raw target
+        calorie_rank = 0
+        if goal == WEIGHT_LOSS:
+            calorie_rank = self.meal_types[meal_type].calorie_rank(target_calories + WEIGHT_LOSS_CALORIE_SLACK)
+        return self._candidates(meal_type, calorie_rank, goal, bool(dietary_restrictions),
+                                self.diet_mask(dietary_restrictions))
+
+    def _select_candidates(self, meal_type: str, calorie_rank: int, goal: Optional[str],
+                           restricted: bool, diet_mask: int) -> np.ndarray:
+        index = self.meal_types[meal_type]
+        if restricted:
+            diet_ok = (index.diet_masks & np.uint64(diet_mask)) != 0
+        else:
+            diet_ok = np.ones(len(index.rows), dtype=bool)
+
+        if goal == WEIGHT_LOSS:
+            goal_ok = np.zeros(len(index.rows), dtype=bool)
+            goal_ok[index.calorie_order[:calorie_rank]] = True
+            selected = diet_ok & goal_ok
+        elif goal == MUSCLE_GAIN:
+            selected = diet_ok & index.high_protein
+        else:
+            selected = diet_ok
+
+        # Nothing fits the goal: any recipe that satisfies the restrictions, else anything
+        if not selected.any():
+            selected = diet_ok if diet_ok.any() else np.ones(len(index.rows), dtype=bool)
+        rows = index.rows[selected]
+        rows.setflags(write=False)
+        return rows
+
+
+def create_recipe_index(catalog: RecipeCatalog) -> RecipeIndex:
+    """Factory function to build the recipe index"""
+    return RecipeIndex(catalog)
@@ -0,0 +1,580 @@
+"""
+Storage Backends
+Pluggable persistence for the records written by the health tools
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Called with (backend, seconds) after every disk write, e.g. to feed the API's latency metrics
+_write_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_write_observer(observer: Optional[Callable[[str, float], None]]):
+    """Report the duration of every store's disk writes to `observer` (None stops reporting)"""
+    global _write_observer
+    _write_observer = observer
+
+
+def observe_write(backend: str, started: float):
+    if _write_observer is not None:
+        _write_observer(backend, time.perf_counter() - started)
+
+
+class RecordStore:
+    """Common interface for the record collections kept by each tool"""
+
+    # Backend name reported with write timings
+    backend = "custom"
+
+    def all(self, collection: str) -> List[Dict]:
+        """Return every record in a collection, oldest first"""
+        raise NotImplementedError
+
+    def get(self, collection: str, index: int) -> Dict:
+        """Return a single record by position (negative indexes count from the end)"""
+        raise NotImplementedError
+
+    def count(self, collection: str) -> int:
+        """Return the number of records in a collection"""
+        raise NotImplementedError
+
+    def append(self, collection: str, record: Dict) -> int:
+        """Persist a new record and return its index"""
+        raise NotImplementedError
+
+    def update(self, collection: str, index: int, record: Dict):
+        """Replace the record stored at the given index"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any open file handles"""
+
+
+class BackgroundWriter:
+    """
+    Single daemon thread that runs persistence callbacks in submission order.
+
+    Stores hand their disk writes to it so request threads only pay for the
+    in-memory change. Pending writes are flushed when the process exits.
+    """
+
+    def __init__(self):
+        # Unbounded on purpose: stores submit while holding their lock, which the writer needs to drain
+        self._queue: "queue.Queue" = queue.Queue()
+        self.written = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self.run, name="store-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, fn: Callable, *args):
+        """Queue a write without waiting for it"""
+        self._queue.put((fn, args))
+
+    def run(self):
+        while True:
+            fn, args = self._queue.get()
+            try:
+                fn(*args)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️ Background write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued write has reached disk"""
+        self._queue.join()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+_background_writer: Optional[BackgroundWriter] = None
+_background_writer_lock = threading.Lock()
+
+
+def get_background_writer() -> BackgroundWriter:
+    """Return the process-wide background writer, starting it on first use"""
+    global _background_writer
+    with _background_writer_lock:
+        if _background_writer is None:
+            _background_writer = BackgroundWriter()
+        return _background_writer
+
+
+class DocumentStore(RecordStore):
+    """
+    Keeps the whole document in memory; subclasses decide how it reaches disk.
+
+    With a `writer`, the disk write is queued to the background writer thread
+    and replayed there under the store lock, in the order changes were made.
+    """
+
+    def __init__(self, path: str, collections: List[str], writer: Optional[BackgroundWriter] = None):
+        self.path = path
+        self.collections = list(collections)
+        self.writer = writer
+        self._lock = threading.Lock()
+        self.document = self.load()
+
+    def empty_document(self) -> Dict:
+        """Document used when nothing has been saved yet"""
+        document = {collection: [] for collection in self.collections}
+        document["created_date"] = datetime.now().isoformat()
+        return document
+
+    def load(self) -> Dict:
+        """Load the document from disk"""
+        try:
+            with open(self.path, 'r') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return self.empty_document()
+        for collection in self.collections:
+            document.setdefault(collection, [])
+        return document
+
+    def all(self, collection: str) -> List[Dict]:
+        return self.document[collection]
+
+    def get(self, collection: str, index: int) -> Dict:
+        return self.document[collection][index]
+
+    def count(self, collection: str) -> int:
+        return len(self.document[collection])
+
+    def append(self, collection: str, record: Dict) -> int:
+        with self._lock:
+            records = self.document[collection]
+            records.append(record)
+            self.schedule(self.persist_append, collection, record)
+            return len(records) - 1
+
+    def update(self, collection: str, index: int, record: Dict):
+        with self._lock:
+            records = self.document[collection]
+            if index < 0:
+                index += len(records)
+            records[index] = record
+            self.schedule(self.persist_update, collection, index, record)
+
+    def schedule(self, persist: Callable, *args):
+        """Persist now, or queue it for the background writer (caller holds the lock)"""
+        if self.writer is None:
+            self.write(persist, *args)
+        else:
+            self.writer.submit(self.locked, persist, *args)
+
+    def locked(self, persist: Callable, *args):
+        with self._lock:
+            self.write(persist, *args)
+
+    def write(self, persist: Callable, *args):
+        started = time.perf_counter()
+        persist(*args)
+        observe_write(self.backend, started)
+
+    def persist_append(self, collection: str, record: Dict):
+        raise NotImplementedError
+
+    def persist_update(self, collection: str, index: int, record: Dict):
+        raise NotImplementedError
+
+    def close(self):
+        """Wait for queued writes, so the file is complete once the store is closed"""
+        if self.writer is not None:
+            self.writer.flush()
+
+
+class JsonFileStore(DocumentStore):
+    """Rewrites the complete JSON file on every change (the original behaviour)"""
+
+    backend = "json"
+    save_queued = False
+
+    def schedule(self, persist: Callable, *args):
+        # Every change rewrites the whole file, so queued rewrites collapse into one
+        if self.writer is None:
+            self.write(persist, *args)
+        elif not self.save_queued:
+            self.save_queued = True
+            self.writer.submit(self.locked, self.queued_save)
+
+    def queued_save(self):
+        self.save_queued = False
+        self.save()
+
+    def save(self):
+        """Save the whole document to file"""
+        with open(self.path, 'w') as f:
+            json.dump(self.document, f, indent=2)
+
+    def persist_append(self, collection: str, record: Dict):
+        self.save()
+
+    def persist_update(self, collection: str, index: int, record: Dict):
+        self.save()
+
+
+def journal_path_for(path: str) -> str:
+    """Journal written next to a JSON snapshot by JournalStore"""
+    return os.path.splitext(path)[0] + ".journal.jsonl"
+
+
+class JournalStore(DocumentStore):
+    """
+    Append-only journal on top of a JSON snapshot.
+
+    Each change is written as one JSONL line, so a save costs O(record). After
+    `compact_every` journal entries the document is folded into a new snapshot.
+    The snapshot remembers the last journal sequence it contains, which makes
+    replay idempotent if the process dies between writing the snapshot and
+    truncating the journal. A torn last line is dropped on startup.
+    """
+
+    backend = "journal"
+
+    def __init__(self, path: str, collections: List[str], compact_every: int = 500,
+                 fsync: bool = False, writer: Optional[BackgroundWriter] = None):
+        self.journal_path = journal_path_for(path)
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.seq = 0
+        self.pending = 0
+        super().__init__(path, collections, writer=writer)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def load(self) -> Dict:
+        """Load the snapshot and replay the journal written after it"""
+        stale_tmp = self.path + ".tmp"
+        if os.path.exists(stale_tmp):
+            # Crash during compaction: the old snapshot is still intact
+            os.remove(stale_tmp)
+
+        document = super().load()
+        self.seq = document.pop("journal_seq", 0)
+        self.pending = self.replay(document)
+        return document
+
+    def replay(self, document: Dict) -> int:
+        """Apply journal entries newer than the snapshot, returning how many were applied"""
+        applied = 0
+        valid_bytes = 0
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    if entry["seq"] <= self.seq:
+                        continue
+                    self.apply(document, entry)
+                    self.seq = entry["seq"]
+                    applied += 1
+        except FileNotFoundError:
+            return 0
+
+        if valid_bytes < os.path.getsize(self.journal_path):
+            print(f"⚠️ Discarding incomplete journal entry in {self.journal_path}")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return applied
+
+    def apply(self, document: Dict, entry: Dict):
+        """Apply a single journal entry to the in-memory document"""
+        records = document.setdefault(entry["collection"], [])
+        if entry["op"] == "append":
+            records.append(entry["record"])
+        elif entry["op"] == "update":
+            records[entry["index"]] = entry["record"]
+
+    def schedule(self, persist: Callable, *args):
+        # Numbered and serialized while the caller holds the lock, and any
+        # compaction snapshot is copied in the same step, so a queued snapshot
+        # holds exactly the entries whose lines are queued ahead of it
+        line, snapshot = self.journal_entry(persist(*args))
+        if self.writer is None:
+            self.write(self.write_journal, line, snapshot)
+        else:
+            self.writer.submit(self.write, self.write_journal, line, snapshot)
+
+    def journal_entry(self, entry: Dict) -> Tuple[str, Optional[Dict]]:
+        self.seq += 1
+        entry["seq"] = self.seq
+        self.pending += 1
+        snapshot = None
+        if self.pending >= self.compact_every:
+            snapshot = {name: list(records) for name, records in self.document.items()}
+            snapshot["journal_seq"] = self.seq
+            self.pending = 0
+        return json.dumps(entry) + "\n", snapshot
+
+    def persist_append(self, collection: str, record: Dict) -> Dict:
+        return {"op": "append", "collection": collection, "record": record}
+
+    def persist_update(self, collection: str, index: int, record: Dict) -> Dict:
+        return {"op": "update", "collection": collection, "index": index, "record": record}
+
+    def write_journal(self, line: str, snapshot: Optional[Dict]):
+        """Runs on one thread at a time, in the order the entries were numbered"""
+        self._journal.write(line)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        if snapshot is not None:
+            self.compact(snapshot)
+
+    def compact(self, snapshot: Dict):
+        """Write a snapshot taken at its journal seq and start a new journal"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._journal.close()
+        self._journal = open(self.journal_path, 'w', encoding='utf-8')
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.flush()
+        if not self._journal.closed:
+            self._journal.close()
+
+
+class SqliteStore(RecordStore):
+    """
+    SQLite (WAL mode) backend shared by every tool and agent.
+
+    Several worker processes can open the same database: writers serialize on
+    SQLite's lock instead of overwriting each other's JSON files, and every
+    read or write is an indexed point operation.
+    """
+
+    backend = "sqlite"
+
+    # Collections with a dedicated table; everything else goes into `logs`
+    TABLES = {
+        "plans": "plans",
+        "routines": "routines",
+        "measurements": "measurements",
+        "workouts": "workouts",
+        "goals": "goals",
+    }
+
+    def __init__(self, db_path: str, collections: List[str]):
+        self.db_path = db_path
+        self.collections = list(collections)
+        self._local = threading.local()
+        self.create_schema()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread, as sqlite3 connections are not shareable"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def create_schema(self):
+        """Create the tables and indexes if they do not exist yet"""
+        for table in self.TABLES.values():
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    position INTEGER NOT NULL UNIQUE,
+                    recorded TEXT,
+                    data TEXT NOT NULL
+                )""")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_recorded ON {table} (recorded)")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                recorded TEXT,
+                data TEXT NOT NULL,
+                UNIQUE (kind, position)
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_logs_kind_recorded ON logs (kind, recorded)")
+
+    def scope(self, collection: str):
+        """Return the table and the WHERE clause selecting a collection"""
+        if collection in self.TABLES:
+            return self.TABLES[collection], "1 = 1", ()
+        return "logs", "kind = ?", (collection,)
+
+    @staticmethod
+    def recorded_at(record: Dict) -> Optional[str]:
+        return record.get("date") or record.get("timestamp") or record.get("created_date")
+
+    def all(self, collection: str) -> List[Dict]:
+        table, where, params = self.scope(collection)
+        rows = self.connection.execute(
+            f"SELECT data FROM {table} WHERE {where} ORDER BY position", params)
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self, collection: str) -> int:
+        table, where, params = self.scope(collection)
+        (last,) = self.connection.execute(
+            f"SELECT MAX(position) FROM {table} WHERE {where}", params).fetchone()
+        return 0 if last is None else last + 1
+
+    def resolve(self, collection: str, index: int) -> int:
+        if index < 0:
+            index += self.count(collection)
+        if index < 0:
+            raise IndexError(f"{collection} index out of range")
+        return index
+
+    def get(self, collection: str, index: int) -> Dict:
+        table, where, params = self.scope(collection)
+        row = self.connection.execute(
+            f"SELECT data FROM {table} WHERE {where} AND position = ?",
+            params + (self.resolve(collection, index),)).fetchone()
+        if row is None:
+            raise IndexError(f"{collection} index out of range")
+        return json.loads(row[0])
+
+    def append(self, collection: str, record: Dict) -> int:
+        table, where, params = self.scope(collection)
+        kind_column, kind_value = ("kind, ", "?, ") if table == "logs" else ("", "")
+        connection = self.connection
+        started = time.perf_counter()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                f"INSERT INTO {table} ({kind_column}position, recorded, data) "
+                f"SELECT {kind_value}COALESCE(MAX(position), -1) + 1, ?, ? FROM {table} WHERE {where}",
+                params + (self.recorded_at(record), json.dumps(record)) + params)
+            (position,) = connection.execute(
+                f"SELECT position FROM {table} WHERE id = last_insert_rowid()").fetchone()
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        observe_write(self.backend, started)
+        return position
+
+    def update(self, collection: str, index: int, record: Dict):
+        table, where, params = self.scope(collection)
+        started = time.perf_counter()
+        cursor = self.connection.execute(
+            f"UPDATE {table} SET recorded = ?, data = ? WHERE {where} AND position = ?",
+            (self.recorded_at(record), json.dumps(record)) + params + (self.resolve(collection, index),))
+        if cursor.rowcount == 0:
+            raise IndexError(f"{collection} index out of range")
+        observe_write(self.backend, started)
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def create_json_store(path: str, collections: List[str],
+                      writer: Optional[BackgroundWriter] = None) -> RecordStore:
+    """Factory function to create a whole-file JSON store"""
+    return JsonFileStore(path, collections, writer=writer)
+
+
+def create_journal_store(path: str, collections: List[str], compact_every: int = 500,
+                         writer: Optional[BackgroundWriter] = None) -> RecordStore:
+    """Factory function to create an append-only journal store"""
+    return JournalStore(path, collections, compact_every=compact_every, writer=writer)
+
+
+def create_sqlite_store(db_path: str, collections: List[str]) -> RecordStore:
+    """Factory function to create a SQLite-backed store"""
+    return SqliteStore(db_path, collections)
+
+
+def create_store(path: str, collections: List[str], db_path: Optional[str] = None) -> RecordStore:
+    """
+    Create the store configured for this process.
+
+    STORAGE_BACKEND selects "journal" (default), "json" or "sqlite"; the SQLite
+    database location is `db_path`, or STORAGE_DB. `path` is the JSON file used
+    by the file-based backends, whose disk writes go through the background
+    writer unless STORAGE_WRITE_BEHIND=0.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "journal").lower()
+    if backend == "sqlite":
+        return create_sqlite_store(db_path or os.getenv("STORAGE_DB", "health_coach.db"), collections)
+    writer = get_background_writer() if os.getenv("STORAGE_WRITE_BEHIND", "1") != "0" else None
+    if backend == "json":
+        return create_json_store(path, collections, writer=writer)
+    if backend == "journal":
+        return create_journal_store(path, collections, writer=writer)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+def user_data_dir(user_id: str) -> str:
+    """
+    Directory holding one user's files under USER_DATA_DIR (default "user_data").
+    The name keeps the readable part of the ID plus a hash of the full ID, so
+    IDs that differ only in unsafe characters still get separate directories.
+    """
+    readable = re.sub(r"[^A-Za-z0-9_-]", "_", user_id)[:40]
+    digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(os.getenv("USER_DATA_DIR", "user_data"), f"{readable}-{digest}")
+
+
+def create_user_store(user_id: str, filename: str, collections: List[str]) -> RecordStore:
+    """Create the configured store for one user's copy of a tool's file"""
+    directory = user_data_dir(user_id)
+    os.makedirs(directory, exist_ok=True)
+    return create_store(os.path.join(directory, filename), collections,
+                        db_path=os.path.join(directory, "health_coach.db"))
+
+
+def import_json_file(store: RecordStore, path: str, collections: List[str]) -> int:
+    """
+    Copy the records of a JSON file, and the journal written after it, into
+    another store, returning how many were copied. Records the target already
+    holds are skipped (as many times as they occur there), so rerunning an
+    import only adds what is new.
+    """
+    if os.path.exists(journal_path_for(path)):
+        source = JournalStore(path, collections)
+    else:
+        source = JsonFileStore(path, collections)
+    copied = 0
+    try:
+        for collection in collections:
+            present = Counter(json.dumps(record, sort_keys=True) for record in store.all(collection))
+            for record in source.all(collection):
+                key = json.dumps(record, sort_keys=True)
+                if present[key]:
+                    present[key] -= 1
+                    continue
+                store.append(collection, record)
+                copied += 1
+    finally:
+        source.close()
+    return copied
+
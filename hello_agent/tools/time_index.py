@@ -0,0 +1,131 @@
+"""
+Time Index
+Record positions kept sorted by date, so date-range queries are binary searches,
+and trailing-window counters that stay current without rescanning records
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+def parse_epoch(value: str) -> Optional[int]:
+    """Seconds since 1970 for an ISO date or datetime (local time), or None if it cannot be read"""
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return int((moment - EPOCH).total_seconds())
+
+
+def to_epoch(moment: datetime) -> int:
+    return int((moment - EPOCH).total_seconds())
+
+
+class TimeIndex:
+    """
+    Parallel arrays of epoch seconds and store positions, sorted by time.
+
+    Records usually arrive in date order, so `add` is an append; back-dated
+    records are inserted at their place. Records with the same time keep
+    their insertion order.
+    """
+
+    def __init__(self):
+        self.epochs = array('q')
+        self.positions = array('q')
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def add(self, epoch: int, position: int):
+        if not self.epochs or epoch >= self.epochs[-1]:
+            self.epochs.append(epoch)
+            self.positions.append(position)
+        else:
+            at = bisect_right(self.epochs, epoch)
+            self.epochs.insert(at, epoch)
+            self.positions.insert(at, position)
+
+    def extend(self, entries: List[Tuple[int, int]]):
+        """Add many (epoch, position) pairs with one sort instead of an insert each"""
+        if not entries:
+            return
+        merged = list(zip(self.epochs, self.positions))
+        merged.extend(entries)
+        # Positions grow with insertion order, so sorting the pairs keeps ties in that order
+        merged.sort()
+        self.epochs = array('q', [epoch for epoch, _ in merged])
+        self.positions = array('q', [position for _, position in merged])
+
+    def bounds(self, start: Optional[int] = None, end: Optional[int] = None) -> slice:
+        """Slice of the arrays covering start <= epoch < end"""
+        low = 0 if start is None else bisect_left(self.epochs, start)
+        high = len(self.epochs) if end is None else bisect_left(self.epochs, end)
+        return slice(low, max(low, high))
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Store positions of the records in [start, end), oldest first"""
+        return self.positions[self.bounds(start, end)].tolist()
+
+    def count(self, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        window = self.bounds(start, end)
+        return window.stop - window.start
+
+    def oldest_first(self) -> Iterator[int]:
+        return iter(self.positions)
+
+    def newest_first(self) -> Iterator[int]:
+        return reversed(self.positions)
+
+
+def create_time_index() -> TimeIndex:
+    """Factory function to create an empty time index"""
+    return TimeIndex()
+
+
+class TrailingCounter:
+    """
+    Record count over the last `days` calendar days (including future-dated
+    records), kept as per-day buckets and a running total. Buckets that fall
+    out of the window are subtracted and dropped when the count is read.
+    """
+
+    def __init__(self, days: int):
+        self.days = days
+        self.bucket_days: List[int] = []
+        self.buckets: Dict[int, int] = {}
+        self.total = 0
+
+    def cutoff(self, today: date) -> int:
+        """Day number of the oldest day inside the window"""
+        return (today - EPOCH.date()).days - self.days
+
+    def add(self, epoch: int, today: Optional[date] = None):
+        day = epoch // SECONDS_PER_DAY
+        if day < self.cutoff(today or date.today()):
+            return
+        if day not in self.buckets:
+            insort(self.bucket_days, day)
+            self.buckets[day] = 0
+        self.buckets[day] += 1
+        self.total += 1
+
+    def count(self, today: Optional[date] = None) -> int:
+        cutoff = self.cutoff(today or date.today())
+        expired = bisect_left(self.bucket_days, cutoff)
+        for day in self.bucket_days[:expired]:
+            self.total -= self.buckets.pop(day)
+        del self.bucket_days[:expired]
+        return self.total
+
+
+def create_trailing_counter(days: int = 30) -> TrailingCounter:
+    """Factory function to create a trailing-window counter"""
+    return TrailingCounter(days)
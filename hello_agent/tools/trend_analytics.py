@@ -0,0 +1,155 @@
+"""
+Trend Analytics
+Rolling averages, EWMA smoothing, weekly rate of change, plateau detection and goal-date projection for measurement series
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .time_index import SECONDS_PER_DAY
+
+# A series is (day numbers, values): days since 1970 as floats, oldest first
+Series = Tuple[np.ndarray, np.ndarray]
+
+# A remaining distance this small counts as the goal being reached
+GOAL_TOLERANCE = 0.05
+
+
+def series_from_epochs(epochs: Sequence[int], values: Sequence[float]) -> Series:
+    return np.asarray(epochs, dtype=np.float64) / SECONDS_PER_DAY, np.asarray(values, dtype=np.float64)
+
+
+class PackedSeries:
+    """Many series concatenated end to end, with each point's series number and lag from its series' latest point"""
+
+    def __init__(self, series: List[Series]):
+        self.lengths = np.array([len(values) for _, values in series], dtype=np.int64)
+        self.size = len(series)
+        ends = np.cumsum(self.lengths)
+        self.starts = ends - self.lengths
+        self.latest = np.maximum(ends - 1, 0)
+        self.empty = self.lengths == 0
+        if ends[-1:].sum():
+            self.days = np.concatenate([series_days for series_days, _ in series]).astype(np.float64)
+            self.values = np.concatenate([series_values for _, series_values in series]).astype(np.float64)
+        else:
+            self.days = self.values = np.zeros(1)
+        self.rows = np.repeat(np.arange(self.size), self.lengths)
+        self.lags = np.repeat(ends - 1, self.lengths) - np.arange(len(self.rows))
+
+    def sum(self, weights: np.ndarray, points: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-series sum of a per-point array, or of values for a subset of points"""
+        rows = self.rows if points is None else self.rows[points]
+        return np.bincount(rows, weights=weights, minlength=self.size)
+
+    def recent(self, lag: int) -> np.ndarray:
+        """Indices of each series' last `lag` points"""
+        return np.flatnonzero(self.lags < lag)
+
+    def at_latest(self, points: np.ndarray) -> np.ndarray:
+        """Per-series value of a per-point array at the latest point (NaN for empty series)"""
+        return np.where(self.empty, np.nan, points[self.latest])
+
+
+class TrendAnalyzer:
+    """
+    Trend statistics for the latest point of many series at once.
+
+    Series are concatenated into flat arrays and every statistic is a
+    per-series weighted sum over all points together: the rolling mean
+    weights the last `window` points, the EWMA is its recurrence unrolled
+    into decay powers by lag, and the weekly rate is a least-squares slope
+    from sums over the points in the last `fit_days`.
+    """
+
+    def __init__(self, window: int = 7, alpha: float = 0.3, fit_days: int = 28,
+                 plateau_rate: float = 0.1, min_plateau_days: int = 14, max_projection_days: int = 730):
+        self.window = window
+        self.alpha = alpha
+        self.fit_days = fit_days
+        self.plateau_rate = plateau_rate
+        self.min_plateau_days = min_plateau_days
+        self.max_projection_days = max_projection_days
+        self.decay_powers = np.ones(1)
+
+    def rolling_mean(self, packed: PackedSeries) -> np.ndarray:
+        """Mean of each series' last `window` values"""
+        points = packed.recent(self.window)
+        with np.errstate(invalid="ignore"):
+            return packed.sum(packed.values[points], points) / np.minimum(packed.lengths, self.window)
+
+    def ewma(self, packed: PackedSeries) -> np.ndarray:
+        """
+        Final value of y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded with
+        y = x[0], unrolled: sum of alpha * decay^lag * x plus decay^n * x[0].
+        Points older than the horizon weigh under 1e-16 and are skipped.
+        """
+        longest = int(packed.lengths.max(initial=0))
+        if len(self.decay_powers) < longest + 1:
+            self.decay_powers = (1.0 - self.alpha) ** np.arange(longest + 1)
+        horizon = int(np.count_nonzero(self.decay_powers >= 1e-16))
+        points = packed.recent(horizon)
+        smoothed = packed.sum(self.alpha * self.decay_powers[packed.lags[points]] * packed.values[points], points)
+        first = packed.values[np.minimum(packed.starts, len(packed.values) - 1)]
+        return np.where(packed.empty, np.nan, smoothed + self.decay_powers[packed.lengths] * first)
+
+    def weekly_rate(self, packed: PackedSeries) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Least-squares change per week over each series' last `fit_days`, with the points used and the days they span"""
+        last_day = packed.days[packed.latest]
+        points = np.flatnonzero(packed.days[:len(packed.rows)] >= (last_day - self.fit_days)[packed.rows])
+        rows = packed.rows[points]
+        # Offsets from each series' latest point keep the sums small
+        x = packed.days[points] - last_day[rows]
+        y = packed.values[points] - packed.values[packed.latest][rows]
+        count = np.bincount(rows, minlength=packed.size)
+        sum_x = packed.sum(x, points)
+        sum_y = packed.sum(y, points)
+        spread = packed.sum(x * x, points) * count - sum_x ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = (packed.sum(x * y, points) * count - sum_x * sum_y) / spread
+        slope = np.where((count >= 2) & (spread > 1e-9), slope, np.nan)
+        # Days are sorted, so each window is a suffix and its first point is the oldest
+        oldest = packed.starts + packed.lengths - count
+        span = np.where(count > 0, last_day - packed.days[np.minimum(oldest, len(packed.days) - 1)], 0.0)
+        return slope * 7, count, span
+
+    def analyze(self, series: List[Series], goals: Optional[Sequence[float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Statistics for a batch of series; one array entry per series.
+        `goals` holds a target value per series (NaN for none). Empty series
+        come back as NaN.
+        """
+        packed = PackedSeries(series)
+        smoothed = self.ewma(packed)
+        rate, fit_count, span = self.weekly_rate(packed)
+        plateau = (fit_count >= 3) & (span >= self.min_plateau_days) & (np.abs(rate) < self.plateau_rate)
+
+        goals = np.full(len(series), np.nan) if goals is None else np.asarray(goals, dtype=np.float64)
+        remaining = goals - smoothed
+        with np.errstate(invalid="ignore", divide="ignore"):
+            days_to_goal = remaining / (rate / 7)
+        days_to_goal = np.where(np.abs(remaining) <= GOAL_TOLERANCE, 0.0, days_to_goal)
+        reachable = (days_to_goal >= 0) & (days_to_goal <= self.max_projection_days) & ~plateau
+        days_to_goal = np.where(reachable | (days_to_goal == 0), days_to_goal, np.nan)
+
+        return {
+            "count": packed.lengths,
+            "latest": packed.at_latest(packed.values),
+            "rolling_mean": self.rolling_mean(packed),
+            "ewma": smoothed,
+            "weekly_rate": rate,
+            "plateau": plateau,
+            "days_to_goal": days_to_goal,
+            "goal_day": packed.at_latest(packed.days) + days_to_goal,
+        }
+
+    def analyze_series(self, series: Series, goal: Optional[float] = None) -> Dict[str, float]:
+        """Statistics for a single series, as plain numbers"""
+        result = self.analyze([series], None if goal is None else [goal])
+        return {name: values[0].item() for name, values in result.items()}
+
+
+def create_trend_analyzer(**settings) -> TrendAnalyzer:
+    """Factory function to create a trend analyzer"""
+    return TrendAnalyzer(**settings)
@@ -3,32 +3,37 @@ Workout Recommendation Tool
 Generates personalized workout routines based on user goals, fitness level, and equipment
 """
 
-import json
+import copy
 from datetime import datetime
 from typing import Dict, List, Optional
 import random
 
+from .exercise_catalog import create_exercise_index, exercise_library_path, load_exercise_library
+from .plan_cache import PlanCache, create_plan_cache
+from .program_generator import create_program_generator
+from .storage import RecordStore, create_store
+
 class WorkoutRecommender:
-    def __init__(self):
+    def __init__(self, store: Optional[RecordStore] = None, plan_cache: Optional[PlanCache] = None):
         self.workouts_file = "workout_routines.json"
-        self.workout_routines = self.load_workout_routines()
+        self.store = store or create_store(self.workouts_file, ["routines", "programs"])
+        self.plan_cache = plan_cache or create_plan_cache()
         self.exercises = self.load_exercises()
+        # Built once here, so routine generation never rescans the library
+        self.exercise_index = create_exercise_index(self.exercises)
+        self.program_generator = create_program_generator(self.exercise_index)
     
-    def load_workout_routines(self) -> Dict:
-        """Load existing workout routines from file"""
-        try:
-            with open(self.workouts_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"routines": [], "created_date": datetime.now().isoformat()}
-    
-    def save_workout_routines(self):
-        """Save workout routines to file"""
-        with open(self.workouts_file, 'w') as f:
-            json.dump(self.workout_routines, f, indent=2)
+    def with_store(self, store: RecordStore) -> "WorkoutRecommender":
+        """Copy sharing the exercise index, program generator and plan cache, saving to `store` (one user's)"""
+        recommender = copy.copy(self)
+        recommender.store = store
+        return recommender
     
     def load_exercises(self) -> Dict:
-        """Load exercise database"""
+        """Load exercise database; EXERCISE_LIBRARY points at an external JSONL library instead"""
+        library_path = exercise_library_path()
+        if library_path:
+            return load_exercise_library(library_path)
         return {
             "cardio": {
                 "beginner": [
@@ -101,36 +106,28 @@ class WorkoutRecommender:
             }
         }
     
-    def generate_workout_routine(self, user_info: Dict, workout_type: str = "balanced") -> str:
-        """Generate a personalized workout routine"""
+    def generate_workout_routine(self, user_info: Dict, workout_type: str = "balanced", seed: Optional[int] = None) -> str:
+        """Generate a personalized workout routine; with a seed the same inputs always give the same routine"""
         age = user_info.get('age', 25)
         fitness_level = user_info.get('fitness_level', 'beginner')
         health_goals = user_info.get('health_goals', 'general fitness')
         available_equipment = user_info.get('equipment', ['none'])
+        fitness_level = self.normalize_fitness_level(fitness_level)
+        focus = self.workout_focus(health_goals)
         
-        # Normalize fitness level to ensure it exists in our database
-        valid_fitness_levels = ['beginner', 'intermediate', 'advanced']
-        if fitness_level.lower() not in valid_fitness_levels:
-            # Map similar terms to valid levels
-            if fitness_level.lower() in ['novice', 'new', 'start']:
-                fitness_level = 'beginner'
-            elif fitness_level.lower() in ['advance', 'expert', 'pro']:
-                fitness_level = 'advanced'
-            else:
-                fitness_level = 'beginner'  # Default to beginner if unknown
-        
-        # Determine workout focus based on goals
-        if 'weight loss' in health_goals.lower():
-            focus = "cardio_heavy"
-        elif 'muscle gain' in health_goals.lower():
-            focus = "strength_heavy"
-        else:
-            focus = "balanced"
+        cache_key = None
+        if seed is not None:
+            equipment_key = available_equipment if isinstance(available_equipment, str) else tuple(sorted(set(available_equipment)))
+            cache_key = ("workout", fitness_level, focus, equipment_key, seed)
+        body_text = self.plan_cache.get_or_create(
+            cache_key, lambda: self.render_routine(fitness_level, focus, available_equipment, random.Random(seed))
+        )
         
         routine = {
             "user_info": user_info,
             "workout_type": workout_type,
             "focus": focus,
+            "seed": seed,
             "created_date": datetime.now().isoformat(),
             "exercises": {}
         }
@@ -146,28 +143,52 @@ class WorkoutRecommender:
 
 """
         
+        # Save the routine
+        self.store.append("routines", routine)
+        
+        return workout_text + body_text
+    
+    def normalize_fitness_level(self, fitness_level: str) -> str:
+        """Normalize fitness level to ensure it exists in our database"""
+        valid_fitness_levels = ['beginner', 'intermediate', 'advanced']
+        if fitness_level.lower() not in valid_fitness_levels:
+            # Map similar terms to valid levels
+            if fitness_level.lower() in ['novice', 'new', 'start']:
+                fitness_level = 'beginner'
+            elif fitness_level.lower() in ['advance', 'expert', 'pro']:
+                fitness_level = 'advanced'
+            else:
+                fitness_level = 'beginner'  # Default to beginner if unknown
+        return fitness_level
+    
+    def workout_focus(self, health_goals: str) -> str:
+        """Determine workout focus based on goals"""
+        if 'weight loss' in health_goals.lower():
+            return "cardio_heavy"
+        elif 'muscle gain' in health_goals.lower():
+            return "strength_heavy"
+        return "balanced"
+    
+    def render_routine(self, fitness_level: str, focus: str, available_equipment: List[str], rng: random.Random) -> str:
+        """Pick and render the exercises for a focus, followed by the tips"""
         try:
             # Generate exercises based on focus and fitness level
             if focus == "cardio_heavy":
-                workout_text += self.generate_cardio_heavy_routine(fitness_level, available_equipment)
+                workout_text = self.generate_cardio_heavy_routine(fitness_level, available_equipment, rng)
             elif focus == "strength_heavy":
-                workout_text += self.generate_strength_heavy_routine(fitness_level, available_equipment)
+                workout_text = self.generate_strength_heavy_routine(fitness_level, available_equipment, rng)
             else:
-                workout_text += self.generate_balanced_routine(fitness_level, available_equipment)
+                workout_text = self.generate_balanced_routine(fitness_level, available_equipment, rng)
         except Exception as e:
             # Fallback to beginner level if there's an error
             print(f"⚠️ Error generating routine for {fitness_level} level, using beginner level instead.")
             fitness_level = 'beginner'
             if focus == "cardio_heavy":
-                workout_text += self.generate_cardio_heavy_routine(fitness_level, available_equipment)
+                workout_text = self.generate_cardio_heavy_routine(fitness_level, available_equipment, rng)
             elif focus == "strength_heavy":
-                workout_text += self.generate_strength_heavy_routine(fitness_level, available_equipment)
+                workout_text = self.generate_strength_heavy_routine(fitness_level, available_equipment, rng)
             else:
-                workout_text += self.generate_balanced_routine(fitness_level, available_equipment)
-        
-        # Save the routine
-        self.workout_routines["routines"].append(routine)
-        self.save_workout_routines()
+                workout_text = self.generate_balanced_routine(fitness_level, available_equipment, rng)
         
         workout_text += f"""
 💡 Tips for Success:
@@ -183,22 +204,20 @@ class WorkoutRecommender:
         
         return workout_text
     
-    def generate_cardio_heavy_routine(self, fitness_level: str, equipment: List[str]) -> str:
+    def generate_cardio_heavy_routine(self, fitness_level: str, equipment: List[str],
+                                      rng: Optional[random.Random] = None) -> str:
         """Generate a cardio-focused workout routine"""
+        rng = rng or random
         routine_text = "🏃‍♀️ CARDIO-FOCUSED WORKOUT\n\n"
         
         # Ensure fitness level exists in our database
-        if fitness_level not in self.exercises["cardio"]:
+        if not self.exercise_index.has_level("cardio", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
         
         # Select cardio exercises
-        cardio_exercises = self.exercises["cardio"][fitness_level]
-        available_cardio = [ex for ex in cardio_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
+        available_cardio = self.exercise_index.available("cardio", fitness_level, equipment)
         
-        if not available_cardio:
-            available_cardio = [ex for ex in cardio_exercises if ex["equipment"] == "none"]
-        
-        selected_cardio = random.sample(available_cardio, min(3, len(available_cardio)))
+        selected_cardio = rng.sample(available_cardio, min(3, len(available_cardio)))
         
         routine_text += "🔥 CARDIO SESSION (45-60 minutes):\n"
         routine_text += "=" * 40 + "\n"
@@ -210,14 +229,13 @@ class WorkoutRecommender:
             routine_text += f"   Equipment: {exercise['equipment']}\n"
         
         # Add some strength exercises
-        if fitness_level not in self.exercises["strength"]:
+        if not self.exercise_index.has_level("strength", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
             
-        strength_exercises = self.exercises["strength"][fitness_level]
-        available_strength = [ex for ex in strength_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
+        available_strength = self.exercise_index.available("strength", fitness_level, equipment)
         
         if available_strength:
-            selected_strength = random.sample(available_strength, min(3, len(available_strength)))
+            selected_strength = rng.sample(available_strength, min(3, len(available_strength)))
             
             routine_text += f"\n💪 STRENGTH COMPONENT (15-20 minutes):\n"
             routine_text += "=" * 40 + "\n"
@@ -235,22 +253,20 @@ class WorkoutRecommender:
         
         return routine_text
     
-    def generate_strength_heavy_routine(self, fitness_level: str, equipment: List[str]) -> str:
+    def generate_strength_heavy_routine(self, fitness_level: str, equipment: List[str],
+                                        rng: Optional[random.Random] = None) -> str:
         """Generate a strength-focused workout routine"""
+        rng = rng or random
         routine_text = "🏋️‍♂️ STRENGTH-FOCUSED WORKOUT\n\n"
         
         # Ensure fitness level exists in our database
-        if fitness_level not in self.exercises["strength"]:
+        if not self.exercise_index.has_level("strength", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
         
         # Select strength exercises
-        strength_exercises = self.exercises["strength"][fitness_level]
-        available_strength = [ex for ex in strength_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
-        
-        if not available_strength:
-            available_strength = [ex for ex in strength_exercises if ex["equipment"] == "none"]
+        available_strength = self.exercise_index.available("strength", fitness_level, equipment)
         
-        selected_strength = random.sample(available_strength, min(5, len(available_strength)))
+        selected_strength = rng.sample(available_strength, min(5, len(available_strength)))
         
         routine_text += "💪 STRENGTH SESSION (45-60 minutes):\n"
         routine_text += "=" * 40 + "\n"
@@ -267,14 +283,13 @@ class WorkoutRecommender:
             routine_text += f"   Equipment: {exercise['equipment']}\n"
         
         # Add some cardio
-        if fitness_level not in self.exercises["cardio"]:
+        if not self.exercise_index.has_level("cardio", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
             
-        cardio_exercises = self.exercises["cardio"][fitness_level]
-        available_cardio = [ex for ex in cardio_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
+        available_cardio = self.exercise_index.available("cardio", fitness_level, equipment)
         
         if available_cardio:
-            selected_cardio = random.sample(available_cardio, min(2, len(available_cardio)))
+            selected_cardio = rng.sample(available_cardio, min(2, len(available_cardio)))
             
             routine_text += f"\n🔥 CARDIO FINISHER (10-15 minutes):\n"
             routine_text += "=" * 40 + "\n"
@@ -286,18 +301,19 @@ class WorkoutRecommender:
         
         return routine_text
     
-    def generate_balanced_routine(self, fitness_level: str, equipment: List[str]) -> str:
+    def generate_balanced_routine(self, fitness_level: str, equipment: List[str],
+                                  rng: Optional[random.Random] = None) -> str:
         """Generate a balanced workout routine"""
+        rng = rng or random
         routine_text = "⚖️ BALANCED WORKOUT\n\n"
         
         # Ensure fitness level exists in our database
-        if fitness_level not in self.exercises["cardio"]:
+        if not self.exercise_index.has_level("cardio", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
         
         # Cardio component
-        cardio_exercises = self.exercises["cardio"][fitness_level]
-        available_cardio = [ex for ex in cardio_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
-        selected_cardio = random.sample(available_cardio, min(2, len(available_cardio)))
+        available_cardio = self.exercise_index.available("cardio", fitness_level, equipment)
+        selected_cardio = rng.sample(available_cardio, min(2, len(available_cardio)))
         
         routine_text += "🔥 CARDIO (20-25 minutes):\n"
         routine_text += "=" * 30 + "\n"
@@ -308,12 +324,11 @@ class WorkoutRecommender:
             routine_text += f"   Equipment: {exercise['equipment']}\n"
         
         # Strength component
-        if fitness_level not in self.exercises["strength"]:
+        if not self.exercise_index.has_level("strength", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
             
-        strength_exercises = self.exercises["strength"][fitness_level]
-        available_strength = [ex for ex in strength_exercises if ex["equipment"] in equipment or ex["equipment"] == "none"]
-        selected_strength = random.sample(available_strength, min(4, len(available_strength)))
+        available_strength = self.exercise_index.available("strength", fitness_level, equipment)
+        selected_strength = rng.sample(available_strength, min(4, len(available_strength)))
         
         routine_text += f"\n💪 STRENGTH (25-30 minutes):\n"
         routine_text += "=" * 30 + "\n"
@@ -330,11 +345,11 @@ class WorkoutRecommender:
             routine_text += f"   Equipment: {exercise['equipment']}\n"
         
         # Flexibility component
-        if fitness_level not in self.exercises["flexibility"]:
+        if not self.exercise_index.has_level("flexibility", fitness_level):
             fitness_level = 'beginner'  # Fallback to beginner
             
-        flexibility_exercises = self.exercises["flexibility"][fitness_level]
-        selected_flexibility = random.sample(flexibility_exercises, min(3, len(flexibility_exercises)))
+        flexibility_exercises = self.exercise_index.everything("flexibility", fitness_level)
+        selected_flexibility = rng.sample(flexibility_exercises, min(3, len(flexibility_exercises)))
         
         routine_text += f"\n🧘‍♀️ FLEXIBILITY (10-15 minutes):\n"
         routine_text += "=" * 30 + "\n"
@@ -348,12 +363,12 @@ class WorkoutRecommender:
     
     def get_workout_history(self) -> str:
         """Get history of workout routines"""
-        if not self.workout_routines["routines"]:
+        if not self.store.count("routines"):
             return "📝 No workout routines created yet. Use 'generate_routine' to create your first workout!"
         
         history = "📋 WORKOUT ROUTINE HISTORY\n\n"
         
-        for i, routine in enumerate(self.workout_routines["routines"], 1):
+        for i, routine in enumerate(self.store.all("routines"), 1):
             history += f"{i}. {routine['created_date'][:10]}\n"
             history += f"   Type: {routine['workout_type']}\n"
             history += f"   Focus: {routine['focus'].replace('_', ' ').title()}\n"
@@ -361,6 +376,41 @@ class WorkoutRecommender:
         
         return history
 
-def create_workout_recommender() -> WorkoutRecommender:
+    def generate_program(self, user_info: Dict, weeks: int = 8, sessions_per_week: int = 3,
+                         seed: Optional[int] = None) -> Dict:
+        """Generate and save a periodized multi-week program; returns its id, weekly totals and week 1"""
+        fitness_level = self.normalize_fitness_level(user_info.get('fitness_level', 'beginner'))
+        focus = self.workout_focus(user_info.get('health_goals', 'general fitness'))
+        equipment = user_info.get('equipment', ['none'])
+        program = self.program_generator.generate(fitness_level, focus, equipment, weeks, sessions_per_week,
+                                                  random.Random(seed))
+        
+        record = program.to_record()
+        record.update({
+            "user_info": user_info,
+            "seed": seed,
+            "created_date": datetime.now().isoformat(),
+        })
+        program_id = self.store.append("programs", record)
+        
+        return {
+            "program_id": program_id,
+            "weeks": program.weeks,
+            "sessions_per_week": program.sessions_per_week,
+            "focus": focus,
+            "summary": program.summary(),
+            "week": self.program_generator.render_week(program, 1),
+        }
+    
+    def get_program_week(self, program_id: int, week: int) -> Dict:
+        """One week of a saved program, rebuilt from its exercise-ID matrix"""
+        if not 0 <= program_id < self.store.count("programs"):
+            raise ValueError(f"No program with id {program_id}")
+        program = self.program_generator.from_record(self.store.get("programs", program_id))
+        text = self.program_generator.render_week(program, week)
+        return {"program_id": program_id, **program.week_summary(week), "text": text}
+
+def create_workout_recommender(store: Optional[RecordStore] = None,
+                               plan_cache: Optional[PlanCache] = None) -> WorkoutRecommender:
     """Factory function to create a workout recommender instance"""
-    return WorkoutRecommender() 
\ No newline at end of file
+    return WorkoutRecommender(store, plan_cache) 
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+User State
+Per-user tool state (goals, meal plans, progress, workouts) with a bounded LRU of loaded users
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from tools import (
+    GoalAnalyzer,
+    MealPlanner,
+    ProgressTracker,
+    WorkoutRecommender,
+    create_goal_analyzer,
+    create_progress_tracker,
+)
+from tools.storage import RecordStore, create_user_store
+
+
+class UserState:
+    """One user's tool instances, each backed by the user's own store files"""
+
+    def __init__(self, user_id: Optional[str], goal_analyzer: GoalAnalyzer, meal_planner: MealPlanner,
+                 progress_tracker: ProgressTracker, workout_recommender: WorkoutRecommender):
+        self.user_id = user_id
+        self.goal_analyzer = goal_analyzer
+        self.meal_planner = meal_planner
+        self.progress_tracker = progress_tracker
+        self.workout_recommender = workout_recommender
+
+    @property
+    def stores(self) -> List[RecordStore]:
+        return [self.goal_analyzer.store, self.meal_planner.store,
+                self.progress_tracker.store, self.workout_recommender.store]
+
+    def close(self):
+        """Write back queued changes and release file handles"""
+        for store in self.stores:
+            store.close()
+
+
+def load_user_state(user_id: str, meal_planner: MealPlanner, workout_recommender: WorkoutRecommender) -> UserState:
+    """
+    Open a user's stores. The meal planner and workout recommender are copies
+    of the shared instances, so catalogs, indexes and plan caches are not
+    rebuilt per user.
+    """
+    return UserState(
+        user_id,
+        create_goal_analyzer(create_user_store(user_id, "user_goals.json", ["goals"])),
+        meal_planner.with_store(create_user_store(user_id, meal_planner.meal_plans_file, ["plans"])),
+        create_progress_tracker(create_user_store(user_id, "user_progress.json", ["measurements", "workouts", "achievements"])),
+        workout_recommender.with_store(create_user_store(user_id, workout_recommender.workouts_file, ["routines", "programs"])),
+    )
+
+
+class UserStateCache:
+    """
+    LRU of loaded user states, bounded by user count.
+
+    Requests lease a state for their duration with `use`; only states with
+    no active lease are evicted, and eviction closes them, which writes
+    their queued changes back to disk. A user being loaded or written back
+    is waited on rather than opened twice. Requests without a user ID share
+    `default`, which is never evicted.
+    """
+
+    def __init__(self, load: Callable[[str], UserState], default: UserState, max_users: int = 128):
+        self.load = load
+        self.default = default
+        self.max_users = max_users
+        self.states: "OrderedDict[str, UserState]" = OrderedDict()
+        self.leases: Dict[str, int] = {}
+        # User ID -> event set once its load or write-back finishes
+        self.busy: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self, user_id: Optional[str]) -> Iterator[UserState]:
+        """Lease a user's state for the duration of the block"""
+        if not user_id:
+            yield self.default
+            return
+        state = self.acquire(user_id)
+        try:
+            yield state
+        finally:
+            self.release(user_id)
+
+    def acquire(self, user_id: str) -> UserState:
+        while True:
+            with self._lock:
+                state = self.states.get(user_id)
+                if state is not None:
+                    self.states.move_to_end(user_id)
+                    self.leases[user_id] = self.leases.get(user_id, 0) + 1
+                    self.hits += 1
+                    return state
+                waiting = self.busy.get(user_id)
+                if waiting is None:
+                    done = self.busy[user_id] = threading.Event()
+                    break
+            waiting.wait()
+
+        try:
+            state = self.load(user_id)
+        except Exception:
+            with self._lock:
+                self.busy.pop(user_id).set()
+            raise
+        with self._lock:
+            self.states[user_id] = state
+            self.leases[user_id] = self.leases.get(user_id, 0) + 1
+            self.loads += 1
+            self.busy.pop(user_id)
+        done.set()
+        self.evict()
+        return state
+
+    def release(self, user_id: str):
+        with self._lock:
+            self.leases[user_id] -= 1
+            if not self.leases[user_id]:
+                del self.leases[user_id]
+        self.evict()
+
+    def evict(self):
+        """Close least recently used states over the limit; leased states stay, so the limit can be exceeded briefly"""
+        evicted = []
+        with self._lock:
+            for user_id in list(self.states):
+                if len(self.states) <= self.max_users:
+                    break
+                if user_id in self.leases:
+                    continue
+                evicted.append((user_id, self.states.pop(user_id), threading.Event()))
+                self.busy[user_id] = evicted[-1][2]
+                self.evictions += 1
+        for user_id, state, done in evicted:
+            try:
+                state.close()
+            except Exception as e:
+                print(f"⚠️ Failed to write back state for user {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self.busy.pop(user_id)
+                done.set()
+
+    def close(self):
+        """Write back every loaded state, e.g. at shutdown"""
+        with self._lock:
+            states = list(self.states.values())
+            self.states.clear()
+        for state in states + [self.default]:
+            state.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.loads
+        return {
+            "users": len(self.states),
+            "max_users": self.max_users,
+            "leased": len(self.leases),
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def create_user_state_cache(meal_planner: MealPlanner, workout_recommender: WorkoutRecommender,
+                            default: UserState, max_users: Optional[int] = None) -> UserStateCache:
+    """Factory function to create the user state cache; USER_STATE_CACHE_SIZE sets the default size"""
+    if max_users is None:
+        max_users = int(os.getenv("USER_STATE_CACHE_SIZE", "128"))
+    return UserStateCache(lambda user_id: load_user_state(user_id, meal_planner, workout_recommender),
+                          default, max_users=max_users)